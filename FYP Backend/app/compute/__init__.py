@@ -0,0 +1,4 @@
+# CPU-bound functions run in process pools (time-stretching, thumbnails).
+# Spawned pool workers import these modules to unpickle the functions, so
+# this package imports nothing itself and its modules depend only on
+# numpy and Pillow.
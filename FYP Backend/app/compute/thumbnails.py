@@ -0,0 +1,25 @@
+import io
+from typing import Dict, Sequence
+from PIL import Image, ImageOps
+
+THUMBNAIL_FORMAT = "webp"
+
+def render_thumbnails(data: bytes, sizes: Sequence[int], max_pixels: int) -> Dict[int, bytes]:
+    """Square, center-cropped WebP thumbnails of an image (runs in a worker process)"""
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Let JPEG decode at a reduced scale when the source is much bigger than needed
+            image.draft("RGB", (max(sizes) * 2, max(sizes) * 2))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Unsupported image: {str(e)}")
+
+    thumbnails = {}
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        output = io.BytesIO()
+        thumbnail.save(output, THUMBNAIL_FORMAT.upper(), quality=85, method=4)
+        thumbnails[size] = output.getvalue()
+    return thumbnails
@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rates within this distance of 1.0 are not worth the processing artifacts
+STRETCH_TOLERANCE = 0.03
+
+def wsola_stretch(samples: np.ndarray, rate: float, sample_rate: int,
+                  frame_ms: float = 40, search_ms: float = 12, decimation: int = 4) -> np.ndarray:
+    """Pitch-preserving time-stretch (WSOLA) of int16 samples shaped (frames, channels).
+
+    rate > 1 speeds speech up (shorter output), rate < 1 slows it down.
+    Each output frame is copied from near its nominal input position, shifted
+    by up to search_ms to line up with the waveform of the previous frame,
+    and the frames are overlap-added with a Hann window at 50% overlap.
+    """
+    if len(samples) == 0 or abs(rate - 1.0) < 1e-6:
+        return samples
+
+    frame = int(sample_rate * frame_ms / 1000) // 2 * 2
+    hop = frame // 2
+    tolerance = int(sample_rate * search_ms / 1000)
+    output_length = int(round(len(samples) / rate))
+    frame_count = -(-output_length // hop)
+
+    signal = samples.astype(np.float32)
+    padding = frame + 2 * tolerance + int(hop * rate) + 1
+    signal = np.pad(signal, ((0, padding), (0, 0)))
+    mono = signal.mean(axis=1)
+    last_start = len(mono) - frame
+
+    # Candidate windows for the similarity search, decimated to keep it cheap
+    windows = sliding_window_view(mono, frame)[:, ::decimation]
+
+    positions = np.zeros(frame_count, dtype=np.int64)
+    for k in range(1, frame_count):
+        # What would naturally follow the previous frame in the input
+        template = windows[min(positions[k - 1] + hop, last_start)]
+        nominal = int(round(k * hop * rate))
+        low = max(nominal - tolerance, 0)
+        high = min(nominal + tolerance, last_start)
+        if high <= low:
+            positions[k] = min(nominal, last_start)
+            continue
+        scores = windows[low:high + 1] @ template
+        positions[k] = low + int(np.argmax(scores))
+
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)).astype(np.float32)
+    frames = signal[positions[:, None] + np.arange(frame)] * window[None, :, None]
+    # Nothing overlaps the first half of the first frame, so keep it unwindowed
+    frames[0, :hop] = signal[:hop]
+
+    channels = samples.shape[1]
+    output = np.zeros(((frame_count + 1) * hop, channels), dtype=np.float32)
+    output[:frame_count * hop] += frames[:, :hop].reshape(-1, channels)
+    output[hop:(frame_count + 1) * hop] += frames[:, hop:].reshape(-1, channels)
+
+    output = output[:output_length]
+    np.clip(output, -32768, 32767, out=output)
+    return output.astype(np.int16)
+
+
+def fit_clip(samples: np.ndarray, sample_rate: int, slot_seconds: float, window_seconds: Optional[float],
+             min_rate: float, max_rate: float, max_overlap_seconds: float,
+             fade_ms: float = 30) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Fit a dubbed clip to its cue so the track doesn't drift.
+
+    slot_seconds is how long the original speech lasted; window_seconds is
+    the time until the next cue starts (None for the last cue). Clips are
+    stretched toward the slot within [min_rate, max_rate]; a clip that is too
+    long but still ends before the next cue is left alone. Anything still
+    running past the next cue by more than max_overlap_seconds is trimmed
+    with a short fade-out.
+    """
+    duration = len(samples) / sample_rate
+    rate = 1.0
+    if slot_seconds > 0 and duration > 0:
+        rate = duration / slot_seconds
+        if rate > 1 and (window_seconds is None or duration <= window_seconds):
+            rate = 1.0  # Spills only into the pause before the next cue
+        rate = float(np.clip(rate, min_rate, max_rate))
+        if abs(rate - 1.0) < STRETCH_TOLERANCE:
+            rate = 1.0
+
+    if rate != 1.0:
+        samples = wsola_stretch(samples, rate, sample_rate)
+
+    trimmed_seconds = 0.0
+    limit = int((window_seconds + max_overlap_seconds) * sample_rate) if window_seconds is not None else 0
+    if len(samples) > limit > 0:
+        trimmed_seconds = (len(samples) - limit) / sample_rate
+        samples = samples[:limit].copy()
+        fade = min(int(sample_rate * fade_ms / 1000), limit)
+        ramp = np.linspace(1.0, 0.0, fade, dtype=np.float32)[:, None]
+        samples[-fade:] = (samples[-fade:] * ramp).astype(np.int16)
+
+    fitted_seconds = len(samples) / sample_rate
+    return samples, {
+        "rate": round(rate, 4),
+        "original_seconds": round(duration, 3),
+        "fitted_seconds": round(fitted_seconds, 3),
+        "trimmed_seconds": round(trimmed_seconds, 3),
+        "overlap_seconds": round(max(fitted_seconds - window_seconds, 0.0), 3) if window_seconds is not None else 0.0
+    }
+
+
+def drift_stats(placements: List[Dict[str, float]]) -> Dict[str, Any]:
+    """Summarize how far placed clips end from their cues.
+
+    Each placement has end (where the placed clip ended) and cue_end (where
+    the original speech ended) in seconds, plus the fit_clip details.
+    """
+    if not placements:
+        return {"segments": 0}
+
+    end = np.array([p["end"] for p in placements])
+    cue_end = np.array([p["cue_end"] for p in placements])
+    rate = np.array([p["rate"] for p in placements])
+    trimmed = np.array([p["trimmed_seconds"] for p in placements])
+    overlap = np.array([p["overlap_seconds"] for p in placements])
+    end_offset = end - cue_end
+    stretched = rate != 1.0
+
+    return {
+        "segments": len(placements),
+        "stretched": int(stretched.sum()),
+        "min_rate": round(float(rate.min()), 3),
+        "max_rate": round(float(rate.max()), 3),
+        "mean_stretch_rate": round(float(rate[stretched].mean()), 3) if stretched.any() else 1.0,
+        "trimmed": int((trimmed > 0).sum()),
+        "trimmed_seconds": round(float(trimmed.sum()), 3),
+        "overlapping": int((overlap > 0).sum()),
+        "overlap_seconds": round(float(overlap.sum()), 3),
+        "mean_abs_end_offset_seconds": round(float(np.abs(end_offset).mean()), 3),
+        "max_end_offset_seconds": round(float(end_offset.max()), 3),
+        # Where the dubbed track ends relative to the last cue
+        "final_drift_seconds": round(float(end[-1] - cue_end[-1]), 3)
+    }
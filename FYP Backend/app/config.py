@@ -6,8 +6,116 @@ load_dotenv()
 class Settings:
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
+    SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN")
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY")
+
+    # YouTube batch summarization
+    BATCH_SUMMARY_WORKERS: int = int(os.getenv("BATCH_SUMMARY_WORKERS", "3"))
+    BATCH_SUMMARY_MAX_VIDEOS: int = int(os.getenv("BATCH_SUMMARY_MAX_VIDEOS", "50"))
+    TRANSCRIPT_CACHE_TTL: int = int(os.getenv("TRANSCRIPT_CACHE_TTL", "86400"))
+    # Finished batch jobs stay pollable for this long
+    BATCH_JOB_TTL_SECONDS: int = int(os.getenv("BATCH_JOB_TTL_SECONDS", "3600"))
+    BATCH_JOB_MAX_FINISHED: int = int(os.getenv("BATCH_JOB_MAX_FINISHED", "500"))
+
+    # Background job queue (dubbing)
+    JOB_QUEUE_DB_PATH: str = os.getenv("JOB_QUEUE_DB_PATH", "data/jobs.db")
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+    JOB_RETRY_DELAY_SECONDS: int = int(os.getenv("JOB_RETRY_DELAY_SECONDS", "10"))
+    WORKER_POLL_INTERVAL: float = float(os.getenv("WORKER_POLL_INTERVAL", "2"))
+    # Run a dubbing worker inside the API process (handy for local development)
+    EMBEDDED_WORKER: bool = os.getenv("EMBEDDED_WORKER", "false").lower() == "true"
+
+    # Shared outbound HTTP connection pool (aiohttp)
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+    HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+    HTTP_DNS_CACHE_SECONDS: int = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "300"))
+
+    # Dubbing segment merging
+    DUBBING_TARGET_SEGMENT_SECONDS: float = float(os.getenv("DUBBING_TARGET_SEGMENT_SECONDS", "8"))
+    DUBBING_MAX_SEGMENT_SECONDS: float = float(os.getenv("DUBBING_MAX_SEGMENT_SECONDS", "15"))
+    DUBBING_MAX_SEGMENT_GAP: float = float(os.getenv("DUBBING_MAX_SEGMENT_GAP", "1.5"))
+    # Segments packed into one translation request
+    DUBBING_TRANSLATION_BATCH_SIZE: int = int(os.getenv("DUBBING_TRANSLATION_BATCH_SIZE", "20"))
+
+    # Disk cache for ElevenLabs audio
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "data/tts_cache")
+    TTS_CACHE_MAX_BYTES: int = int(os.getenv("TTS_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+    # Dubbing pipeline: workers per stage (tune to each provider's rate limits)
+    DUBBING_TRANSLATE_WORKERS: int = int(os.getenv("DUBBING_TRANSLATE_WORKERS", "2"))
+    DUBBING_TTS_WORKERS: int = int(os.getenv("DUBBING_TTS_WORKERS", "2"))
+    DUBBING_DECODE_WORKERS: int = int(os.getenv("DUBBING_DECODE_WORKERS", "2"))
+    DUBBING_STAGE_QUEUE_SIZE: int = int(os.getenv("DUBBING_STAGE_QUEUE_SIZE", "16"))
+
+    # Dubbed clips are time-stretched (pitch preserved) toward their cue's duration
+    DUBBING_MIN_STRETCH_RATE: float = float(os.getenv("DUBBING_MIN_STRETCH_RATE", "0.8"))
+    DUBBING_MAX_STRETCH_RATE: float = float(os.getenv("DUBBING_MAX_STRETCH_RATE", "1.25"))
+    # How far a clip may run into the next cue before it is trimmed
+    DUBBING_MAX_OVERLAP_SECONDS: float = float(os.getenv("DUBBING_MAX_OVERLAP_SECONDS", "0.25"))
+    DUBBING_STRETCH_WORKERS: int = int(os.getenv("DUBBING_STRETCH_WORKERS", str(os.cpu_count() or 2)))
+    # Finished audio is appended to the output MP3 in chunks of at least this length
+    DUBBING_STREAM_CHUNK_SECONDS: float = float(os.getenv("DUBBING_STREAM_CHUNK_SECONDS", "10"))
+
+    # Scratch space for uploads and dubbing jobs
+    TEMP_UPLOADS_DIR: str = os.getenv("TEMP_UPLOADS_DIR", "app/temp_uploads")
+    # Finished dubbing outputs (and stray temp files) are deleted after this long
+    OUTPUT_RETENTION_HOURS: float = float(os.getenv("OUTPUT_RETENTION_HOURS", "24"))
+    JANITOR_INTERVAL_SECONDS: int = int(os.getenv("JANITOR_INTERVAL_SECONDS", "600"))
+    # New dubbing jobs are refused past either limit
+    TEMP_UPLOADS_MAX_BYTES: int = int(os.getenv("TEMP_UPLOADS_MAX_MB", "5120")) * 1024 * 1024
+    MIN_FREE_DISK_BYTES: int = int(os.getenv("MIN_FREE_DISK_MB", "1024")) * 1024 * 1024
+
+    # Summary and profile storage: "supabase" (PostgREST) or "sqlite" (local stand-in)
+    DATA_BACKEND: str = os.getenv("DATA_BACKEND", "supabase")
+    LOCAL_DB_PATH: str = os.getenv("LOCAL_DB_PATH", "data/local.db")
+    DB_TIMEOUT_SECONDS: float = float(os.getenv("DB_TIMEOUT_SECONDS", "10"))
+
+    # GET /summaries/ page sizes
+    SUMMARY_PAGE_SIZE: int = int(os.getenv("SUMMARY_PAGE_SIZE", "20"))
+    SUMMARY_MAX_PAGE_SIZE: int = int(os.getenv("SUMMARY_MAX_PAGE_SIZE", "100"))
+    # Most summaries one bulk create/delete request may carry
+    SUMMARY_BULK_MAX_ITEMS: int = int(os.getenv("SUMMARY_BULK_MAX_ITEMS", "100"))
+
+    # Per-user in-memory summary search indexes (rebuilt from the database after the TTL)
+    SEARCH_INDEX_TTL_SECONDS: int = int(os.getenv("SEARCH_INDEX_TTL_SECONDS", "600"))
+    SEARCH_INDEX_MAX_USERS: int = int(os.getenv("SEARCH_INDEX_MAX_USERS", "200"))
+
+    # Read-through cache for GET /summaries/{id}
+    SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "60"))
+    SUMMARY_CACHE_MAX_USERS: int = int(os.getenv("SUMMARY_CACHE_MAX_USERS", "1000"))
+    SUMMARY_CACHE_PER_USER: int = int(os.getenv("SUMMARY_CACHE_PER_USER", "50"))
+
+    # Profile pictures: content-addressed blobs plus square thumbnails (pixel sizes)
+    AVATAR_STORE_DIR: str = os.getenv("AVATAR_STORE_DIR", "data/avatars")
+    AVATAR_SIZES: list = [int(size) for size in os.getenv("AVATAR_SIZES", "64,128,320").split(",")]
+    AVATAR_MAX_BYTES: int = int(os.getenv("AVATAR_MAX_MB", "5")) * 1024 * 1024
+    AVATAR_MAX_PIXELS: int = int(os.getenv("AVATAR_MAX_PIXELS", "40000000"))
+    AVATAR_WORKERS: int = int(os.getenv("AVATAR_WORKERS", "2"))
+
+    # Questions about a document are answered from its most relevant passages (BM25)
+    RETRIEVAL_CHUNK_CHARS: int = int(os.getenv("RETRIEVAL_CHUNK_CHARS", "1200"))
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+    # Most passage text sent per question, whatever the document's length
+    RETRIEVAL_CONTEXT_CHARS: int = int(os.getenv("RETRIEVAL_CONTEXT_CHARS", "6000"))
+
+    # Uploaded documents kept in memory for follow-up questions (per API process)
+    DOCUMENT_SESSION_TTL_SECONDS: int = int(os.getenv("DOCUMENT_SESSION_TTL_SECONDS", "3600"))
+    DOCUMENT_SESSION_MAX_COUNT: int = int(os.getenv("DOCUMENT_SESSION_MAX_COUNT", "200"))
+
+    # Batch questions about one document: most per request, and per packed LLM call
+    # (questions sharing passages share one context of at most BATCH_ANSWER_CONTEXT_CHARS)
+    BATCH_ANSWER_MAX_QUESTIONS: int = int(os.getenv("BATCH_ANSWER_MAX_QUESTIONS", "30"))
+    BATCH_ANSWER_QUESTIONS_PER_CALL: int = int(os.getenv("BATCH_ANSWER_QUESTIONS_PER_CALL", "10"))
+    BATCH_ANSWER_CONTEXT_CHARS: int = int(os.getenv("BATCH_ANSWER_CONTEXT_CHARS", "12000"))
+
+    # Document summaries, questions and answers are requested as JSON and validated;
+    # invalid fields are re-asked up to LLM_REPAIR_ATTEMPTS times before falling back
+    # to the plain-text prompts and parsers
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+    LLM_REPAIR_ATTEMPTS: int = int(os.getenv("LLM_REPAIR_ATTEMPTS", "1"))
     
     
 settings = Settings()
\ No newline at end of file
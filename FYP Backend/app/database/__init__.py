@@ -1,4 +1,6 @@
 # Database package
 from .supabase_client import supabase
+from .backends import RepositoryError
+from .repositories import data_backend, summary_repository, profile_repository, generated_output_repository
 
-__all__ = ["supabase"]
\ No newline at end of file
+__all__ = ["supabase", "RepositoryError", "data_backend", "summary_repository", "profile_repository", "generated_output_repository"]
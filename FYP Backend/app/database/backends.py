@@ -0,0 +1,329 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import aiohttp
+from app.config import settings
+from app.utils.http_client import http_sessions
+
+# (column, operator, value); operators follow PostgREST: eq, neq, lt, lte, gt, gte, in, ilike
+Filter = Tuple[str, str, Any]
+# (column, descending)
+Order = Tuple[str, bool]
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+class RepositoryError(Exception):
+    """A data backend rejected or failed a request"""
+    pass
+
+
+class PostgRESTBackend:
+    """Async access to Supabase tables through the PostgREST HTTP API.
+
+    Requests go through the shared pooled aiohttp session, so calls from
+    request handlers never block the event loop and reuse keep-alive
+    connections. Every call has its own timeout.
+    """
+
+    def __init__(self, url: str = None, key: str = None, timeout: float = None):
+        self.base_url = f"{(url or settings.SUPABASE_URL or '').rstrip('/')}/rest/v1"
+        self.key = key or settings.SUPABASE_SERVICE_ROLE_KEY
+        self.timeout = timeout or settings.DB_TIMEOUT_SECONDS
+
+    async def select(self, table: str, columns: str = "*", filters: Sequence[Filter] = (),
+                     order: Sequence[Order] = (), limit: int = None, or_filter: str = None) -> List[Dict[str, Any]]:
+        params = [("select", columns), *self._filter_params(filters)]
+        if or_filter:
+            params.append(("or", f"({or_filter})"))
+        if order:
+            params.append(("order", ",".join(f"{column}.{'desc' if desc else 'asc'}" for column, desc in order)))
+        if limit is not None:
+            params.append(("limit", str(limit)))
+        return await self._request("GET", table, params)
+
+    async def insert(self, table: str, rows: Union[Dict[str, Any], List[Dict[str, Any]]],
+                     upsert: bool = False, on_conflict: str = None, returning: str = "*") -> List[Dict[str, Any]]:
+        """Insert rows; with upsert, rows whose on_conflict key exists have
+        only the given columns updated (INSERT ... ON CONFLICT DO UPDATE)"""
+        prefer = ["return=representation"]
+        params = [("select", returning)]
+        if upsert:
+            prefer.append("resolution=merge-duplicates")
+            if on_conflict:
+                params.append(("on_conflict", on_conflict))
+        return await self._request("POST", table, params, json=rows, prefer=prefer)
+
+    async def update(self, table: str, values: Dict[str, Any], filters: Sequence[Filter]) -> List[Dict[str, Any]]:
+        return await self._request("PATCH", table, self._filter_params(filters), json=values,
+                                   prefer=["return=representation"])
+
+    async def delete(self, table: str, filters: Sequence[Filter], returning: str = "*") -> List[Dict[str, Any]]:
+        params = [*self._filter_params(filters), ("select", returning)]
+        return await self._request("DELETE", table, params, prefer=["return=representation"])
+
+    def _filter_params(self, filters: Sequence[Filter]) -> List[Tuple[str, str]]:
+        params = []
+        for column, operator, value in filters:
+            if operator == "in":
+                value = f"({','.join(str(item) for item in value)})"
+            params.append((column, f"{operator}.{value}"))
+        return params
+
+    async def _request(self, method: str, table: str, params: List[Tuple[str, str]],
+                       json: Any = None, prefer: List[str] = None) -> List[Dict[str, Any]]:
+        headers = {
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json"
+        }
+        if prefer:
+            headers["Prefer"] = ",".join(prefer)
+
+        session = http_sessions.get_session()
+        try:
+            async with session.request(
+                method, f"{self.base_url}/{table}",
+                params=params, json=json, headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                body = await response.json(content_type=None) if response.status != 204 else None
+                if response.status >= 400:
+                    body = body or {}
+                    # Keep the PostgREST code (e.g. PGRST205) in the message for callers that check it
+                    raise RepositoryError(f"{body.get('code', response.status)}: {body.get('message', 'request failed')}")
+                return body or []
+        except asyncio.TimeoutError:
+            raise RepositoryError(f"Database request to '{table}' timed out after {self.timeout}s")
+        except aiohttp.ClientError as e:
+            raise RepositoryError(f"Database request to '{table}' failed: {str(e)}")
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    source_text TEXT,
+    source_type TEXT NOT NULL,
+    document_id INTEGER,
+    preview TEXT,
+    word_count INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_user_created ON summaries (user_id, created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    full_name TEXT,
+    profile_picture TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f000', 'now')),
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS generated_outputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    params TEXT,
+    result TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (user_id, kind, source_hash, params_hash)
+);
+"""
+
+# Columns added after a table was first created: (table, column, type)
+SQLITE_ADDED_COLUMNS = [
+    ("summaries", "preview", "TEXT"),
+    ("summaries", "word_count", "INTEGER"),
+]
+
+# Bound parameters allowed per statement (SQLite >= 3.32)
+SQLITE_MAX_VARIABLES = 32766
+_SQL_OPERATORS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+class SQLiteBackend:
+    """Local stand-in with the same interface as PostgRESTBackend.
+
+    Mirrors the Supabase summaries and profiles tables in a SQLite file so
+    the API can run and be load-tested without network access. Queries run
+    in the default thread pool, each thread keeping its own connection.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.LOCAL_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SQLITE_SCHEMA)
+        for table, column, column_type in SQLITE_ADDED_COLUMNS:
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    async def select(self, table: str, columns: str = "*", filters: Sequence[Filter] = (),
+                     order: Sequence[Order] = (), limit: int = None, or_filter: str = None) -> List[Dict[str, Any]]:
+        where, args = self._where(filters)
+        if or_filter:
+            or_sql, or_args = self._or_clause(or_filter)
+            where = f"{where} AND {or_sql}" if where else or_sql
+            args += or_args
+        sql = f"SELECT {self._columns(columns)} FROM {self._name(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        if order:
+            sql += " ORDER BY " + ", ".join(f"{self._name(column)} {'DESC' if desc else 'ASC'}" for column, desc in order)
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return await self._run(sql, args)
+
+    async def insert(self, table: str, rows: Union[Dict[str, Any], List[Dict[str, Any]]],
+                     upsert: bool = False, on_conflict: str = None, returning: str = "*") -> List[Dict[str, Any]]:
+        """Insert rows with multi-row INSERT statements in one transaction"""
+        rows = [rows] if isinstance(rows, dict) else rows
+        if not rows:
+            return []
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        suffix = ""
+        if upsert:
+            conflict = [column.strip() for column in (on_conflict or "id").split(",")]
+            updates = ", ".join(f"{self._name(column)} = excluded.{self._name(column)}" for column in columns if column not in conflict)
+            suffix += f" ON CONFLICT ({self._columns(','.join(conflict))}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        suffix += f" RETURNING {self._columns(returning)}"
+
+        prefix = f"INSERT INTO {self._name(table)} ({', '.join(self._name(column) for column in columns)}) VALUES "
+        placeholders = f"({', '.join('?' for _ in columns)})"
+        per_statement = max(1, SQLITE_MAX_VARIABLES // len(columns))
+        statements = []
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            statements.append((
+                prefix + ", ".join(placeholders for _ in chunk) + suffix,
+                [row.get(column) for row in chunk for column in columns]
+            ))
+        return await self._run_statements(statements)
+
+    async def update(self, table: str, values: Dict[str, Any], filters: Sequence[Filter]) -> List[Dict[str, Any]]:
+        where, args = self._where(filters)
+        assignments = ", ".join(f"{self._name(column)} = ?" for column in values)
+        sql = f"UPDATE {self._name(table)} SET {assignments}"
+        if where:
+            sql += f" WHERE {where}"
+        return await self._run(sql + " RETURNING *", [*values.values(), *args])
+
+    async def delete(self, table: str, filters: Sequence[Filter], returning: str = "*") -> List[Dict[str, Any]]:
+        where, args = self._where(filters)
+        sql = f"DELETE FROM {self._name(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        return await self._run(f"{sql} RETURNING {self._columns(returning)}", args)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        return await self._run_statements([(sql, args)])
+
+    async def _run_statements(self, statements: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+        def execute():
+            conn = self._connection()
+            rows = []
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, args in statements:
+                    rows.extend(dict(row) for row in conn.execute(sql, args).fetchall())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return rows
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, execute)
+        except sqlite3.Error as e:
+            raise RepositoryError(f"Local database error: {str(e)}")
+
+    def _where(self, filters: Sequence[Filter]) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        for column, operator, value in filters:
+            clause, clause_args = self._condition(column, operator, value)
+            clauses.append(clause)
+            args.extend(clause_args)
+        return " AND ".join(clauses), args
+
+    def _condition(self, column: str, operator: str, value: Any) -> Tuple[str, List[Any]]:
+        column = self._name(column)
+        if operator == "in":
+            values = list(value)
+            if not values:
+                return "0", []
+            return f"{column} IN ({', '.join('?' for _ in values)})", values
+        if operator == "ilike":
+            return f"{column} LIKE ?", [str(value).replace("*", "%")]
+        if operator not in _SQL_OPERATORS:
+            raise RepositoryError(f"Unsupported filter operator: {operator}")
+        return f"{column} {_SQL_OPERATORS[operator]} ?", [value]
+
+    def _or_clause(self, or_filter: str) -> Tuple[str, List[Any]]:
+        """Translate a PostgREST or=(...) expression, including nested and(...) groups"""
+        def split(expression: str) -> List[str]:
+            parts, depth, current = [], 0, ""
+            for char in expression:
+                if char == "," and depth == 0:
+                    parts.append(current)
+                    current = ""
+                    continue
+                depth += (char == "(") - (char == ")")
+                current += char
+            parts.append(current)
+            return parts
+
+        def translate(expression: str, joiner: str) -> Tuple[str, List[Any]]:
+            clauses, args = [], []
+            for part in split(expression):
+                if part.startswith("and(") and part.endswith(")"):
+                    clause, clause_args = translate(part[4:-1], " AND ")
+                elif part.startswith("or(") and part.endswith(")"):
+                    clause, clause_args = translate(part[3:-1], " OR ")
+                else:
+                    column, operator, value = part.split(".", 2)
+                    clause, clause_args = self._condition(column, operator, value.strip('"'))
+                clauses.append(f"({clause})")
+                args.extend(clause_args)
+            return joiner.join(clauses), args
+
+        clause, args = translate(or_filter, " OR ")
+        return f"({clause})", args
+
+    def _columns(self, columns: str) -> str:
+        if columns.strip() == "*":
+            return "*"
+        return ", ".join(self._name(column.strip()) for column in columns.split(","))
+
+    def _name(self, identifier: str) -> str:
+        if not _IDENTIFIER.match(identifier):
+            raise RepositoryError(f"Invalid identifier: {identifier}")
+        return identifier
+
+
+def create_backend(name: Optional[str] = None):
+    """Backend selected by DATA_BACKEND: 'supabase' (default) or 'sqlite'"""
+    name = (name or settings.DATA_BACKEND).lower()
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "supabase":
+        return PostgRESTBackend()
+    raise ValueError(f"Unknown DATA_BACKEND: {name}")
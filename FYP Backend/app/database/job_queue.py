@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    progress INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (kind, status, available_at);
+CREATE TABLE IF NOT EXISTS job_segments (
+    job_id TEXT NOT NULL,
+    segment_index INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, segment_index)
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id);
+"""
+
+class JobQueue:
+    """Durable SQLite-backed job queue shared by the API and worker processes.
+
+    Workers claim jobs with a time-limited lease; a job whose worker dies is
+    picked up again once its lease expires. Per-segment results are stored
+    so a retried job resumes from the last completed segment, and progress
+    events are appended to a log that the API streams to clients.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.JOB_QUEUE_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: str = None, max_attempts: int = None) -> str:
+        """Add a job to the queue and return its ID"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO jobs (id, kind, user_id, payload, status, stage, progress,
+                                     max_attempts, available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, 'queued', 'queued', 0, ?, ?, ?, ?)""",
+                (job_id, kind, user_id, json.dumps(payload),
+                 max_attempts or settings.JOB_MAX_ATTEMPTS, now, now, now)
+            )
+        return job_id
+
+    def claim(self, kind: str, worker_id: str, lease_seconds: float = None) -> Optional[Dict[str, Any]]:
+        """Atomically take the next runnable job, including ones whose lease expired"""
+        lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        with self._connect() as conn:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        """SELECT * FROM jobs
+                           WHERE kind = ?
+                             AND ((status = 'queued' AND available_at <= ?)
+                                  OR (status = 'running' AND lease_expires < ?))
+                           ORDER BY available_at
+                           LIMIT 1""",
+                        (kind, now, now)
+                    ).fetchone()
+
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+
+                    # A worker died mid-job too many times; stop retrying it
+                    if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                        conn.execute(
+                            """UPDATE jobs SET status = 'error', lease_owner = NULL,
+                                   error = COALESCE(error, 'Worker lost the job too many times'),
+                                   updated_at = ?
+                               WHERE id = ?""",
+                            (now, row["id"])
+                        )
+                        conn.execute("COMMIT")
+                        continue
+
+                    conn.execute(
+                        """UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?,
+                               attempts = attempts + 1, updated_at = ?
+                           WHERE id = ?""",
+                        (worker_id, now + lease_seconds, now, row["id"])
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                job = self._row_to_job(row)
+                job["status"] = "running"
+                job["attempts"] += 1
+                return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = None) -> bool:
+        """Extend the lease; returns False if another worker has taken the job over"""
+        lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET lease_expires = ?, updated_at = ?
+                   WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                (now + lease_seconds, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, progress: int = None, stage: str = None):
+        """Record stage/progress for status polling"""
+        fields = {"updated_at": time.time()}
+        if progress is not None:
+            fields["progress"] = int(progress)
+        if stage is not None:
+            fields["stage"] = stage
+        self._update(job_id, fields)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Mark a job finished and store its result"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'completed', stage = 'completed', progress = 100,
+                       result = ?, error = NULL, lease_owner = NULL, updated_at = ?
+                   WHERE id = ? AND lease_owner = ?""",
+                (json.dumps(result), time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = None) -> bool:
+        """Record a failure; requeue with exponential backoff while attempts remain.
+
+        Returns True if the job will be retried.
+        """
+        retry_delay = settings.JOB_RETRY_DELAY_SECONDS if retry_delay is None else retry_delay
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            if row["attempts"] < row["max_attempts"]:
+                delay = retry_delay * (2 ** (row["attempts"] - 1))
+                conn.execute(
+                    """UPDATE jobs SET status = 'queued', stage = 'retrying', error = ?,
+                           available_at = ?, lease_owner = NULL, updated_at = ?
+                       WHERE id = ?""",
+                    (error, now + delay, now, job_id)
+                )
+                return True
+
+            conn.execute(
+                """UPDATE jobs SET status = 'error', stage = 'error', error = ?,
+                       lease_owner = NULL, updated_at = ?
+                   WHERE id = ?""",
+                (error, now, job_id)
+            )
+            return False
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a job by ID"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def save_segment(self, job_id: str, segment_index: int, data: Dict[str, Any]):
+        """Persist the result of one completed segment"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_segments (job_id, segment_index, data) VALUES (?, ?, ?)",
+                (job_id, segment_index, json.dumps(data))
+            )
+
+    def get_segments(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """Load all completed segments for a job, keyed by segment index"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT segment_index, data FROM job_segments WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["segment_index"]: json.loads(row["data"]) for row in rows}
+
+    def clear_segments(self, job_id: str):
+        """Drop stored segment results once a job no longer needs them"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+
+    def add_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        """Append a progress event for a job; returns the event ID"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, event, json.dumps(data), time.time())
+            )
+            return cursor.lastrowid
+
+    def get_events(self, job_id: str, after_id: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Events of a job newer than after_id, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT id, event, data, created_at FROM job_events
+                   WHERE job_id = ? AND id > ?
+                   ORDER BY id
+                   LIMIT ?""",
+                (job_id, after_id, limit)
+            ).fetchall()
+        return [
+            {"id": row["id"], "event": row["event"], "data": json.loads(row["data"]), "created_at": row["created_at"]}
+            for row in rows
+        ]
+
+    def clear_events(self, job_id: str):
+        """Drop a job's event log once it has finished"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+
+    def _update(self, job_id: str, fields: Dict[str, Any]):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["created_at"] = datetime.utcfromtimestamp(job["created_at"]).isoformat()
+        job["updated_at"] = datetime.utcfromtimestamp(job["updated_at"]).isoformat()
+        return job
+
+
+job_queue = JobQueue()
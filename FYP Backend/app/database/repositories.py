@@ -0,0 +1,251 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.database.backends import create_backend
+
+PREVIEW_CHARS = 200
+
+def utc_now() -> str:
+    # Fixed width so timestamps sort correctly as strings (keyset cursors)
+    return datetime.utcnow().isoformat(timespec="microseconds")
+
+def summary_preview(content: str) -> str:
+    """First PREVIEW_CHARS characters of the content, whitespace collapsed"""
+    text = " ".join((content or "").split())
+    if len(text) <= PREVIEW_CHARS:
+        return text
+    return text[:PREVIEW_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+class SummaryRepository:
+    """Async access to the summaries table, always scoped to one user.
+
+    preview and word_count are derived from content on every write so list
+    views never have to read the full body. Listeners (e.g. the search
+    index) are told about every successful write.
+    """
+
+    TABLE = "summaries"
+    LIST_COLUMNS = "id,title,source_type,document_id,preview,word_count,created_at,updated_at"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Register an object with summary_saved(user_id, row),
+        summary_deleted(user_id, summary_id) and summaries_cleared(user_id)"""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, *args):
+        for listener in self._listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception as e:
+                print(f"Summary listener {type(listener).__name__}.{event} failed: {str(e)}")
+
+    async def list_page(self, user_id: str, limit: int, after: Optional[Tuple[str, int]] = None,
+                        include_content: bool = False) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """Newest-first page of a user's summaries, keyed on (created_at, id).
+
+        after is the (created_at, id) of the last row of the previous page.
+        Returns the rows and the key to pass as after for the next page, or
+        None when this is the last page.
+        """
+        or_filter = None
+        if after is not None:
+            created_at, summary_id = after
+            or_filter = (
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{int(summary_id)})'
+            )
+        columns = f"{self.LIST_COLUMNS},content,source_text" if include_content else self.LIST_COLUMNS
+        rows = await self.backend.select(
+            self.TABLE,
+            columns=columns,
+            filters=[("user_id", "eq", user_id)],
+            or_filter=or_filter,
+            order=[("created_at", True), ("id", True)],
+            limit=limit + 1
+        )
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1]["created_at"], rows[-1]["id"])
+
+    async def get(self, summary_id: int, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.select(
+            self.TABLE,
+            filters=[("id", "eq", summary_id), ("user_id", "eq", user_id)],
+            limit=1
+        )
+        return rows[0] if rows else None
+
+    async def get_many(self, user_id: str, summary_ids: List[int], columns: str = "*") -> List[Dict[str, Any]]:
+        """The user's summaries with the given ids, in no particular order"""
+        if not summary_ids:
+            return []
+        return await self.backend.select(
+            self.TABLE,
+            columns=columns,
+            filters=[("user_id", "eq", user_id), ("id", "in", list(summary_ids))]
+        )
+
+    async def create(self, user_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        now = utc_now()
+        rows = await self.backend.insert(self.TABLE, {
+            **self._with_derived(values),
+            "user_id": user_id,
+            "created_at": now,
+            "updated_at": now
+        })
+        if rows:
+            self._notify("summary_saved", user_id, rows[0])
+        return rows[0] if rows else None
+
+    async def create_many(self, user_id: str, values_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several summaries in one multi-row write (all or nothing).
+
+        Rows come back in the order given.
+        """
+        if not values_list:
+            return []
+        now = utc_now()
+        rows = [
+            {**self._with_derived(values), "user_id": user_id, "created_at": now, "updated_at": now}
+            for values in values_list
+        ]
+        # Every row must carry the same columns for a multi-row insert
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        created = await self.backend.insert(self.TABLE, [{column: row.get(column) for column in columns} for row in rows])
+        created.sort(key=lambda row: row["id"])
+        for row in created:
+            self._notify("summary_saved", user_id, row)
+        return created
+
+    async def update(self, summary_id: int, user_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.update(
+            self.TABLE,
+            {**self._with_derived(values), "updated_at": utc_now()},
+            filters=[("id", "eq", summary_id), ("user_id", "eq", user_id)]
+        )
+        if rows:
+            self._notify("summary_saved", user_id, rows[0])
+        return rows[0] if rows else None
+
+    async def delete(self, summary_id: int, user_id: str) -> bool:
+        rows = await self.backend.delete(
+            self.TABLE,
+            filters=[("id", "eq", summary_id), ("user_id", "eq", user_id)],
+            returning="id"
+        )
+        if rows:
+            self._notify("summary_deleted", user_id, summary_id)
+        return bool(rows)
+
+    async def delete_many(self, user_id: str, summary_ids: List[int]) -> List[int]:
+        """Delete the user's summaries with the given ids; returns the ids actually deleted"""
+        if not summary_ids:
+            return []
+        rows = await self.backend.delete(
+            self.TABLE,
+            filters=[("user_id", "eq", user_id), ("id", "in", list(summary_ids))],
+            returning="id"
+        )
+        deleted = [row["id"] for row in rows]
+        for summary_id in deleted:
+            self._notify("summary_deleted", user_id, summary_id)
+        return deleted
+
+    async def delete_all(self, user_id: str) -> int:
+        rows = await self.backend.delete(self.TABLE, filters=[("user_id", "eq", user_id)], returning="id")
+        self._notify("summaries_cleared", user_id)
+        return len(rows)
+
+    def _with_derived(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        if "content" not in values:
+            return values
+        content = values["content"] or ""
+        return {**values, "preview": summary_preview(content), "word_count": len(content.split())}
+
+
+class ProfileRepository:
+    """Async access to the profiles table (one row per auth user)"""
+
+    TABLE = "profiles"
+    COLUMNS = "id,email,full_name,profile_picture,created_at,updated_at"
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self.backend.select(self.TABLE, columns=self.COLUMNS, filters=[("id", "eq", user_id)], limit=1)
+        return rows[0] if rows else None
+
+    async def upsert(self, user_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create the profile or update only the given columns, in one atomic round trip.
+
+        created_at is left to the column default so an update never
+        overwrites it.
+        """
+        rows = await self.backend.insert(
+            self.TABLE,
+            {**values, "id": user_id, "updated_at": utc_now()},
+            upsert=True,
+            on_conflict="id",
+            returning=self.COLUMNS
+        )
+        return rows[0] if rows else None
+
+
+class GeneratedOutputRepository:
+    """Async access to generated_outputs: stored LLM results for uploaded material.
+
+    A row is identified by (user_id, kind, source_hash, params_hash), so
+    the same document generated with the same settings maps to one row.
+    result is stored as JSON text, which both backends handle the same way.
+    """
+
+    TABLE = "generated_outputs"
+    KEY = "user_id,kind,source_hash,params_hash"
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def find(self, user_id: str, kind: str, source_hash: str, params_hash: str) -> Optional[Dict[str, Any]]:
+        """Stored result for the key, or None"""
+        rows = await self.backend.select(
+            self.TABLE,
+            columns="id,result,created_at",
+            filters=[
+                ("user_id", "eq", user_id), ("kind", "eq", kind),
+                ("source_hash", "eq", source_hash), ("params_hash", "eq", params_hash)
+            ],
+            limit=1
+        )
+        if not rows:
+            return None
+        return {**rows[0], "result": json.loads(rows[0]["result"])}
+
+    async def save(self, user_id: str, kind: str, source_hash: str, params_hash: str,
+                   params: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Store (or replace) the result for the key"""
+        now = utc_now()
+        rows = await self.backend.insert(
+            self.TABLE,
+            {
+                "user_id": user_id, "kind": kind, "source_hash": source_hash, "params_hash": params_hash,
+                "params": json.dumps(params, sort_keys=True), "result": json.dumps(result, ensure_ascii=False),
+                "created_at": now, "updated_at": now
+            },
+            upsert=True,
+            on_conflict=self.KEY,
+            returning="id,created_at"
+        )
+        return rows[0] if rows else None
+
+
+data_backend = create_backend()
+summary_repository = SummaryRepository(data_backend)
+profile_repository = ProfileRepository(data_backend)
+generated_output_repository = GeneratedOutputRepository(data_backend)
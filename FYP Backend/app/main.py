@@ -83,10 +83,13 @@
 #     }
 
 
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
+from app.utils.http_client import http_sessions
+from app.workers.janitor import Janitor
 
 # Import routers
 from app.routes.auth import router as auth_router
@@ -127,6 +130,41 @@ app.include_router(youtube_router, prefix="/youtube", tags=["YouTube"])
 app.include_router(dubbing_router, prefix="/dubbing", tags=["Dubbing"])
 
 
+# Dubbing jobs normally run in a separate `python worker.py` process;
+# EMBEDDED_WORKER=true runs one inside the API for single-process setups
+embedded_worker = None
+if settings.EMBEDDED_WORKER:
+    # Only imported here so the API alone never builds a DubbingService (and its TTS cache)
+    from app.workers.dubbing_worker import DubbingWorker
+    embedded_worker = DubbingWorker()
+janitor = Janitor()
+
+@app.on_event("startup")
+async def start_janitor():
+    app.state.janitor_task = asyncio.create_task(janitor.run())
+
+@app.on_event("shutdown")
+async def stop_janitor():
+    janitor.stop()
+    app.state.janitor_task.cancel()
+
+@app.on_event("startup")
+async def start_embedded_worker():
+    if embedded_worker:
+        app.state.embedded_worker_task = asyncio.create_task(embedded_worker.run())
+
+@app.on_event("shutdown")
+async def stop_embedded_worker():
+    if embedded_worker:
+        # Interrupted jobs are resumed by the next worker once their lease expires
+        embedded_worker.stop()
+        app.state.embedded_worker_task.cancel()
+
+@app.on_event("shutdown")
+async def close_http_sessions():
+    await http_sessions.close()
+
+
 # --- Temporary override to ignore auth ---
 @app.middleware("http")
 async def bypass_auth_middleware(request: Request, call_next):
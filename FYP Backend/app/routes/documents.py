@@ -1,6 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, Body, HTTPException, Depends
 from fastapi.security import HTTPBearer
-from typing import Optional
+from functools import partial
+from pydantic import BaseModel, conlist
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
 import os
 
 from app.services.document_service import DocumentService
@@ -8,7 +12,13 @@ from app.services.ocr_service import OCRService
 from app.services.chatgpt_service import ChatGPTService
 from app.services.auth_service import AuthService
 from app.services.summary_service import SummaryService
-from app.utils.file_handling import save_upload_file, cleanup_file, validate_file_type
+from app.services.generation_store import generation_store
+from app.services.document_sessions import DocumentSession, document_sessions
+from app.services.structured_output import StructuredOutputError, generate_with_fallback
+from app.services.question_stream import question_events, stored_question_events
+from app.utils.file_handling import save_upload_file, cleanup_file, validate_file_type, hash_upload_file
+from app.utils.sse import sse_response
+from app.config import settings
 
 router = APIRouter()
 document_service = DocumentService()
@@ -26,17 +36,255 @@ async def get_current_user(token: str = Depends(security)):
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
 
+class DocumentQuestionRequest(BaseModel):
+    question: str
+
+class DocumentBatchQuestionRequest(BaseModel):
+    questions: conlist(str, min_items=1, max_items=settings.BATCH_ANSWER_MAX_QUESTIONS)
+
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
+    regenerate: bool = False,
     user = Depends(get_current_user)
 ):
-    """Upload and process document with chunked processing for large files"""
+    """Upload and process document with chunked processing for large files.
+
+    The result is stored per user and file content; uploading the same file
+    again returns it (cached: true) unless regenerate=true.
+    """
     try:
         user_id = user["user"]["id"]
         
         print(f"Processing document for user: {user_id}")
         
+        # Validate file type
+        if not validate_file_type(file, ['text/', 'application/pdf', 'image/']):
+            raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOCX, TXT, and images are supported.")
+        
+        source_hash = hash_upload_file(file)
+        async with generation_store.single_flight(user_id, "document_summary", source_hash, {}):
+            if not regenerate:
+                stored = await generation_store.lookup(user_id, "document_summary", source_hash, {})
+                if stored:
+                    return {**stored, "filename": file.filename, "cached": True}
+            
+            # Save uploaded file
+            file_path = save_upload_file(file)
+        
+            try:
+                # Extract text based on file type
+                if file.content_type.startswith('image/'):
+                    print("Processing image file...")
+                    extracted_text = ocr_service.extract_text_from_image(file_path)
+                    print(f"Extracted text length: {len(extracted_text)}")
+                
+                    # Generate summary
+                    structured = partial(chatgpt_service.get_summary_structured, extracted_text)
+                    prose = partial(chatgpt_service.get_summary, extracted_text)
+                
+                else:
+                    print("Processing document file...")
+                    # Extract text with chunking for large documents
+                    full_text = document_service.extract_text(file_path)
+                    print(f"Extracted text length: {len(full_text)}")
+                
+                    # Check if document is large and needs chunking
+                    if len(full_text) > 3000:
+                        print("Large document detected, using chunked processing...")
+                        text_chunks = document_service.extract_text_chunked(file_path)
+                        print(f"Split into {len(text_chunks)} chunks")
+                        structured = partial(chatgpt_service.get_chunked_summary_structured, text_chunks)
+                        prose = partial(chatgpt_service.get_chunked_summary, text_chunks)
+                    else:
+                        print("Small document, using direct processing...")
+                        structured = partial(chatgpt_service.get_summary_structured, full_text)
+                        prose = partial(chatgpt_service.get_summary, full_text)
+            
+                # JSON summary, or the text summary parsed into the same format
+                parsed_summary = generate_with_fallback(structured, prose, parse_summary_response)
+            
+                result = {
+                    "success": True,
+                    "filename": file.filename,
+                    "summary": parsed_summary,
+                    "text_preview": (extracted_text if 'extracted_text' in locals() else full_text)[:500] + "..." if len(extracted_text if 'extracted_text' in locals() else full_text) > 500 else (extracted_text if 'extracted_text' in locals() else full_text),
+                    "full_text_length": len(extracted_text if 'extracted_text' in locals() else full_text)
+                }
+                # An unparseable summary is returned but not stored for replay
+                if parsed_summary.get("english_summary"):
+                    await generation_store.save(user_id, "document_summary", source_hash, {}, result)
+                
+                return {**result, "cached": False}
+            
+            except Exception as e:
+                print(f"Error processing file: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+            
+            finally:
+                cleanup_file(file_path)
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate-questions")
+async def generate_questions_from_document(
+    file: UploadFile = File(...),
+    num_questions: int = 10,
+    regenerate: bool = False,
+    stream: bool = False,
+    user = Depends(get_current_user)
+):
+    """Generate practice questions from document with chunked processing.
+
+    Stored per user, file content and num_questions like /upload.
+    With stream=true the response is Server-Sent Events: a "question"
+    event as each question is generated, then "done" with the usual
+    response body (or "error").
+    """
+    try:
+        user_id = user["user"]["id"]
+        
+        print(f"Generating questions for user: {user_id}")
+        
+        # Validate file type
+        if not validate_file_type(file, ['text/', 'application/pdf', 'image/']):
+            raise HTTPException(status_code=400, detail="Invalid file type")
+        
+        source_hash = hash_upload_file(file)
+        params = {"num_questions": num_questions}
+        def replay(stored: dict):
+            return stored_question_events({**stored, "filename": file.filename, "cached": True}, stored["questions"])
+        
+        async with generation_store.single_flight(user_id, "document_questions", source_hash, params):
+            if not regenerate:
+                stored = await generation_store.lookup(user_id, "document_questions", source_hash, params)
+                if stored:
+                    return sse_response(replay(stored)) if stream else {**stored, "filename": file.filename, "cached": True}
+            
+            async def finish(parsed_questions: dict) -> dict:
+                result = {
+                    "success": True,
+                    "filename": file.filename,
+                    "questions": parsed_questions,
+                    "total_questions": len(parsed_questions.get("questions", []))
+                }
+                if result["total_questions"]:
+                    await generation_store.save(user_id, "document_questions", source_hash, params, result)
+                return {**result, "cached": False}
+            
+            file_path = save_upload_file(file)
+        
+            try:
+                # Extract text
+                if file.content_type.startswith('image/'):
+                    extracted_text = ocr_service.extract_text_from_image(file_path)
+                else:
+                    extracted_text = document_service.extract_text(file_path)
+            
+                print(f"Extracted text length for questions: {len(extracted_text)}")
+            
+                if stream:
+                    # Text is extracted now; generation runs as the response streams
+                    if len(extracted_text) > 4000:
+                        text_chunks = document_service.extract_text_chunked(file_path)
+                        deltas = chatgpt_service.stream_chunked_questions(text_chunks, num_questions)
+                    else:
+                        deltas = chatgpt_service.stream_questions(extracted_text, num_questions)
+                    return sse_response(generation_store.single_flight_stream(
+                        user_id, "document_questions", source_hash, params,
+                        question_events(deltas, finish), replay, regenerate
+                    ))
+            
+                # Generate questions with chunking for large documents
+                if len(extracted_text) > 4000:
+                    print("Large document detected, using chunked question generation...")
+                    text_chunks = document_service.extract_text_chunked(file_path)
+                    structured = partial(chatgpt_service.generate_chunked_questions_structured, text_chunks, num_questions)
+                    prose = partial(chatgpt_service.generate_chunked_questions, text_chunks, num_questions)
+                else:
+                    structured = partial(chatgpt_service.generate_questions_structured, extracted_text, num_questions)
+                    prose = partial(chatgpt_service.generate_questions, extracted_text, num_questions)
+            
+                return await finish(generate_with_fallback(structured, prose, parse_questions_response))
+            
+            except Exception as e:
+                print(f"Error generating questions: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Question generation error: {str(e)}")
+            
+            finally:
+                cleanup_file(file_path)
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Question generation endpoint error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate-questions-from-summary")
+async def generate_questions_from_summary(
+    summary: str,
+    num_questions: int = 10,
+    regenerate: bool = False,
+    user = Depends(get_current_user)
+):
+    """Generate practice questions from summary text"""
+    try:
+        user_id = user["user"]["id"]
+        print(f"Generating questions from summary for user: {user_id}")
+
+        if not summary or len(summary.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Summary text is required")
+
+        source_hash = hashlib.sha256(summary.strip().encode("utf-8")).hexdigest()
+        params = {"num_questions": num_questions}
+        async with generation_store.single_flight(user_id, "summary_questions", source_hash, params):
+            if not regenerate:
+                stored = await generation_store.lookup(user_id, "summary_questions", source_hash, params)
+                if stored:
+                    return {**stored, "cached": True}
+
+            # Generate questions directly from summary
+            parsed_questions = generate_with_fallback(
+                partial(chatgpt_service.generate_questions_structured, summary, num_questions),
+                partial(chatgpt_service.generate_questions, summary, num_questions),
+                parse_questions_response
+            )
+
+            result = {
+                "success": True,
+                "questions": parsed_questions,
+                "total_questions": len(parsed_questions.get("questions", []))
+            }
+            if result["total_questions"]:
+                await generation_store.save(user_id, "summary_questions", source_hash, params, result)
+
+            return {**result, "cached": False}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Summary question generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ocr")
+async def ocr_text(
+    file: UploadFile = File(...),
+    user = Depends(get_current_user)
+):
+    """Clean and structure OCR-extracted text from handwritten notes.
+
+    The output is a transcription rather than a summary, so it is
+    generated as text and parsed like the summary responses.
+    """
+    try:
+        user_id = user["user"]["id"]
+        
+        print(f"Processing OCR document for user: {user_id}")
+        
         # Validate file type
         if not validate_file_type(file, ['text/', 'application/pdf', 'image/']):
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOCX, TXT, and images are supported.")
@@ -51,24 +299,22 @@ async def upload_document(
                 extracted_text = ocr_service.extract_text_from_image(file_path)
                 print(f"Extracted text length: {len(extracted_text)}")
                 
-                # Generate summary
-                summary = chatgpt_service.get_summary(extracted_text)
+                summary = chatgpt_service.get_OCR(extracted_text)
                 
             else:
                 print("Processing document file...")
-                # Extract text with chunking for large documents
-                full_text = document_service.extract_text(file_path)
-                print(f"Extracted text length: {len(full_text)}")
+                extracted_text = document_service.extract_text(file_path)
+                print(f"Extracted text length: {len(extracted_text)}")
                 
                 # Check if document is large and needs chunking
-                if len(full_text) > 3000:
+                if len(extracted_text) > 3000:
                     print("Large document detected, using chunked processing...")
                     text_chunks = document_service.extract_text_chunked(file_path)
                     print(f"Split into {len(text_chunks)} chunks")
-                    summary = chatgpt_service.get_chunked_summary(text_chunks)
+                    summary = chatgpt_service.get_chunked_OCR(text_chunks)
                 else:
                     print("Small document, using direct processing...")
-                    summary = chatgpt_service.get_summary(full_text)
+                    summary = chatgpt_service.get_OCR(extracted_text)
             
             # Parse summary into structured format
             parsed_summary = parse_summary_response(summary)
@@ -77,8 +323,8 @@ async def upload_document(
                 "success": True,
                 "filename": file.filename,
                 "summary": parsed_summary,
-                "text_preview": (extracted_text if 'extracted_text' in locals() else full_text)[:500] + "..." if len(extracted_text if 'extracted_text' in locals() else full_text) > 500 else (extracted_text if 'extracted_text' in locals() else full_text),
-                "full_text_length": len(extracted_text if 'extracted_text' in locals() else full_text)
+                "text_preview": extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text,
+                "full_text_length": len(extracted_text)
             }
             
         except Exception as e:
@@ -91,97 +337,278 @@ async def upload_document(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Upload error: {str(e)}")
+        print(f"OCR error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/generate-questions")
-async def generate_questions_from_document(
-    file: UploadFile = File(...),
-    num_questions: int = 10,
+@router.post("/generate-questions-from-text")
+async def generate_questions_from_text_input(
+    text_data: dict = Body(...),
+    stream: bool = False,
     user = Depends(get_current_user)
 ):
-    """Generate practice questions from document with chunked processing"""
+    """Generate practice questions from text input (frontend text).
+
+    stream=true streams questions as Server-Sent Events like /generate-questions.
+    """
     try:
         user_id = user["user"]["id"]
+        print(f"Generating questions from text input for user: {user_id}")
+
+        # Extract text and optional number of questions from request body
+        text = text_data.get("text", "")
+        num_questions = text_data.get("num_questions", 10)
         
-        print(f"Generating questions for user: {user_id}")
+        if not isinstance(text, str) or len(text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Text input is required")
         
-        # Validate file type
-        if not validate_file_type(file, ['text/', 'application/pdf', 'image/']):
-            raise HTTPException(status_code=400, detail="Invalid file type")
+        if not isinstance(num_questions, int) or num_questions < 1 or num_questions > 20:
+            num_questions = 10  # Default to 10 if out of range
         
-        file_path = save_upload_file(file)
+        print(f"Generating {num_questions} questions from text input (length: {len(text)})")
         
-        try:
-            # Extract text
-            if file.content_type.startswith('image/'):
-                extracted_text = ocr_service.extract_text_from_image(file_path)
-            else:
-                extracted_text = document_service.extract_text(file_path)
-            
-            print(f"Extracted text length for questions: {len(extracted_text)}")
-            
-            # Generate questions with chunking for large documents
-            if len(extracted_text) > 4000:
-                print("Large document detected, using chunked question generation...")
-                text_chunks = document_service.extract_text_chunked(file_path)
-                questions = chatgpt_service.generate_chunked_questions(text_chunks, num_questions)
-            else:
-                questions = chatgpt_service.generate_questions(extracted_text, num_questions)
-            
-            # Parse questions into structured format
-            parsed_questions = parse_questions_response(questions)
-            
+        async def finish(parsed_questions: dict) -> dict:
             return {
                 "success": True,
-                "filename": file.filename,
                 "questions": parsed_questions,
-                "total_questions": len(parsed_questions.get("questions", []))
+                "total_questions": len(parsed_questions.get("questions", [])),
+                "input_text_preview": text[:200] + "..." if len(text) > 200 else text
             }
-            
-        except Exception as e:
-            print(f"Error generating questions: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Question generation error: {str(e)}")
-            
-        finally:
-            cleanup_file(file_path)
+        
+        if stream:
+            return sse_response(question_events(chatgpt_service.stream_questions(text, num_questions), finish))
+        
+        return await finish(generate_with_fallback(
+            partial(chatgpt_service.generate_questions_structured, text, num_questions),
+            partial(chatgpt_service.generate_questions_from_text_input, text, num_questions),
+            parse_questions_response
+        ))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error generating questions from text input: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/answer-question-from-document")
+async def answer_question_from_document(
+    question: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    session_id: Optional[str] = Form(None),
+    user = Depends(get_current_user)
+):
+    """Answer a specific question based on the uploaded document content.
+
+    Send the file, or the session_id returned with an earlier answer (or by
+    POST /sessions) to skip the upload and text extraction. Every answer
+    includes the session_id to use for follow-up questions.
+    """
+    try:
+        user_id = user["user"]["id"]
+        print(f"Answering question from document for user: {user_id}")
+        
+        if not question or len(question.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Question is required")
+        
+        if session_id:
+            session = get_document_session(user_id, session_id)
+        elif file is not None:
+            # Extraction (OCR) and the LLM call block, so they run in threads
+            session = await asyncio.to_thread(open_document_session, user_id, file)
+        else:
+            raise HTTPException(status_code=400, detail="A file or session_id is required")
+        
+        return await asyncio.to_thread(answer_from_session, session, question)
             
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Question generation endpoint error: {str(e)}")
+        print(f"Question answering endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/generate-questions-from-summary")
-async def generate_questions_from_summary(
-    summary: str,
-    num_questions: int = 10,
+@router.post("/sessions")
+async def create_document_session(
+    file: UploadFile = File(...),
     user = Depends(get_current_user)
 ):
-    """Generate practice questions from summary text"""
+    """Upload a document once for several questions.
+
+    The extracted text and its retrieval index are kept for
+    DOCUMENT_SESSION_TTL_SECONDS after the last question; ask with
+    POST /sessions/{session_id}/questions.
+    """
     try:
         user_id = user["user"]["id"]
-        print(f"Generating questions from summary for user: {user_id}")
+        print(f"Opening document session for user: {user_id}")
+        session = await asyncio.to_thread(open_document_session, user_id, file)
+        return {"success": True, **session.info()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Document session error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if not summary or len(summary.strip()) == 0:
-            raise HTTPException(status_code=400, detail="Summary text is required")
+@router.get("/sessions/{session_id}")
+async def get_document_session_info(session_id: str, user = Depends(get_current_user)):
+    session = get_document_session(user["user"]["id"], session_id)
+    return {"success": True, **session.info()}
 
-        # Generate questions directly from summary
-        questions = chatgpt_service.generate_questions(summary, num_questions)
+@router.post("/sessions/{session_id}/questions")
+async def ask_document_session(
+    session_id: str,
+    request: DocumentQuestionRequest,
+    user = Depends(get_current_user)
+):
+    """Answer a question about a session's document"""
+    try:
+        if not request.question.strip():
+            raise HTTPException(status_code=400, detail="Question is required")
+        
+        session = get_document_session(user["user"]["id"], session_id)
+        return await asyncio.to_thread(answer_from_session, session, request.question)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Question answering endpoint error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Parse questions into structured format
-        parsed_questions = parse_questions_response(questions)
+@router.post("/sessions/{session_id}/questions/batch")
+async def ask_document_session_batch(
+    session_id: str,
+    request: DocumentBatchQuestionRequest,
+    user = Depends(get_current_user)
+):
+    """Answer many questions about a session's document in a few LLM calls.
 
+    Questions that need the same passages share one request and one copy
+    of the context (see DocumentIndex.pack); answers are returned in the
+    order of the questions.
+    """
+    try:
+        questions = [question.strip() for question in request.questions]
+        if not all(questions):
+            raise HTTPException(status_code=400, detail="Questions must not be empty")
+        
+        session = get_document_session(user["user"]["id"], session_id)
+        answers = await answer_batch_from_session(session, questions)
         return {
             "success": True,
-            "questions": parsed_questions,
-            "total_questions": len(parsed_questions.get("questions", []))
+            "session_id": session.id,
+            "filename": session.filename,
+            "total_questions": len(questions),
+            "answers": [{"question": question, "answer": answer} for question, answer in zip(questions, answers)]
         }
-
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Summary question generation error: {str(e)}")
+        print(f"Batch question answering error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.delete("/sessions/{session_id}")
+async def close_document_session(session_id: str, user = Depends(get_current_user)):
+    if not document_sessions.delete(user["user"]["id"], session_id):
+        raise HTTPException(status_code=404, detail="Document session not found or expired")
+    return {"success": True, "session_id": session_id}
+
+def open_document_session(user_id: str, file: UploadFile) -> DocumentSession:
+    """Session for an uploaded file: the live one for the same content, or a new one"""
+    if not validate_file_type(file, ['text/', 'application/pdf', 'image/']):
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    
+    source_hash = hash_upload_file(file)
+    session = document_sessions.find_by_source(user_id, source_hash)
+    if session is not None:
+        return session
+    
+    file_path = save_upload_file(file)
+    try:
+        # Extract text from document
+        if file.content_type.startswith('image/'):
+            extracted_text = ocr_service.extract_text_from_image(file_path)
+        else:
+            extracted_text = document_service.extract_text(file_path)
+        print(f"Extracted text length: {len(extracted_text)}")
+    except Exception as e:
+        print(f"Error extracting document text: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Text extraction error: {str(e)}")
+    finally:
+        cleanup_file(file_path)
+    
+    return document_sessions.create(user_id, file.filename, source_hash, extracted_text)
+
+def get_document_session(user_id: str, session_id: str) -> DocumentSession:
+    session = document_sessions.get(user_id, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Document session not found or expired")
+    return session
+
+async def answer_batch_from_session(session: DocumentSession, questions: List[str]) -> List[dict]:
+    """Parsed answers for questions, in order.
+
+    Packed groups are answered concurrently as JSON; any question a group
+    didn't answer (or every question, without structured output) is then
+    asked on its own.
+    """
+    unique = list(dict.fromkeys(questions))  # Repeated questions are answered once
+    answers: Dict[str, dict] = {}
+    
+    if settings.LLM_STRUCTURED_OUTPUT:
+        groups = session.index.pack(unique, settings.BATCH_ANSWER_CONTEXT_CHARS, settings.BATCH_ANSWER_QUESTIONS_PER_CALL)
+        print(f"📚 Answering {len(unique)} questions in {len(groups)} packed call(s)")
+        results = await asyncio.gather(*[
+            asyncio.to_thread(answer_question_group, session, [unique[i] for i in members], positions)
+            for members, positions in groups
+        ])
+        for result in results:
+            answers.update(result)
+    
+    missing = [question for question in unique if question not in answers]
+    if missing and settings.LLM_STRUCTURED_OUTPUT:
+        print(f"Answering {len(missing)} remaining question(s) one by one")
+    for question in missing:
+        response = await asyncio.to_thread(answer_from_session, session, question)
+        answers[question] = response["answer"]
+    
+    return [answers[question] for question in questions]
+
+def answer_question_group(session: DocumentSession, questions: List[str], positions: List[int]) -> Dict[str, dict]:
+    """Answers by question for one packed call.
+
+    Returns {} if the call failed or its JSON was unusable, so one bad group
+    doesn't discard the others; its questions are then asked one by one.
+    """
+    try:
+        answered = chatgpt_service.answer_questions_structured(session.index.context(positions), questions)
+    except StructuredOutputError as e:
+        print(f"Packed answer failed for {len(questions)} questions: {str(e)}")
+        return {}
+    except Exception as e:
+        print(f"Packed answer request failed for {len(questions)} questions: {str(e)}")
+        return {}
+    return {questions[i]: answer.to_dict() for i, answer in answered.items()}
+
+def answer_from_session(session: DocumentSession, question: str) -> dict:
+    print(f"Question: {question}")
+    try:
+        # Answer from the passages relevant to the question, not just the first pages
+        context = session.index.context_for(question)
+        parsed_answer = generate_with_fallback(
+            partial(chatgpt_service.answer_question_structured, context, question),
+            partial(chatgpt_service.answer_question_from_document, context, question),
+            parse_answer_response
+        )
+    except Exception as e:
+        print(f"Error processing question: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Question answering error: {str(e)}")
+    
+    return {
+        "success": True,
+        "session_id": session.id,
+        "filename": session.filename,
+        "question": question,
+        "answer": parsed_answer,
+        "document_preview": session.text[:300] + "..." if len(session.text) > 300 else session.text
+    }
+
 
 
 def parse_summary_response(summary_text: str) -> dict:
@@ -288,4 +715,62 @@ def parse_questions_response(questions_text: str) -> dict:
             "questions": ["Question parsing failed"],
             "answers": ["Answer parsing failed"],
             "full_text": questions_text
-        }
\ No newline at end of file
+        }
+
+def parse_answer_response(answer_text: str) -> dict:
+    """Parse the answer response into structured format"""
+    try:
+        lines = answer_text.split('\n')
+        sections = {
+            "answer": "",
+            "source_reference": "",
+            "confidence_level": "Medium",
+            "full_response": answer_text
+        }
+        
+        current_section = None
+        
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+                
+            if "ANSWER:" in line:
+                current_section = "answer"
+                sections["answer"] = line.replace("ANSWER:", "").strip()
+            elif "SOURCE REFERENCE:" in line or "SOURCE REFERENCE (if available):" in line:
+                current_section = "source"
+                sections["source_reference"] = line.replace("SOURCE REFERENCE:", "").replace("SOURCE REFERENCE (if available):", "").strip()
+            elif "CONFIDENCE LEVEL:" in line:
+                current_section = "confidence"
+                sections["confidence_level"] = line.replace("CONFIDENCE LEVEL:", "").strip()
+            elif current_section == "answer" and not line.startswith("SOURCE REFERENCE:") and not line.startswith("CONFIDENCE LEVEL:"):
+                sections["answer"] += " " + line
+            elif current_section == "source" and not line.startswith("CONFIDENCE LEVEL:"):
+                sections["source_reference"] += " " + line
+            elif current_section == "confidence":
+                sections["confidence_level"] = line
+        
+        # Clean up sections
+        sections["answer"] = sections["answer"].strip()
+        sections["source_reference"] = sections["source_reference"].strip()
+        
+        # If confidence level not found, try to detect from text
+        if sections["confidence_level"] == "Medium":
+            answer_lower = sections["answer"].lower()
+            if "not covered" in answer_lower or "not found" in answer_lower or "not in the document" in answer_lower:
+                sections["confidence_level"] = "Low"
+            elif "clearly" in answer_lower or "specifically" in answer_lower or "according to" in answer_lower:
+                sections["confidence_level"] = "High"
+        
+        return sections
+        
+    except Exception as e:
+        print(f"Error parsing answer: {str(e)}")
+        # Fallback if parsing fails
+        return {
+            "answer": answer_text,
+            "source_reference": "",
+            "confidence_level": "Medium",
+            "full_response": answer_text
+        }
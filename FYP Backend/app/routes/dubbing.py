@@ -1,31 +1,67 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Header
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.services.dubbing_service import DubbingService
 from app.services.auth_service import AuthService
-import os
-import uuid
+from app.database.job_queue import job_queue
+from app.workers.dubbing_jobs import DUBBED_AUDIO_FILENAME, DUBBING_JOB
+from app.utils.workspace import DiskQuotaExceeded, JobWorkspace, check_disk_quota
+from app.utils.http_range import CHUNK_SIZE, range_file_response
+from app.utils.sse import format_sse, sse_response
 import asyncio
+import os
+import time
 
 router = APIRouter()
-dubbing_service = DubbingService()
 auth_service = AuthService()
 
-# Store dubbing status in memory
-dubbing_status = {}
-
 # ✅ Request model to accept JSON body
 class DubbingRequest(BaseModel):
     video_url: str
     target_language: str = "Urdu"
 
+def authenticate(authorization: str = None, token: str = None) -> dict:
+    """Verify the bearer token from the header, or from ?token= for media elements that can't set headers"""
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.replace("Bearer ", "")
+    if not token:
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+    return auth_service.get_current_user(token)
+
+def get_owned_job(job_id: str, user: dict) -> dict:
+    job = job_queue.get(job_id)
+    if not job or job["kind"] != DUBBING_JOB:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Check if user owns this job
+    if job["user_id"] != user["user"]["id"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return job
+
+def job_status(job: dict) -> dict:
+    """Shape a queue job into the status payload clients poll for"""
+    result = job.get("result") or {}
+    return {
+        # Queued, running and retrying jobs all report "processing" to clients
+        "status": job["status"] if job["status"] in ("completed", "error") else "processing",
+        "stage": job["stage"],
+        "progress": job["progress"],
+        "video_url": job["payload"].get("video_url"),
+        "user_id": job["user_id"],
+        "attempts": job["attempts"],
+        "error": job["error"] if job["status"] == "error" else None,
+        "audio_file": result.get("audio_file"),
+        "download_url": result.get("download_url"),
+        # Playable while the job is still running
+        "stream_url": f"/dubbing/stream/{job['id']}" if job["status"] != "error" else None,
+        "stats": result.get("stats")
+    }
+
 @router.post("/create")
 async def create_dubbed_video(
     request: DubbingRequest,
-    authorization: str = Header(None),
-    background_tasks: BackgroundTasks = None
+    authorization: str = Header(None)
 ):
-    """Create dubbed audio for YouTube video with background processing"""
+    """Queue a dubbing job for a YouTube video; a worker process picks it up"""
     try:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -39,28 +75,14 @@ async def create_dubbed_video(
 
         print(f"🎬 Creating dubbed video for user: {user_id}, video: {video_url}")
 
-        # Generate unique job ID
-        job_id = str(uuid.uuid4())
-        dubbing_status[job_id] = {
-            "status": "processing",
-            "progress": 0,
-            "video_url": video_url,
-            "user_id": user_id,
-            "error": None,
-            "audio_file": None
-        }
+        # Refuse new work rather than fail halfway through a long job
+        check_disk_quota()
 
-        # Start background processing
-        if background_tasks:
-            background_tasks.add_task(
-                process_dubbing_job,
-                job_id,
-                video_url,
-                target_language
-            )
-        else:
-            # Immediate processing (for testing)
-            asyncio.create_task(process_dubbing_job(job_id, video_url, target_language))
+        job_id = job_queue.enqueue(
+            DUBBING_JOB,
+            {"video_url": video_url, "target_language": target_language},
+            user_id=user_id
+        )
 
         return {
             "success": True,
@@ -69,6 +91,11 @@ async def create_dubbed_video(
             "message": "Dubbing process started"
         }
 
+    except HTTPException:
+        raise
+    except DiskQuotaExceeded as e:
+        print(f"⚠️ Dubbing refused, disk quota exceeded: {str(e)}")
+        raise HTTPException(status_code=507, detail=f"Server storage is full, please try again later: {str(e)}")
     except Exception as e:
         print(f"❌ Dubbing creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -83,19 +110,12 @@ async def get_dubbing_status(job_id: str, authorization: str = Header(None)):
         
         token = authorization.replace("Bearer ", "")
         user = auth_service.get_current_user(token)
-
-        status = dubbing_status.get(job_id)
-        if not status:
-            raise HTTPException(status_code=404, detail="Job not found")
-
-        # Check if user owns this job
-        if status.get("user_id") != user["user"]["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
+        job = get_owned_job(job_id, user)
 
         return {
             "success": True,
             "job_id": job_id,
-            **status
+            **job_status(job)
         }
     except HTTPException:
         raise
@@ -104,25 +124,85 @@ async def get_dubbing_status(job_id: str, authorization: str = Header(None)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/download/{filename}")
-async def download_dubbed_audio(filename: str, authorization: str = Header(None)):
-    """Download dubbed audio file"""
+@router.get("/events/{job_id}")
+async def stream_dubbing_events(
+    job_id: str,
+    request: Request,
+    authorization: str = Header(None),
+    token: str = Query(None),
+    last_event_id: str = Header(None)
+):
+    """Server-Sent Events feed of a job's progress.
+
+    Authenticates once, then pushes a 'status' snapshot, every 'stage' and
+    'progress' event (with segment counts and ETA) as the worker records it,
+    and a final 'completed' or 'error' event before closing. Reconnecting
+    clients resume after the Last-Event-ID they received.
+    """
     try:
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Invalid authorization header")
+        user = authenticate(authorization, token)
+        job = get_owned_job(job_id, user)
+        after_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
 
-        token = authorization.replace("Bearer ", "")
-        auth_service.get_current_user(token)  # Verify token
+        return sse_response(job_event_stream(request, job, after_id))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"⚠️ Event stream error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        file_path = f"app/temp_uploads/{filename}"
 
-        if not os.path.exists(file_path):
+async def job_event_stream(request: Request, job: dict, after_id: int = 0,
+                           poll_seconds: float = 0.5, keepalive_seconds: float = 15):
+    """Relay a job's event log from the queue database to one SSE client"""
+    job_id = job["id"]
+    yield format_sse("status", {"job_id": job_id, **job_status(job)})
+    last_sent = time.monotonic()
+
+    while not await request.is_disconnected():
+        # sqlite calls block, so every open stream polls from a thread
+        for event in await asyncio.to_thread(job_queue.get_events, job_id, after_id):
+            after_id = event["id"]
+            yield format_sse(event["event"], event["data"], event["id"])
+            last_sent = time.monotonic()
+
+        job = await asyncio.to_thread(job_queue.get, job_id)
+        if not job or job["status"] in ("completed", "error"):
+            final = job_status(job) if job else {"status": "error", "error": "Job not found"}
+            yield format_sse(final["status"], {"job_id": job_id, **final})
+            return
+
+        if time.monotonic() - last_sent >= keepalive_seconds:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(poll_seconds)
+
+
+@router.get("/download/{job_id}")
+async def download_dubbed_audio(
+    job_id: str,
+    request: Request,
+    authorization: str = Header(None),
+    token: str = Query(None)
+):
+    """Download dubbed audio of a completed job; supports Range requests for seeking"""
+    try:
+        user = authenticate(authorization, token)
+        job = get_owned_job(job_id, user)
+
+        file_path = (job.get("result") or {}).get("audio_file")
+        if job["status"] != "completed" or not file_path:
             raise HTTPException(status_code=404, detail="File not found")
 
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='audio/mpeg'
+        # Outputs are deleted by the janitor after the retention period
+        if not os.path.exists(file_path):
+            raise HTTPException(status_code=410, detail="Dubbed audio has expired, please create it again")
+
+        return range_file_response(
+            request,
+            file_path,
+            media_type='audio/mpeg',
+            filename=f"dubbed_audio_{job_id[:8]}.mp3"
         )
     except HTTPException:
         raise
@@ -131,33 +211,71 @@ async def download_dubbed_audio(filename: str, authorization: str = Header(None)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def process_dubbing_job(job_id: str, video_url: str, target_language: str):
-    """Background task to process dubbing"""
+@router.get("/stream/{job_id}")
+async def stream_dubbed_audio(
+    job_id: str,
+    request: Request,
+    authorization: str = Header(None),
+    token: str = Query(None)
+):
+    """Play dubbed audio while it is being created.
+
+    While the job runs, the response follows the growing MP3 until the job
+    finishes. Once completed, the file is served with Range support.
+    """
     try:
-        dubbing_status[job_id]["progress"] = 10
-        dubbing_status[job_id]["status"] = "extracting_transcript"
+        user = authenticate(authorization, token)
+        job = get_owned_job(job_id, user)
+
+        if job["status"] == "error":
+            raise HTTPException(status_code=404, detail="File not found")
+
+        if job["status"] == "completed":
+            file_path = (job.get("result") or {}).get("audio_file")
+            if not file_path or not os.path.exists(file_path):
+                raise HTTPException(status_code=410, detail="Dubbed audio has expired, please create it again")
+            return range_file_response(request, file_path, media_type='audio/mpeg')
+
+        file_path = JobWorkspace(job_id).output_path(DUBBED_AUDIO_FILENAME)
+        return StreamingResponse(
+            follow_growing_file(job_id, file_path),
+            media_type='audio/mpeg',
+            headers={"Cache-Control": "no-cache"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"⚠️ Stream error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        print(f"🧾 Extracting transcript for job {job_id}...")
 
-        # Create synchronized audio
-        print(f"🎧 Creating synchronized audio for job {job_id}...")
-        dubbing_status[job_id]["progress"] = 50
-        dubbing_status[job_id]["status"] = "creating_audio"
+async def follow_growing_file(job_id: str, file_path: str, poll_seconds: float = 1.0):
+    """Yield a file's bytes as they are written, until its job stops running.
 
-        audio_file_path = await dubbing_service.create_synchronized_audio(video_url, target_language)
+    File reads and queue polls run in threads, so listeners never block the loop.
+    """
+    offset = 0
+    while True:
+        data = await asyncio.to_thread(read_chunk, file_path, offset)
+        if data:
+            offset += len(data)
+            yield data
+            continue
 
-        dubbing_status[job_id].update({
-            "status": "completed",
-            "progress": 100,
-            "audio_file": audio_file_path,
-            "download_url": f"/dubbing/download/{os.path.basename(audio_file_path)}"
-        })
+        # Caught up with the encoder; stop once nothing more will be written.
+        # A retried attempt rewrites the file from the start, so end there too.
+        job = await asyncio.to_thread(job_queue.get, job_id)
+        finished = not job or job["status"] in ("completed", "error") or job["stage"] == "retrying"
+        if not finished:
+            await asyncio.sleep(poll_seconds)
+        elif not await asyncio.to_thread(read_chunk, file_path, offset, 1):
+            return
 
-        print(f"✅ Dubbing completed for job {job_id}: {audio_file_path}")
 
-    except Exception as e:
-        print(f"❌ Dubbing processing error for job {job_id}: {str(e)}")
-        dubbing_status[job_id].update({
-            "status": "error",
-            "error": str(e)
-        })
+def read_chunk(file_path: str, offset: int, size: int = CHUNK_SIZE) -> bytes:
+    """Up to size bytes of a file from offset (nothing if it doesn't exist yet)"""
+    if not os.path.exists(file_path):
+        return b""
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.security import HTTPBearer
+from functools import partial
 from typing import Optional
 import os
 
@@ -7,7 +8,11 @@ from app.services.document_service import DocumentService
 from app.services.ocr_service import OCRService
 from app.services.chatgpt_service import ChatGPTService
 from app.services.auth_service import AuthService
-from app.utils.file_handling import save_upload_file, cleanup_file, validate_file_type
+from app.services.generation_store import generation_store, combined_hash
+from app.services.structured_output import generate_with_fallback
+from app.services.question_stream import question_events, stored_question_events
+from app.utils.file_handling import save_upload_file, cleanup_file, validate_file_type, hash_upload_file
+from app.utils.sse import sse_response
 
 router = APIRouter()
 document_service = DocumentService()
@@ -29,9 +34,18 @@ async def analyze_past_papers(
     study_material_file: UploadFile = File(...),
     past_paper_file: UploadFile = File(...),
     num_questions: int = 10,
+    regenerate: bool = False,
+    stream: bool = False,
     user = Depends(get_current_user)
 ):
-    """Analyze past papers and generate questions based on patterns"""
+    """Analyze past papers and generate questions based on patterns.
+
+    The analysis is stored per user, pair of files and num_questions; the
+    same request again returns it (cached: true) unless regenerate=true.
+    With stream=true the response is Server-Sent Events: "analysis", then
+    a "question" event as each question is generated, then "done" with the
+    usual response body (or "error").
+    """
     try:
         user_id = user["user"]["id"]
         
@@ -43,64 +57,91 @@ async def analyze_past_papers(
         if not validate_file_type(past_paper_file, ['text/', 'application/pdf', 'image/']):
             raise HTTPException(status_code=400, detail="Invalid past paper file type")
         
-        # Save files
-        study_material_path = save_upload_file(study_material_file)
-        past_paper_path = save_upload_file(past_paper_file)
+        source_hash = combined_hash(hash_upload_file(study_material_file), hash_upload_file(past_paper_file))
+        params = {"num_questions": num_questions}
+        def cached_response(stored: dict) -> dict:
+            return {
+                **stored,
+                "study_material_filename": study_material_file.filename,
+                "past_paper_filename": past_paper_file.filename,
+                "cached": True
+            }
+        
+        def replay(stored: dict):
+            return stored_question_events(cached_response(stored), stored["analysis"])
         
-        try:
-            # Extract text from study material (with chunking for large files)
-            print("Extracting text from study material...")
-            if study_material_file.content_type.startswith('image/'):
-                study_material_text = ocr_service.extract_text_from_image(study_material_path)
-            else:
-                study_material_text = document_service.extract_text(study_material_path)
+        async with generation_store.single_flight(user_id, "past_paper_analysis", source_hash, params):
+            if not regenerate:
+                stored = await generation_store.lookup(user_id, "past_paper_analysis", source_hash, params)
+                if stored:
+                    return sse_response(replay(stored)) if stream else cached_response(stored)
             
-            print(f"Study material text length: {len(study_material_text)}")
+            # Save files
+            study_material_path = save_upload_file(study_material_file)
+            past_paper_path = save_upload_file(past_paper_file)
+        
+            try:
+                # Extract text from study material (with chunking for large files)
+                print("Extracting text from study material...")
+                if study_material_file.content_type.startswith('image/'):
+                    study_material_text = ocr_service.extract_text_from_image(study_material_path)
+                else:
+                    study_material_text = document_service.extract_text(study_material_path)
             
-            # Extract text from past paper (usually smaller)
-            print("Extracting text from past paper...")
-            if past_paper_file.content_type.startswith('image/'):
-                past_paper_text = ocr_service.extract_text_from_image(past_paper_path)
-            else:
-                past_paper_text = document_service.extract_text(past_paper_path)
+                print(f"Study material text length: {len(study_material_text)}")
             
-            print(f"Past paper text length: {len(past_paper_text)}")
+                # Extract text from past paper (usually smaller)
+                print("Extracting text from past paper...")
+                if past_paper_file.content_type.startswith('image/'):
+                    past_paper_text = ocr_service.extract_text_from_image(past_paper_path)
+                else:
+                    past_paper_text = document_service.extract_text(past_paper_path)
             
-            # Handle large study materials with chunking
-            if len(study_material_text) > 8000:
-                print("Large study material detected, using chunked processing...")
-                study_chunks = document_service.extract_text_chunked(study_material_path)
-                # Use first few chunks for analysis (most important content)
-                study_material_text = " ".join(study_chunks[:5])
-                print(f"Using first {len(study_chunks[:5])} chunks of study material")
+                print(f"Past paper text length: {len(past_paper_text)}")
             
-            # Analyze with ChatGPT
-            print("Analyzing with ChatGPT...")
-            analysis_result = chatgpt_service.analyze_past_papers(
-                study_material_text, 
-                past_paper_text, 
-                num_questions
-            )
+                # Handle large study materials with chunking
+                if len(study_material_text) > 8000:
+                    print("Large study material detected, using chunked processing...")
+                    study_chunks = document_service.extract_text_chunked(study_material_path)
+                    # Use first few chunks for analysis (most important content)
+                    study_material_text = " ".join(study_chunks[:5])
+                    print(f"Using first {len(study_chunks[:5])} chunks of study material")
             
-            # Parse the response
-            parsed_result = parse_past_paper_analysis(analysis_result)
+                async def finish(parsed_result: dict) -> dict:
+                    result = {
+                        "success": True,
+                        "study_material_filename": study_material_file.filename,
+                        "past_paper_filename": past_paper_file.filename,
+                        "analysis": parsed_result,
+                        "study_material_length": len(study_material_text),
+                        "past_paper_length": len(past_paper_text)
+                    }
+                    if parsed_result.get("questions"):
+                        await generation_store.save(user_id, "past_paper_analysis", source_hash, params, result)
+                    return {**result, "cached": False}
             
-            return {
-                "success": True,
-                "study_material_filename": study_material_file.filename,
-                "past_paper_filename": past_paper_file.filename,
-                "analysis": parsed_result,
-                "study_material_length": len(study_material_text),
-                "past_paper_length": len(past_paper_text)
-            }
+                # Analyze with ChatGPT
+                print("Analyzing with ChatGPT...")
+                if stream:
+                    deltas = chatgpt_service.stream_past_paper_analysis(study_material_text, past_paper_text, num_questions)
+                    return sse_response(generation_store.single_flight_stream(
+                        user_id, "past_paper_analysis", source_hash, params,
+                        question_events(deltas, finish, with_analysis=True), replay, regenerate
+                    ))
+            
+                return await finish(generate_with_fallback(
+                    partial(chatgpt_service.analyze_past_papers_structured, study_material_text, past_paper_text, num_questions),
+                    partial(chatgpt_service.analyze_past_papers, study_material_text, past_paper_text, num_questions),
+                    parse_past_paper_analysis
+                ))
             
-        except Exception as e:
-            print(f"Error in past paper analysis: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
+            except Exception as e:
+                print(f"Error in past paper analysis: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
             
-        finally:
-            cleanup_file(study_material_path)
-            cleanup_file(past_paper_path)
+            finally:
+                cleanup_file(study_material_path)
+                cleanup_file(past_paper_path)
             
     except HTTPException:
         raise
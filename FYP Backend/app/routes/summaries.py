@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from pydantic import BaseModel, conlist
+from typing import Optional, List, Tuple
 from datetime import datetime
+import base64
+import json
+import re
+from app.config import settings
 from app.services.auth_service import AuthService
-from app.database.supabase_client import supabase
+from app.database.repositories import summary_repository
+from app.services.summary_search_service import summary_search
+from app.services.summary_cache import summary_cache
 
 router = APIRouter()
 auth_service = AuthService()
@@ -21,6 +27,12 @@ class SummaryUpdateRequest(BaseModel):
     content: Optional[str] = None
     source_text: Optional[str] = None
 
+class SummaryBulkCreateRequest(BaseModel):
+    summaries: conlist(SummaryCreateRequest, min_items=1, max_items=settings.SUMMARY_BULK_MAX_ITEMS)
+
+class SummaryBulkDeleteRequest(BaseModel):
+    ids: conlist(int, min_items=1, max_items=settings.SUMMARY_BULK_MAX_ITEMS)
+
 class SummaryResponse(BaseModel):
     id: int
     title: str
@@ -35,6 +47,30 @@ class SummaryResponse(BaseModel):
     class Config:
         from_attributes = True
 
+_CURSOR_TIMESTAMP = re.compile(r"^[0-9T:.+\- Z]+$")
+
+def encode_cursor(key: Tuple[str, int]) -> str:
+    """Opaque page cursor for the (created_at, id) of the last row returned"""
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, summary_id = json.loads(raw)
+        if not isinstance(created_at, str) or not _CURSOR_TIMESTAMP.match(created_at):
+            raise ValueError(created_at)
+        return created_at, int(summary_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
 def handle_table_error(e):
     """Handle table not found errors gracefully"""
     error_msg = str(e)
@@ -43,13 +79,25 @@ def handle_table_error(e):
             "success": True,
             "summaries": [],
             "count": 0,
+            "next_cursor": None,
+            "has_more": False,
             "message": "No summaries table found. Table will be created when you generate your first summary."
         }
     raise e
 
 @router.get("/", response_model=dict)
-async def get_user_summaries(authorization: str = Header(None)):
-    """Get all summaries for current user"""
+async def get_user_summaries(
+    limit: int = Query(settings.SUMMARY_PAGE_SIZE, ge=1, le=settings.SUMMARY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_content: bool = False,
+    authorization: str = Header(None)
+):
+    """Get one page of the current user's summaries, newest first.
+
+    Rows carry a short preview instead of the full body (fetch that with
+    GET /summaries/{id}); include_content=true adds content and source_text
+    for exports. Pass next_cursor back as cursor to get the following page.
+    """
     try:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -57,30 +105,19 @@ async def get_user_summaries(authorization: str = Header(None)):
         token = authorization.replace("Bearer ", "")
         user_data = auth_service.get_current_user(token)
         
-        # Get summaries from Supabase
-        result = supabase.table("summaries").select("*").eq("user_id", user_data["user"]["id"]).execute()
-        
-        if result.data:
-            summaries = [
-                SummaryResponse(
-                    id=summary["id"],
-                    title=summary["title"],
-                    content=summary["content"],
-                    source_text=summary.get("source_text"),
-                    source_type=summary["source_type"],
-                    user_id=summary["user_id"],
-                    document_id=summary.get("document_id"),
-                    created_at=summary["created_at"],
-                    updated_at=summary["updated_at"]
-                ) for summary in result.data
-            ]
-        else:
-            summaries = []
+        rows, next_key = await summary_repository.list_page(
+            user_data["user"]["id"],
+            limit,
+            after=decode_cursor(cursor) if cursor else None,
+            include_content=include_content
+        )
         
         return {
             "success": True, 
-            "summaries": summaries,
-            "count": len(summaries)
+            "summaries": rows,
+            "count": len(rows),
+            "next_cursor": encode_cursor(next_key) if next_key else None,
+            "has_more": next_key is not None
         }
         
     except Exception as e:
@@ -97,20 +134,15 @@ async def create_summary(request: SummaryCreateRequest, authorization: str = Hea
         token = authorization.replace("Bearer ", "")
         user_data = auth_service.get_current_user(token)
         
-        # Insert summary into Supabase
-        result = supabase.table("summaries").insert({
+        summary_data = await summary_repository.create(user_data["user"]["id"], {
             "title": request.title,
             "content": request.content,
             "source_text": request.source_text,
             "source_type": request.source_type,
-            "user_id": user_data["user"]["id"],
-            "document_id": request.document_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
-        }).execute()
+            "document_id": request.document_id
+        })
         
-        if result.data:
-            summary_data = result.data[0]
+        if summary_data:
             summary = SummaryResponse(
                 id=summary_data["id"],
                 title=summary_data["title"],
@@ -141,19 +173,117 @@ async def create_summary(request: SummaryCreateRequest, authorization: str = Hea
             }
         raise HTTPException(status_code=400, detail=str(e))
 
-# For other routes, return empty responses until table exists
+@router.post("/bulk", response_model=dict)
+async def create_summaries(request: SummaryBulkCreateRequest, authorization: str = Header(None)):
+    """Create several summaries with one multi-row insert.
+
+    Either all of them are saved or none are; the response lists them in
+    request order.
+    """
+    try:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+
+        rows = await summary_repository.create_many(
+            user_data["user"]["id"],
+            [item.dict() for item in request.summaries]
+        )
+        if len(rows) != len(request.summaries):
+            raise Exception("Failed to create summaries")
+
+        return {
+            "success": True,
+            "summaries": [SummaryResponse(**row) for row in rows],
+            "count": len(rows),
+            "message": f"{len(rows)} summaries created successfully"
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if "PGRST205" in error_msg or "table" in error_msg.lower() and "not found" in error_msg.lower():
+            return {
+                "success": False,
+                "message": "Summaries table not found. Please create the table in your Supabase database first."
+            }
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/bulk", response_model=dict)
+async def delete_summaries(request: SummaryBulkDeleteRequest, authorization: str = Header(None)):
+    """Delete several of the current user's summaries by id in one statement"""
+    try:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+
+        requested = list(dict.fromkeys(request.ids))
+        deleted = await summary_repository.delete_many(user_data["user"]["id"], requested)
+        deleted_set = set(deleted)
+
+        return {
+            "success": True,
+            "deleted_ids": sorted(deleted),
+            "not_found": [summary_id for summary_id in requested if summary_id not in deleted_set],
+            "count": len(deleted),
+            "message": f"{len(deleted)} summaries deleted successfully."
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return handle_table_error(e)
+
 @router.get("/{summary_id}", response_model=dict)
-async def get_summary(summary_id: int, authorization: str = Header(None)):
-    """Get specific summary"""
+async def get_summary(summary_id: int, response: Response, authorization: str = Header(None),
+                      if_none_match: Optional[str] = Header(None)):
+    """Get specific summary.
+
+    Served through the per-user summary cache; responses carry an ETag and
+    a matching If-None-Match gets 304 Not Modified without a body.
+    """
     try:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Invalid authorization header")
-        
+
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+
+        summary_data, etag = await summary_cache.get(user_data["user"]["id"], summary_id)
+        if not summary_data:
+            return {
+                "success": False,
+                "message": "Summary not found or you don't have permission to view it"
+            }
+
+        # Private: the body is per user; no-cache: clients must revalidate with the ETag
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=cache_headers)
+        response.headers.update(cache_headers)
+
         return {
-            "success": False,
-            "message": "Summaries table not available yet."
+            "success": True,
+            "summary": SummaryResponse(
+                id=summary_data["id"],
+                title=summary_data["title"],
+                content=summary_data["content"],
+                source_text=summary_data.get("source_text"),
+                source_type=summary_data["source_type"],
+                user_id=summary_data["user_id"],
+                document_id=summary_data.get("document_id"),
+                created_at=summary_data["created_at"],
+                updated_at=summary_data["updated_at"]
+            )
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         return handle_table_error(e)
 
@@ -168,7 +298,7 @@ async def update_summary(summary_id: int, request: SummaryUpdateRequest, authori
         user_data = auth_service.get_current_user(token)
         
         # Build update data
-        update_data = {"updated_at": datetime.utcnow().isoformat()}
+        update_data = {}
         if request.title is not None:
             update_data["title"] = request.title
         if request.content is not None:
@@ -176,11 +306,9 @@ async def update_summary(summary_id: int, request: SummaryUpdateRequest, authori
         if request.source_text is not None:
             update_data["source_text"] = request.source_text
         
-        # Update summary in Supabase
-        result = supabase.table("summaries").update(update_data).eq("id", summary_id).eq("user_id", user_data["user"]["id"]).execute()
+        summary_data = await summary_repository.update(summary_id, user_data["user"]["id"], update_data)
         
-        if result.data:
-            summary_data = result.data[0]
+        if summary_data:
             summary = SummaryResponse(
                 id=summary_data["id"],
                 title=summary_data["title"],
@@ -225,15 +353,9 @@ async def delete_summary(summary_id: int, authorization: str = Header(None)):
         user_id = user_data["user"]["id"]
 
         # Try deleting summary for current user
-        result = (
-            supabase.table("summaries")
-            .delete()
-            .eq("id", summary_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
+        deleted = await summary_repository.delete(summary_id, user_id)
 
-        if result.data:
+        if deleted:
             return {"success": True, "message": "Summary deleted successfully."}
         else:
             return {
@@ -255,7 +377,7 @@ async def delete_all_summaries(authorization: str = Header(None)):
         user_data = auth_service.get_current_user(token)
         user_id = user_data["user"]["id"]
 
-        supabase.table("summaries").delete().eq("user_id", user_id).execute()
+        await summary_repository.delete_all(user_id)
 
         return {"success": True, "message": "All summaries deleted successfully."}
 
@@ -265,19 +387,35 @@ async def delete_all_summaries(authorization: str = Header(None)):
 
 
 @router.get("/search/", response_model=dict)
-async def search_summaries(query: str, authorization: str = Header(None)):
-    """Search summaries by title or content"""
+async def search_summaries(
+    query: str,
+    limit: int = Query(settings.SUMMARY_PAGE_SIZE, ge=1, le=settings.SUMMARY_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    authorization: str = Header(None)
+):
+    """Search summaries by title or content, best matches first.
+
+    The last query word also matches longer words it is a prefix of. Each
+    result has a snippet of its content with highlights given as (start,
+    end) character offsets, plus title_highlights for the title.
+    """
     try:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Invalid authorization header")
-        
+
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+
+        found = await summary_search.search(user_data["user"]["id"], query, limit=limit, offset=offset)
+
         return {
             "success": True,
-            "summaries": [],
+            "summaries": found["results"],
             "query": query,
-            "count": 0,
-            "message": "Summaries table not available yet."
+            "count": len(found["results"]),
+            "total": found["total"],
+            "has_more": offset + limit < found["total"]
         }
         
     except Exception as e:
-        return handle_table_error(e)
\ No newline at end of file
+        return handle_table_error(e)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Header, UploadFile, File, Form, Request, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from typing import Optional
 from app.services.auth_service import AuthService
-from app.database.supabase_client import supabase  # Add this import
-import base64
+from app.services.avatar_service import avatar_service
+from app.database.repositories import profile_repository
+from app.config import settings
 import os
 
 router = APIRouter()
@@ -16,8 +19,40 @@ class ChangePasswordRequest(BaseModel):
     current_password: str
     new_password: str
 
+# Avatar URLs are content-addressed, so a cached copy is never stale
+AVATAR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def merge_profile(user: dict, profile: Optional[dict], base_url: str) -> dict:
+    """Auth user with the name and picture URLs from their profiles row"""
+    user_profile = dict(user)
+    if profile:
+        picture = profile.get("profile_picture")
+        thumbnails = avatar_service.urls(picture, base_url)
+        user_profile.update({
+            "full_name": profile.get("full_name") or user.get("user_metadata", {}).get("full_name", ""),
+            # Largest thumbnail; legacy rows may still hold a data: URI
+            "profile_picture": thumbnails[max(thumbnails, key=int)] if thumbnails else picture,
+            "profile_picture_thumbnails": thumbnails
+        })
+    return user_profile
+
+async def store_picture(file: UploadFile) -> str:
+    """Save an uploaded picture to the avatar store; 400 if it isn't a usable image"""
+    try:
+        # Read one byte past the limit so oversized uploads are refused without loading them
+        return await avatar_service.save(await file.read(settings.AVATAR_MAX_BYTES + 1))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def save_profile(user: dict, values: dict) -> dict:
+    """Write profile columns with a single upsert (creates the row on first save)"""
+    result = await profile_repository.upsert(user["id"], {"email": user["email"], **values})
+    if not result:
+        raise Exception("Failed to update profile")
+    return result
+
 @router.get("/profile")
-async def get_profile(authorization: str = Header(None)):
+async def get_profile(request: Request, authorization: str = Header(None)):
     """Get user profile"""
     try:
         if not authorization or not authorization.startswith("Bearer "):
@@ -26,27 +61,28 @@ async def get_profile(authorization: str = Header(None)):
         token = authorization.replace("Bearer ", "")
         user_data = auth_service.get_current_user(token)
         
-        # Get user profile from Supabase profiles table
-        profile_result = supabase.table("profiles").select("*").eq("id", user_data["user"]["id"]).execute()
+        # Get user profile from the profiles table
+        profile_data = await profile_repository.get(user_data["user"]["id"])
         
-        user_profile = user_data["user"]
-        if profile_result.data:
-            # Merge with profile data
-            profile_data = profile_result.data[0]
-            user_profile.update({
-                "full_name": profile_data.get("full_name", user_data["user"].get("user_metadata", {}).get("full_name", "")),
-                "profile_picture": profile_data.get("profile_picture")
-            })
+        picture = (profile_data or {}).get("profile_picture") or ""
+        if picture.startswith("data:"):
+            # Move pictures saved before the avatar store out of the row
+            try:
+                profile_data = await save_profile(
+                    user_data["user"], {"profile_picture": await avatar_service.save_data_url(picture)}
+                )
+            except Exception as e:
+                print(f"Could not migrate profile picture for {user_data['user']['id']}: {str(e)}")
         
         return {
             "success": True, 
-            "user": user_profile
+            "user": merge_profile(user_data["user"], profile_data, str(request.base_url))
         }
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
 @router.put("/profile")
-async def update_profile(request: UpdateProfileRequest, authorization: str = Header(None)):
+async def update_profile(request: UpdateProfileRequest, http_request: Request, authorization: str = Header(None)):
     """Update user profile"""
     try:
         if not authorization or not authorization.startswith("Bearer "):
@@ -55,49 +91,19 @@ async def update_profile(request: UpdateProfileRequest, authorization: str = Hea
         token = authorization.replace("Bearer ", "")
         user_data = auth_service.get_current_user(token)
         
-        # Update user profile in Supabase profiles table
-        update_data = {
-            "full_name": request.full_name,
-            "updated_at": "now()"
-        }
+        profile = await save_profile(user_data["user"], {"full_name": request.full_name})
         
-        # Check if profile exists, if not create it
-        profile_result = supabase.table("profiles").select("*").eq("id", user_data["user"]["id"]).execute()
-        
-        if profile_result.data:
-            # Update existing profile
-            result = supabase.table("profiles").update(update_data).eq("id", user_data["user"]["id"]).execute()
-        else:
-            # Create new profile
-            update_data["id"] = user_data["user"]["id"]
-            update_data["email"] = user_data["user"]["email"]
-            update_data["created_at"] = "now()"
-            result = supabase.table("profiles").insert(update_data).execute()
-        
-        if result.data:
-            updated_user = {
-                "id": user_data["user"]["id"],
-                "email": user_data["user"]["email"],
-                "full_name": request.full_name,
-                "user_metadata": {
-                    "full_name": request.full_name,
-                    **user_data["user"].get("user_metadata", {})
-                }
-            }
-            
-            return {
-                "success": True, 
-                "user": updated_user,
-                "message": "Profile updated successfully"
-            }
-        else:
-            raise Exception("Failed to update profile")
+        return {
+            "success": True, 
+            "user": merge_profile(user_data["user"], profile, str(http_request.base_url)),
+            "message": "Profile updated successfully"
+        }
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/profile-picture")
-async def update_profile_picture(file: UploadFile = File(...), authorization: str = Header(None)):
+async def update_profile_picture(request: Request, file: UploadFile = File(...), authorization: str = Header(None)):
     """Update user profile picture"""
     try:
         if not authorization or not authorization.startswith("Bearer "):
@@ -106,40 +112,70 @@ async def update_profile_picture(file: UploadFile = File(...), authorization: st
         token = authorization.replace("Bearer ", "")
         user_data = auth_service.get_current_user(token)
         
-        # Read and encode the image
-        contents = await file.read()
-        image_b64 = base64.b64encode(contents).decode('utf-8')
+        profile = await save_profile(user_data["user"], {"profile_picture": await store_picture(file)})
+        user_profile = merge_profile(user_data["user"], profile, str(request.base_url))
         
-        # Update profile picture in Supabase
-        update_data = {
-            "profile_picture": f"data:{file.content_type};base64,{image_b64}",
-            "updated_at": "now()"
+        return {
+            "success": True, 
+            "message": "Profile picture updated successfully",
+            "profile_picture": user_profile["profile_picture"],
+            "user": user_profile
         }
         
-        # Check if profile exists, if not create it
-        profile_result = supabase.table("profiles").select("*").eq("id", user_data["user"]["id"]).execute()
-        
-        if profile_result.data:
-            result = supabase.table("profiles").update(update_data).eq("id", user_data["user"]["id"]).execute()
-        else:
-            update_data["id"] = user_data["user"]["id"]
-            update_data["email"] = user_data["user"]["email"]
-            update_data["full_name"] = user_data["user"].get("user_metadata", {}).get("full_name", "")
-            update_data["created_at"] = "now()"
-            result = supabase.table("profiles").insert(update_data).execute()
-        
-        if result.data:
-            return {
-                "success": True, 
-                "message": "Profile picture updated successfully",
-                "profile_picture": update_data["profile_picture"]
-            }
-        else:
-            raise Exception("Failed to update profile picture")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.patch("/profile")
+async def patch_profile(
+    request: Request,
+    full_name: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    authorization: str = Header(None)
+):
+    """Update any of name and picture together in one write (multipart form)"""
+    try:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization header")
+        if full_name is None and file is None:
+            raise HTTPException(status_code=400, detail="Nothing to update: send full_name and/or file")
+        
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+        
+        # Only authenticated uploads reach the image pool and avatar store
+        values = {}
+        if full_name is not None:
+            values["full_name"] = full_name
+        if file is not None:
+            values["profile_picture"] = await store_picture(file)
         
+        profile = await save_profile(user_data["user"], values)
+        
+        return {
+            "success": True, 
+            "user": merge_profile(user_data["user"], profile, str(request.base_url)),
+            "message": "Profile updated successfully"
+        }
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/avatars/{name}")
+async def get_avatar(name: str, if_none_match: Optional[str] = Header(None)):
+    """Serve a profile picture thumbnail (public: the URL is an unguessable content hash)"""
+    path = avatar_service.thumbnail_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+
+    headers = {"ETag": f'"{name}"', "Cache-Control": AVATAR_CACHE_CONTROL}
+    if if_none_match and headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
 @router.put("/change-password")
 async def change_password(request: ChangePasswordRequest, authorization: str = Header(None)):
     """Change user password"""
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
+import asyncio
 import time
+from app.config import settings
 from app.services.youtube_service import YouTubeService
-from app.services.chatgpt_service import ChatGPTService
+from app.services.youtube_summary_service import YouTubeSummaryService
 from app.services.auth_service import AuthService
 from app.services.summary_service import SummaryService
 
 router = APIRouter()
 youtube_service = YouTubeService()
-chatgpt_service = ChatGPTService()
+youtube_summary_service = YouTubeSummaryService()
 auth_service = AuthService()
 summary_service = SummaryService()
 
@@ -18,6 +20,11 @@ class YouTubeSummaryRequest(BaseModel):
     chunk_minutes: Optional[int] = 5  # Reduced to 5 minutes for better handling
     target_language: Optional[str] = "Urdu"
 
+class YouTubeBatchSummaryRequest(BaseModel):
+    playlist_url: Optional[str] = None
+    video_urls: Optional[List[str]] = None
+    chunk_minutes: Optional[int] = 5
+
 @router.post("/summarize")
 async def summarize_youtube_video(request: YouTubeSummaryRequest, authorization: str = Header(None)):
     """Get summary of YouTube video with improved long video handling"""
@@ -31,46 +38,20 @@ async def summarize_youtube_video(request: YouTubeSummaryRequest, authorization:
         
         print(f"Processing YouTube video: {request.video_url}")
         
-        # Get transcript with timestamps
-        transcript = youtube_service.get_transcript_with_timestamps(request.video_url)
-        if not transcript:
-            raise HTTPException(status_code=400, detail="No transcript available for this video")
-        
-        print(f"Found {len(transcript)} transcript segments")
-        
-        # Get clean text only
-        clean_text = youtube_service.get_transcript_text_only(transcript)
-        
-        print(f"Clean text length: {len(clean_text)} characters")
-        
-        # For long videos, use size-based chunking instead of time-based
-        chunks = []
-        if len(clean_text) > 8000:
-            # Use size-based chunking for API limits
-            chunks = youtube_service.chunk_transcript_by_size(clean_text, 6000)
-            print(f"Using size-based chunking: {len(chunks)} chunks")
-        elif len(clean_text) > 3000:
-            # Use time-based chunking for medium videos
-            chunks = youtube_service.chunk_transcript_by_time(transcript, request.chunk_minutes)
-            print(f"Using time-based chunking: {len(chunks)} chunks")
-        else:
-            chunks = [clean_text]
-            print("Using single chunk processing")
-        
-        # Generate summary
-        if len(chunks) > 1:
-            print("Using chunked summary approach...")
-            summary = chatgpt_service.get_chunked_summary(chunks)
-        else:
-            print("Using single summary approach...")
-            summary = chatgpt_service.get_summary(clean_text)
+        try:
+            result = youtube_summary_service.summarize_video(request.video_url, request.chunk_minutes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        summary = result["summary"]
+        clean_text = result["clean_text"]
         
         processing_time = time.time() - start_time
         
         # Save to database
         saved_summary = None
         try:
-            saved_summary = summary_service.save_summary(
+            saved_summary = await summary_service.save_summary(
                 user_id=user_data["user"]["id"],
                 title=f"YouTube Summary",
                 content=summary,
@@ -83,17 +64,110 @@ async def summarize_youtube_video(request: YouTubeSummaryRequest, authorization:
         return {
             "success": True,
             "video_url": request.video_url,
-            "transcript_segments": len(transcript),
-            "chunks_processed": len(chunks),
+            "transcript_segments": result["transcript_segments"],
+            "chunks_processed": result["chunks_processed"],
             "summary": summary,
             "full_transcript": clean_text[:800] + "..." if len(clean_text) > 800 else clean_text,
             "processing_time": round(processing_time, 2),
             "saved_summary_id": saved_summary["id"] if saved_summary else None,
-            "message": f"Processed {len(transcript)} segments in {len(chunks)} chunk(s)"
+            "cached": result["cached"],
+            "message": f"Processed {result['transcript_segments']} segments in {result['chunks_processed']} chunk(s)"
         }
             
     except HTTPException:
         raise
     except Exception as e:
         print(f"YouTube summarization error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to process video: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to process video: {str(e)}")
+
+@router.post("/summarize-batch")
+async def summarize_youtube_batch(request: YouTubeBatchSummaryRequest, authorization: str = Header(None)):
+    """Start summarizing a playlist or list of videos; poll /youtube/batch/{job_id} for progress"""
+    try:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization header")
+        
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+        
+        if not request.playlist_url and not request.video_urls:
+            raise HTTPException(status_code=400, detail="Either playlist_url or video_urls must be provided")
+        
+        videos = []
+        if request.playlist_url:
+            print(f"Expanding playlist: {request.playlist_url}")
+            # yt-dlp fetches the playlist over the network; keep it off the event loop
+            videos.extend(await asyncio.to_thread(youtube_service.expand_video_urls, request.playlist_url))
+        
+        for video_url in request.video_urls or []:
+            videos.append({
+                "video_id": youtube_service.extract_video_id(video_url),
+                "video_url": video_url,
+                "title": ""
+            })
+        
+        # Drop duplicate videos so each is only summarized once per batch
+        unique_videos = []
+        seen = set()
+        for video in videos:
+            key = video["video_id"] or video["video_url"]
+            if key not in seen:
+                seen.add(key)
+                unique_videos.append(video)
+        
+        if not unique_videos:
+            raise HTTPException(status_code=400, detail="No videos found to summarize")
+        
+        if len(unique_videos) > settings.BATCH_SUMMARY_MAX_VIDEOS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many videos: {len(unique_videos)} (maximum {settings.BATCH_SUMMARY_MAX_VIDEOS})"
+            )
+        
+        job_id = youtube_summary_service.start_batch(
+            user_data["user"]["id"], unique_videos, request.chunk_minutes
+        )
+        
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "processing",
+            "total_videos": len(unique_videos),
+            "message": f"Batch summarization started for {len(unique_videos)} video(s)"
+        }
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"YouTube batch summarization error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start batch: {str(e)}")
+
+@router.get("/batch/{job_id}")
+async def get_youtube_batch_status(job_id: str, authorization: str = Header(None)):
+    """Get per-video status of a batch summarization job"""
+    try:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization header")
+        
+        token = authorization.replace("Bearer ", "")
+        user_data = auth_service.get_current_user(token)
+        
+        job = youtube_summary_service.get_batch(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Check if user owns this job
+        if job["user_id"] != user_data["user"]["id"]:
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        return {
+            "success": True,
+            "job_id": job_id,
+            **job
+        }
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"YouTube batch status error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,18 +1,30 @@
-# Services package
-from .auth_service import AuthService
-from .document_service import DocumentService
-from .chatgpt_service import ChatGPTService
-from .ocr_service import OCRService
-from .youtube_service import YouTubeService
-from .elevenlabs_service import ElevenLabsService
-from .dubbing_service import DubbingService
+# Services package. Exports are imported on first access, so importing one
+# service module (e.g. in a pool worker or the API) doesn't load every other
+# service with its clients, pools and caches.
+import importlib
 
-__all__ = [
-    "AuthService",
-    "DocumentService", 
-    "ChatGPTService",
-    "OCRService",
-    "YouTubeService",
-    "ElevenlabsService",
-    "DubbingService"
-]
\ No newline at end of file
+_EXPORTS = {
+    "AuthService": ".auth_service",
+    "DocumentService": ".document_service",
+    "ChatGPTService": ".chatgpt_service",
+    "OCRService": ".ocr_service",
+    "YouTubeService": ".youtube_service",
+    "ElevenLabsService": ".elevenlabs_service",
+    "DubbingService": ".dubbing_service",
+    "YouTubeSummaryService": ".youtube_summary_service",
+    "SummarySearchService": ".summary_search_service",
+    "SummaryCache": ".summary_cache",
+    "AvatarService": ".avatar_service",
+    "GenerationStore": ".generation_store",
+    "StructuredOutputError": ".structured_output",
+    "QuestionStreamParser": ".question_stream",
+    "DocumentIndex": ".document_index",
+    "DocumentSessionStore": ".document_sessions"
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
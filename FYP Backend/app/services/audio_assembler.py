@@ -0,0 +1,160 @@
+import os
+import subprocess
+import threading
+from typing import Optional
+import numpy as np
+from pydub import AudioSegment
+
+class AudioAssembler:
+    """Builds a dubbed track in a preallocated 16-bit PCM buffer.
+
+    Clips are written at their sample offsets (linear in the number of
+    segments, unlike repeated AudioSegment concatenation) and the whole
+    track is encoded once at the end. When scratch_path is given the buffer
+    is a disk-backed memmap, so memory stays bounded for long lectures.
+
+    The track can also be encoded progressively: open_stream() starts one
+    MP3 encoder and stream_until() feeds it each part of the buffer that
+    will no longer change, so the output file grows while clips are still
+    being placed. Because a single encoder is used, the result is one
+    continuous MP3 stream with no gaps between blocks.
+    """
+
+    def __init__(self, duration_seconds: float, sample_rate: int = 44100, channels: int = 1,
+                 scratch_path: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.scratch_path = scratch_path
+        # High-water mark of written samples; the exported track ends here
+        self.length = 0
+
+        capacity = max(int(duration_seconds * sample_rate), sample_rate)
+        self._buffer = self._allocate(capacity)
+        # Guards buffer reallocation against a concurrent stream_until()
+        self._lock = threading.Lock()
+        self._encoder = None
+        self.streamed = 0
+
+    def decode(self, audio_file: str) -> np.ndarray:
+        """Decode an audio file to int16 samples shaped (frames, channels)"""
+        # Straight to raw PCM at the track's format; no intermediate WAV or ffprobe pass
+        command = [
+            AudioSegment.converter, "-loglevel", "error", "-i", audio_file,
+            "-f", "s16le", "-ar", str(self.sample_rate), "-ac", str(self.channels), "pipe:1"
+        ]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise Exception(f"Audio decode error: {result.stderr.decode(errors='ignore').strip()}")
+        return np.frombuffer(result.stdout, dtype=np.int16).reshape(-1, self.channels)
+
+    def place(self, samples: np.ndarray, start_seconds: float) -> float:
+        """Mix samples into the track at start_seconds; returns the end time in seconds"""
+        start = max(int(round(start_seconds * self.sample_rate)), 0)
+        end = start + len(samples)
+        with self._lock:
+            self._ensure_capacity(end)
+            region = self._buffer[start:end]
+            self.length = max(self.length, end)
+
+        # Mix rather than overwrite so overlapping clips stay audible
+        mixed = region.astype(np.int32) + samples
+        np.clip(mixed, -32768, 32767, out=mixed)
+        region[:] = mixed
+        return end / self.sample_rate
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.length / self.sample_rate
+
+    @property
+    def streamed_seconds(self) -> float:
+        return self.streamed / self.sample_rate
+
+    def export(self, output_path: str, bitrate: str = "128k", block_seconds: int = 30):
+        """Encode the assembled track once, streaming the buffer to ffmpeg"""
+        self.open_stream(output_path, bitrate)
+        self.finish_stream(block_seconds)
+
+    def open_stream(self, output_path: str, bitrate: str = "128k"):
+        """Start the MP3 encoder; output_path grows as stream_until() is called"""
+        command = [
+            AudioSegment.converter, "-y", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(self.sample_rate), "-ac", str(self.channels), "-i", "pipe:0",
+            # No Xing/ID3 headers: they would be rewritten at the end, and a
+            # headerless frame stream stays playable while it is still growing
+            "-b:a", bitrate, "-write_xing", "0", "-id3v2_version", "0", "-flush_packets", "1",
+            "-f", "mp3", output_path
+        ]
+        self._encoder = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.streamed = 0
+
+    def stream_until(self, seconds: float, block_seconds: int = 30):
+        """Encode the track up to seconds; everything before it must be final"""
+        until = int(seconds * self.sample_rate)
+        with self._lock:
+            # Silence before the next clip is final too, even if nothing was placed there yet
+            self._ensure_capacity(until)
+            self.length = max(self.length, until)
+        block = block_seconds * self.sample_rate
+        try:
+            while self.streamed < until:
+                end = min(self.streamed + block, until)
+                with self._lock:
+                    data = self._buffer[self.streamed:end].tobytes()
+                self._encoder.stdin.write(data)
+                self.streamed = end
+            self._encoder.stdin.flush()
+        except BrokenPipeError:
+            pass  # Reported by finish_stream()
+
+    def finish_stream(self, block_seconds: int = 30):
+        """Encode the rest of the track and wait for the encoder"""
+        self.stream_until(self.duration_seconds, block_seconds)
+        try:
+            self._encoder.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        stderr = self._encoder.stderr.read()
+        returncode = self._encoder.wait()
+        self._encoder = None
+        if returncode != 0:
+            raise Exception(f"Audio export error: {stderr.decode(errors='ignore').strip()}")
+
+    def close(self):
+        """Stop any running encoder, release the buffer and remove the scratch file"""
+        if self._encoder is not None:
+            self._encoder.kill()
+            self._encoder.wait()
+            self._encoder = None
+        self._buffer = None
+        if self.scratch_path and os.path.exists(self.scratch_path):
+            try:
+                os.remove(self.scratch_path)
+            except OSError:
+                pass
+
+    def _allocate(self, frames: int) -> np.ndarray:
+        if self.scratch_path:
+            with open(self.scratch_path, "wb") as f:
+                f.truncate(frames * self.channels * 2)
+            return np.memmap(self.scratch_path, dtype=np.int16, mode="r+", shape=(frames, self.channels))
+        return np.zeros((frames, self.channels), dtype=np.int16)
+
+    def _ensure_capacity(self, frames: int):
+        capacity = len(self._buffer)
+        if frames <= capacity:
+            return
+
+        # Grow geometrically so repeated overruns stay amortized linear
+        new_capacity = max(frames, int(capacity * 1.5))
+        if self.scratch_path:
+            self._buffer.flush()
+            self._buffer = None
+            with open(self.scratch_path, "r+b") as f:
+                f.truncate(new_capacity * self.channels * 2)
+            self._buffer = np.memmap(self.scratch_path, dtype=np.int16, mode="r+", shape=(new_capacity, self.channels))
+        else:
+            grown = np.zeros((new_capacity, self.channels), dtype=np.int16)
+            grown[:capacity] = self._buffer
+            self._buffer = grown
@@ -0,0 +1,96 @@
+import asyncio
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+from app.compute.thumbnails import THUMBNAIL_FORMAT, render_thumbnails
+from app.config import settings
+from app.utils.blob_store import BlobStore
+
+# Stored in profiles.profile_picture; the digest names the original upload
+AVATAR_PATH_PREFIX = "/users/avatars/"
+
+
+class AvatarService:
+    """Profile pictures stored as content-addressed blobs with pre-sized thumbnails.
+
+    An upload is stored once under the SHA-256 of its bytes, and thumbnails
+    for every size in AVATAR_SIZES are rendered in a process pool at upload
+    time. Profiles keep only the path /users/avatars/<digest>; responses
+    turn it into thumbnail URLs that never change, so clients may cache
+    them indefinitely.
+    """
+
+    def __init__(self, store: BlobStore = None, sizes: Sequence[int] = None):
+        self.store = store or BlobStore(settings.AVATAR_STORE_DIR)
+        self.sizes = sorted(sizes or settings.AVATAR_SIZES)
+        self._pool = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Worker processes for image decoding and resizing, started on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.AVATAR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def thumbnail_name(self, digest: str, size: int) -> str:
+        return f"{digest}-{size}.{THUMBNAIL_FORMAT}"
+
+    async def save(self, data: bytes) -> str:
+        """Store an uploaded image and its thumbnails; returns the profile_picture value.
+
+        Raises ValueError if the data is not a readable image.
+        """
+        if len(data) > settings.AVATAR_MAX_BYTES:
+            raise ValueError(f"Image is larger than {settings.AVATAR_MAX_BYTES // (1024 * 1024)} MB")
+
+        loop = asyncio.get_running_loop()
+        digest = BlobStore.digest(data)
+        names = {size: self.thumbnail_name(digest, size) for size in self.sizes}
+
+        if not all(self.store.exists(name) for name in names.values()):
+            thumbnails = await loop.run_in_executor(
+                self.pool, render_thumbnails, data, self.sizes, settings.AVATAR_MAX_PIXELS
+            )
+
+            def write():
+                # Thumbnails first: the original's presence doesn't imply they exist
+                for size, thumbnail in thumbnails.items():
+                    self.store.put(thumbnail, names[size])
+                self.store.put(data, digest)
+
+            await loop.run_in_executor(None, write)
+            print(f"🖼️ Stored avatar {digest[:12]} with {len(thumbnails)} thumbnails")
+
+        return f"{AVATAR_PATH_PREFIX}{digest}"
+
+    async def save_data_url(self, data_url: str) -> str:
+        """Move a legacy base64 data: URI picture into the blob store"""
+        _, _, encoded = data_url.partition(",")
+        return await self.save(base64.b64decode(encoded))
+
+    def urls(self, picture: Optional[str], base_url: str) -> Dict[str, str]:
+        """Thumbnail URLs by size for a stored profile_picture value ({} if none)"""
+        if not picture or not picture.startswith(AVATAR_PATH_PREFIX):
+            return {}
+        digest = picture[len(AVATAR_PATH_PREFIX):]
+        base_url = base_url.rstrip("/")
+        return {
+            str(size): f"{base_url}{AVATAR_PATH_PREFIX}{self.thumbnail_name(digest, size)}"
+            for size in self.sizes
+        }
+
+    def thumbnail_path(self, name: str) -> Optional[str]:
+        """Local file of a thumbnail, or None if the name is invalid or unknown"""
+        _, _, rest = name.partition("-")
+        size, _, extension = rest.partition(".")
+        if extension != THUMBNAIL_FORMAT or not size.isdigit() or not self.store.valid_name(name):
+            return None
+        path = self.store.path(name)
+        return path if self.store.exists(name) else None
+
+
+avatar_service = AvatarService()
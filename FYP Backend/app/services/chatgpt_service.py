@@ -1,9 +1,102 @@
 import requests
+import asyncio
 import json
 import time
 from app.config import settings
+from app.utils.http_client import http_sessions
 import aiohttp
 import json
+from typing import AsyncIterator, Dict, List, Optional, Type
+from pydantic import BaseModel
+from app.services.structured_output import (
+    SummaryOutput, QuestionsOutput, AnswerOutput, BatchAnswerOutput, PastPaperOutput,
+    StructuredOutputError, load_json_object, validate_output, repair_prompt, merge_repair, salvage
+)
+
+# JSON shapes requested by the *_structured methods (validated by the models above)
+SUMMARY_JSON_FORMAT = """
+        Respond with only a JSON object:
+        {"english_summary": "<the summary: one or a few short paragraphs>",
+         "key_points": ["<key point>", "<key point>", ...]}
+        Give 3 to 8 key points, each a single sentence.
+        """
+
+QUESTIONS_JSON_FORMAT = """
+        Respond with only a JSON object:
+        {{"questions": [{{"question": "<question>", "answer": "<answer>"}}, ...]}}
+        with exactly {num_questions} items. Every item needs a question and its answer.
+        """
+
+ANSWER_JSON_FORMAT = """
+        Respond with only a JSON object:
+        {"answer": "<your answer>",
+         "source_reference": "<text from the document that supports the answer, or an empty string>",
+         "confidence_level": "High" | "Medium" | "Low"}
+        """
+
+BATCH_ANSWER_JSON_FORMAT = """
+        You will receive several numbered questions about the same passages. Answer each one
+        independently, following the rules above.
+        Respond with only a JSON object with exactly one item per question:
+        {"answers": [{"id": <question number>,
+                      "answer": "<your answer>",
+                      "source_reference": "<text from the document that supports the answer, or an empty string>",
+                      "confidence_level": "High" | "Medium" | "Low"}, ...]}
+        """
+
+# Line-by-line formats for the stream_* methods, so each question can be parsed
+# as soon as its line is complete (see app.services.question_stream)
+QUESTIONS_JSONL_FORMAT = """
+        Respond with exactly {num_questions} lines and nothing else, one JSON object per line:
+        {{"question": "<question>", "answer": "<answer>"}}
+        Do not wrap the lines in a list or a code block.
+        """
+
+QUESTIONS_TEXT_FORMAT = """
+        Format your response as:
+        QUESTIONS:
+        1. [Question 1]
+        2. [Question 2]
+        ... (up to {num_questions})
+
+        ANSWERS:
+        1. [Answer 1]
+        2. [Answer 2]
+        ... (up to {num_questions})
+
+        Write each question and each answer on a single line.
+        """
+
+PAST_PAPER_JSONL_FORMAT = """
+        Respond with JSON lines and nothing else, one JSON object per line. The first line is
+        {{"analysis": "<brief analysis of past paper patterns and how they apply to the study material>"}}
+        followed by exactly {num_questions} lines of
+        {{"question": "<question matching the past paper format>", "answer": "<answer>"}}
+        Do not wrap the lines in a list or a code block.
+        """
+
+PAST_PAPER_TEXT_FORMAT = """
+        Format your response as:
+        ANALYSIS:
+        [Brief analysis of past paper patterns and how they apply to study material]
+
+        QUESTIONS:
+        1. [Question 1 that matches past paper format]
+        ... (up to {num_questions})
+
+        ANSWERS:
+        1. [Detailed answer 1]
+        ... (up to {num_questions})
+
+        Write each question and each answer on a single line.
+        """
+
+PAST_PAPER_JSON_FORMAT = """
+        Respond with only a JSON object:
+        {{"analysis": "<brief analysis of past paper patterns and how they apply to the study material>",
+         "questions": [{{"question": "<question matching the past paper format>", "answer": "<answer>"}}, ...]}}
+        with exactly {num_questions} questions. Every item needs a question and its answer.
+        """
 
 class ChatGPTService:
     def __init__(self):
@@ -47,6 +140,10 @@ A single well-written paragraph (or short set of paragraphs) summarizing this se
         if len(text_chunks) > 10:
             return self._process_large_document(text_chunks)
         
+        return self._combine_chunk_summaries(self._summarize_chunks(text_chunks))
+    
+    def _summarize_chunks(self, text_chunks: list) -> list:
+        """Summarize each chunk on its own (input to the combining step)"""
         chunk_summaries = []
         
         for i, chunk in enumerate(text_chunks):
@@ -81,7 +178,7 @@ A well-written paragraph (or short set of paragraphs) that reads like a complete
                 print(f"Error processing chunk {i+1}: {e}")
                 chunk_summaries.append(f"Segment {i+1}: [Summary unavailable]")
         
-        return self._combine_chunk_summaries(chunk_summaries)
+        return chunk_summaries
     
 
     def get_OCR(self, text: str):
@@ -186,23 +283,9 @@ Return the fully cleaned, structured, and continuous document text as a single c
         return self._make_request(system_prompt, text)
 
     # NEW METHOD 2: Answer questions from document content
-    def answer_question_from_document(self, document_text: str, question: str):
-        """Answer a specific question based on the provided document content"""
-        system_prompt = f"""
-        You are a helpful study assistant that answers questions based on a specific document.
-        
-        Document Content: {document_text[:4000]}... [truncated if too long]
-        
-        User Question: {question}
-        
-        Your task:
-        1. Answer the question based ONLY on the information in the document
-        2. If the answer is not found in the document, clearly state: "Based on the provided document, this information is not covered."
-        3. Provide specific references or quotes from the document when possible
-        4. Keep answers concise but comprehensive
-        5. Use bullet points for clarity if needed
-        6. Do NOT make up information not present in the document
-        
+    def answer_question_from_document(self, context: str, question: str):
+        """Answer a specific question from the relevant passages of a document (see DocumentIndex)"""
+        system_prompt = self._answer_instructions() + """
         Format your response as:
         
         ANSWER:
@@ -215,10 +298,7 @@ Return the fully cleaned, structured, and continuous document text as a single c
         [High/Medium/Low based on how clearly the document addresses the question]
         """
         
-        # Combine document text with question for context
-        content = f"DOCUMENT CONTEXT:\n{document_text[:6000]}\n\nUSER QUESTION:\n{question}"
-        
-        return self._make_request(system_prompt, content)
+        return self._make_request(system_prompt, self._answer_content(context, question))
 
     def generate_questions(self, text: str, num_questions: int = 5):
         """Generate practice questions from text"""
@@ -256,6 +336,10 @@ Return the fully cleaned, structured, and continuous document text as a single c
         if len(text_chunks) > 8:
             text_chunks = self._sample_document_chunks(text_chunks)
         
+        return self._combine_questions(self._questions_from_chunks(text_chunks), num_questions)
+    
+    def _questions_from_chunks(self, text_chunks: list) -> list:
+        """A few questions with answers from each chunk (input to the combining step)"""
         all_questions = []
         
         for i, chunk in enumerate(text_chunks):
@@ -275,7 +359,7 @@ Return the fully cleaned, structured, and continuous document text as a single c
                 print(f"Error generating questions from chunk {i+1}: {e}")
                 all_questions.append(f"Questions from segment {i+1}: [Unavailable]")
         
-        return self._combine_questions(all_questions, num_questions)
+        return all_questions
     
     def _process_large_document(self, text_chunks: list):
         """Process very long documents by sampling key segments"""
@@ -426,7 +510,219 @@ A well-written paragraph (or short set of paragraphs) that reads like a complete
         
         return self._make_request(system_prompt, combined_text)
     
-    def _make_request(self, system_prompt: str, user_content: str):
+    # Structured variants: the same tasks answered as JSON and validated against the
+    # models in app.services.structured_output. Routes call them through
+    # generate_with_fallback(), which uses the text methods above if they fail.
+    
+    def get_summary_structured(self, text: str) -> SummaryOutput:
+        """Summary of a short document"""
+        system_prompt = """
+        You are summarizing a document for a student.
+        Capture all key ideas, facts and topics in a neutral, professional and educational tone.
+        Leave out repetition and noise such as page numbers, headers and footers.
+        Do not add information that is not in the text.
+        """ + SUMMARY_JSON_FORMAT
+        
+        return self._generate_structured(system_prompt, text, SummaryOutput)
+    
+    def get_chunked_summary_structured(self, text_chunks: list) -> SummaryOutput:
+        """Summary of a long document: chunk summaries in text, combined into JSON"""
+        if len(text_chunks) > 10:
+            text_chunks = self._sample_document_chunks(text_chunks)
+        
+        print(f"Processing {len(text_chunks)} chunks...")
+        combined_text = "\n\n".join([
+            f"PART {i+1} SUMMARY:\n{summary}"
+            for i, summary in enumerate(self._summarize_chunks(text_chunks))
+        ])
+        
+        system_prompt = """
+        You are creating a final, comprehensive summary of a document by combining summaries of its parts.
+        It should read as one cohesive summary, not as separate parts.
+        Capture all key ideas and do not add information that is not in the part summaries.
+        """ + SUMMARY_JSON_FORMAT
+        
+        return self._generate_structured(system_prompt, combined_text, SummaryOutput)
+    
+    def generate_questions_structured(self, text: str, num_questions: int = 5) -> QuestionsOutput:
+        """Practice questions with answers from text"""
+        system_prompt = self._questions_instructions(num_questions) + QUESTIONS_JSON_FORMAT.format(num_questions=num_questions)
+        
+        return self._generate_structured(system_prompt, text, QuestionsOutput, max_tokens=3000)
+    
+    def generate_chunked_questions_structured(self, text_chunks: list, num_questions: int = 10) -> QuestionsOutput:
+        """Practice questions from a long document: per-chunk questions, best ones selected into JSON"""
+        if len(text_chunks) > 8:
+            text_chunks = self._sample_document_chunks(text_chunks)
+        
+        print(f"Generating questions from {len(text_chunks)} chunks...")
+        combined_text = self._part_questions_text(self._questions_from_chunks(text_chunks))
+        system_prompt = self._select_questions_instructions(num_questions) + QUESTIONS_JSON_FORMAT.format(num_questions=num_questions)
+        
+        return self._generate_structured(system_prompt, combined_text, QuestionsOutput, max_tokens=3000)
+    
+    def answer_question_structured(self, context: str, question: str) -> AnswerOutput:
+        """Answer a question from the relevant passages of a document"""
+        system_prompt = self._answer_instructions() + ANSWER_JSON_FORMAT
+        
+        return self._generate_structured(system_prompt, self._answer_content(context, question), AnswerOutput)
+    
+    def answer_questions_structured(self, context: str, questions: List[str]) -> Dict[int, AnswerOutput]:
+        """Answer several questions about the same passages in one request.
+
+        Returns answers by position in questions; any the model skipped or
+        numbered wrongly are missing, for the caller to ask on their own.
+        """
+        system_prompt = self._answer_instructions() + BATCH_ANSWER_JSON_FORMAT
+        numbered = "\n".join(f"{i + 1}. {question}" for i, question in enumerate(questions))
+        content = f"DOCUMENT PASSAGES:\n{context}\n\nUSER QUESTIONS:\n{numbered}"
+        
+        result = self._generate_structured(system_prompt, content, BatchAnswerOutput,
+                                           max_tokens=min(4000, 400 * len(questions)))
+        answers = {}
+        for item in result.answers:
+            if 1 <= item.id <= len(questions):
+                answers.setdefault(item.id - 1, item)
+        return answers
+    
+    def _answer_instructions(self) -> str:
+        return """
+        You are a helpful study assistant that answers questions based on a specific document.
+        You are given the passages of the document most relevant to the question, labelled by position.
+        
+        1. Answer the question based ONLY on the information in these passages
+        2. If the answer is not found in them, clearly state: "Based on the provided document, this information is not covered."
+        3. Quote the relevant text from the passages as the source reference when possible
+        4. Keep answers concise but comprehensive
+        5. Use bullet points for clarity if needed
+        6. Do NOT make up information not present in the document
+        7. Set the confidence level by how clearly the document addresses the question
+        """
+    
+    def _answer_content(self, context: str, question: str) -> str:
+        return f"DOCUMENT PASSAGES:\n{context}\n\nUSER QUESTION:\n{question}"
+    
+    def analyze_past_papers_structured(self, study_material: str, past_paper: str, num_questions: int = 10) -> PastPaperOutput:
+        """Past paper pattern analysis and likely exam questions"""
+        system_prompt = self._past_paper_instructions(num_questions) + PAST_PAPER_JSON_FORMAT.format(num_questions=num_questions)
+        content = self._past_paper_content(study_material, past_paper)
+        
+        return self._generate_structured(system_prompt, content, PastPaperOutput, max_tokens=3000)
+    
+    # Streaming variants: yield the response text as it is generated, one
+    # question per line, for app.services.question_stream to parse. JSON lines
+    # when LLM_STRUCTURED_OUTPUT is on, the QUESTIONS:/ANSWERS: format otherwise.
+    
+    async def stream_questions(self, text: str, num_questions: int = 5) -> AsyncIterator[str]:
+        system_prompt = self._questions_instructions(num_questions) + self._stream_format(
+            QUESTIONS_JSONL_FORMAT, QUESTIONS_TEXT_FORMAT, num_questions)
+        async for delta in self._stream_request_async(system_prompt, text, max_tokens=3000):
+            yield delta
+    
+    async def stream_chunked_questions(self, text_chunks: list, num_questions: int = 10) -> AsyncIterator[str]:
+        """Per-chunk questions as usual (off the event loop), then the final selection streamed"""
+        if len(text_chunks) > 8:
+            text_chunks = self._sample_document_chunks(text_chunks)
+        
+        print(f"Generating questions from {len(text_chunks)} chunks...")
+        chunk_questions = await asyncio.to_thread(self._questions_from_chunks, text_chunks)
+        system_prompt = self._select_questions_instructions(num_questions) + self._stream_format(
+            QUESTIONS_JSONL_FORMAT, QUESTIONS_TEXT_FORMAT, num_questions)
+        async for delta in self._stream_request_async(system_prompt, self._part_questions_text(chunk_questions), max_tokens=3000):
+            yield delta
+    
+    async def stream_past_paper_analysis(self, study_material: str, past_paper: str, num_questions: int = 10) -> AsyncIterator[str]:
+        system_prompt = self._past_paper_instructions(num_questions) + self._stream_format(
+            PAST_PAPER_JSONL_FORMAT, PAST_PAPER_TEXT_FORMAT, num_questions)
+        content = self._past_paper_content(study_material, past_paper)
+        async for delta in self._stream_request_async(system_prompt, content, max_tokens=3000):
+            yield delta
+    
+    def _stream_format(self, jsonl_format: str, text_format: str, num_questions: int) -> str:
+        output_format = jsonl_format if settings.LLM_STRUCTURED_OUTPUT else text_format
+        return output_format.format(num_questions=num_questions)
+    
+    def _questions_instructions(self, num_questions: int) -> str:
+        return f"""
+        You are an educational question generator. Create {num_questions} practice questions based on the provided text.
+        Make questions diverse: multiple choice, short answer, and conceptual questions.
+        Write the options of a multiple choice question inside its question text.
+        Questions should be clear and unambiguous, with a clear answer for each.
+        """
+    
+    def _select_questions_instructions(self, num_questions: int) -> str:
+        return f"""
+        You have questions from different parts of a document. Select and refine the {num_questions} best questions.
+        Ensure questions are diverse and cover different aspects of the document.
+        Remove duplicates and select the most important questions.
+        """
+    
+    def _part_questions_text(self, all_questions: list) -> str:
+        return "\n\n".join([
+            f"QUESTIONS FROM PART {i+1}:\n{questions}"
+            for i, questions in enumerate(all_questions)
+        ])
+    
+    def _past_paper_instructions(self, num_questions: int) -> str:
+        return f"""
+        You are an expert exam question predictor. Analyze the study material and past paper patterns to generate {num_questions} likely exam questions.
+        
+        1. Analyze the past paper's question formats, difficulty levels, topic distribution, marking schemes and common themes
+        2. Based on the study material content, generate {num_questions} questions that match those patterns,
+           cover the most important topics and include clear, concise answers
+        
+        Make the questions realistic and similar to what would appear in an actual exam.
+        """
+    
+    def _past_paper_content(self, study_material: str, past_paper: str) -> str:
+        return f"""STUDY MATERIAL CONTENT:
+    {study_material[:8000]}
+
+    PAST PAPER CONTENT:
+    {past_paper[:6000]}
+    """
+    
+    def _generate_structured(self, system_prompt: str, user_content: str, model: Type[BaseModel],
+                             max_tokens: int = 2000) -> BaseModel:
+        """JSON-mode request validated against model.
+        
+        Only the fields (or single list items) that fail validation are
+        re-asked in a follow-up turn, up to LLM_REPAIR_ATTEMPTS times; list
+        items still invalid after that are dropped. Raises
+        StructuredOutputError if the result can't be made valid.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+        data = load_json_object(self._chat(messages, max_tokens, json_mode=True))
+        result, targets = validate_output(model, data)
+        
+        attempt = 0
+        while result is None and attempt < settings.LLM_REPAIR_ATTEMPTS:
+            attempt += 1
+            print(f"🔧 Re-asking {len(targets)} invalid part(s) of {model.__name__} (attempt {attempt})")
+            repair_messages = messages + [
+                {"role": "assistant", "content": json.dumps(data, ensure_ascii=False)},
+                {"role": "user", "content": repair_prompt(targets)}
+            ]
+            try:
+                repair = load_json_object(self._chat(repair_messages, max_tokens, json_mode=True))
+            except StructuredOutputError as e:
+                print(f"Repair response unusable: {str(e)}")
+                break
+            data = merge_repair(data, repair, targets)
+            result, targets = validate_output(model, data)
+        
+        return result if result is not None else salvage(model, data, targets)
+    
+    def _make_request(self, system_prompt: str, user_content: str, max_tokens: int = 2000, json_mode: bool = False):
+        return self._chat([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ], max_tokens, json_mode)
+    
+    def _chat(self, messages: List[Dict[str, str]], max_tokens: int = 2000, json_mode: bool = False) -> str:
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
@@ -434,13 +730,12 @@ A well-written paragraph (or short set of paragraphs) that reads like a complete
         
         data = {
             "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
+            "messages": messages,
             "temperature": 0.7,
-            "max_tokens": 2000
+            "max_tokens": max_tokens
         }
+        if json_mode:
+            data["response_format"] = {"type": "json_object"}
         
         try:
             response = requests.post(
@@ -459,14 +754,111 @@ A well-written paragraph (or short set of paragraphs) that reads like a complete
     
     async def translate_text_async(self, text: str, target_language: str = "Urdu"):
         """Translate text to target language asynchronously"""
-        system_prompt = f"""
+        system_prompt = self._translation_prompt(target_language)
+        return await self._make_request_async(system_prompt, text, max_tokens=1000)
+    
+    async def translate_batch_async(self, texts: List[str], target_language: str = "Urdu") -> List[str]:
+        """Translate many segments in one request, keeping outputs aligned with inputs
+
+        Segments are sent as numbered JSON items and must come back with the
+        same IDs. If the model drops, merges or adds items, the batch is split
+        in half and retried, down to single-segment calls.
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [await self.translate_text_async(texts[0], target_language)]
+        
+        system_prompt = self._translation_prompt(target_language) + """
+        You will receive a JSON object {"segments": [{"id": <number>, "text": <English text>}, ...]}.
+        Translate every segment independently; do not merge, split or skip segments.
+        Respond with only a JSON object {"translations": [{"id": <number>, "text": <translation>}, ...]}
+        containing exactly one item for every input id.
+        """
+        user_content = json.dumps(
+            {"segments": [{"id": i + 1, "text": text} for i, text in enumerate(texts)]},
+            ensure_ascii=False
+        )
+        
+        try:
+            response = await self._make_request_async(
+                system_prompt, user_content,
+                max_tokens=min(4000, 300 * len(texts)),
+                json_mode=True,
+                timeout=90
+            )
+            translations = self._parse_aligned_translations(response, len(texts))
+            if translations is not None:
+                return translations
+            print(f"Batch translation misaligned for {len(texts)} segments, splitting batch")
+        except Exception as e:
+            print(f"Batch translation failed for {len(texts)} segments, splitting batch: {e}")
+        
+        middle = len(texts) // 2
+        first_half = await self.translate_batch_async(texts[:middle], target_language)
+        second_half = await self.translate_batch_async(texts[middle:], target_language)
+        return first_half + second_half
+    
+    def _parse_aligned_translations(self, response: str, expected: int) -> Optional[List[str]]:
+        """Return translations ordered by id, or None if ids don't match the input exactly"""
+        try:
+            # Tolerate a fenced code block around the JSON
+            cleaned = response.strip()
+            if cleaned.startswith("```"):
+                cleaned = cleaned.strip("`")
+                cleaned = cleaned[cleaned.index("{"):]
+            items = json.loads(cleaned)["translations"]
+            by_id = {int(item["id"]): str(item["text"]).strip() for item in items}
+        except (ValueError, KeyError, TypeError):
+            return None
+        
+        if len(items) != expected or set(by_id) != set(range(1, expected + 1)):
+            return None
+        if any(not text for text in by_id.values()):
+            return None
+        return [by_id[i] for i in range(1, expected + 1)]
+    
+    def _translation_prompt(self, target_language: str) -> str:
+        return f"""
         You are a translator from English to {target_language}.
         Translate all normal text to {target_language}.
         Keep technical terms, names, and proper nouns in English.
         Make the translation natural and easy to understand.
         Don't make it too formal - use common spoken language.
         """
+    
+    async def _make_request_async(self, system_prompt: str, user_content: str, max_tokens: int = 1000,
+                                  json_mode: bool = False, timeout: int = 30) -> str:
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
         
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens
+        }
+        if json_mode:
+            data["response_format"] = {"type": "json_object"}
+        
+        session = http_sessions.get_session()
+        async with session.post(
+            f"{self.endpoint}/chat/completions", 
+            headers=headers, 
+            data=json.dumps(data),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            result = await response.json()
+            return result['choices'][0]['message']['content']
+    
+    async def _stream_request_async(self, system_prompt: str, user_content: str, max_tokens: int = 2000,
+                                    timeout: int = 120) -> AsyncIterator[str]:
+        """Yield the content of a streamed completion as it arrives"""
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
@@ -476,18 +868,31 @@ A well-written paragraph (or short set of paragraphs) that reads like a complete
             "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
+                {"role": "user", "content": user_content}
             ],
             "temperature": 0.7,
-            "max_tokens": 1000
+            "max_tokens": max_tokens,
+            "stream": True
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.endpoint}/chat/completions", 
-                headers=headers, 
-                data=json.dumps(data),
-                timeout=30
-            ) as response:
-                result = await response.json()
-                return result['choices'][0]['message']['content']
\ No newline at end of file
+        session = http_sessions.get_session()
+        async with session.post(
+            f"{self.endpoint}/chat/completions",
+            headers=headers,
+            data=json.dumps(data),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"ChatGPT API error: {response.status} {await response.text()}")
+            # Server-sent events, one "data: {...}" line per chunk
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                choices = json.loads(payload).get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
@@ -0,0 +1,99 @@
+from typing import Iterable, List, Sequence, Tuple
+from app.config import settings
+from app.services.document_service import DocumentService
+from app.services.search_index import BM25Index
+from app.utils.helpers import chunk_text
+
+document_service = DocumentService()
+
+
+class DocumentIndex:
+    """Passage retrieval over one document, for answering questions about it.
+
+    The extracted text is split into passages of about
+    RETRIEVAL_CHUNK_CHARS (paragraph and sentence aware, like the chunks
+    used for summaries) and indexed with BM25. retrieve() picks the best
+    passages for a question up to a fixed character budget, so the prompt
+    stays the same size however long the document is, and answers can come
+    from any page rather than only the first few.
+    """
+
+    def __init__(self, passages: Sequence[str]):
+        self.passages = list(passages)
+        self.index = BM25Index()
+        for position, passage in enumerate(self.passages):
+            self.index.add(position, [(passage, 1.0)])
+
+    @classmethod
+    def from_text(cls, text: str, chunk_chars: int = None) -> "DocumentIndex":
+        chunk_chars = chunk_chars or settings.RETRIEVAL_CHUNK_CHARS
+        passages = []
+        for chunk in document_service.split_text(text, chunk_chars):
+            # A single sentence longer than a passage (e.g. OCR text without punctuation)
+            passages.extend(chunk_text(chunk, chunk_chars) if len(chunk) > chunk_chars else [chunk])
+        return cls(passages)
+
+    @property
+    def total_chars(self) -> int:
+        return sum(len(passage) for passage in self.passages)
+
+    def retrieve(self, question: str, top_k: int = None, budget_chars: int = None) -> List[int]:
+        """Positions of the passages to send for a question, in document order.
+
+        Short documents are sent whole. Otherwise the top_k BM25 matches
+        that fit in budget_chars are used; if nothing matches, the start of
+        the document is used as before.
+        """
+        top_k = top_k or settings.RETRIEVAL_TOP_K
+        budget_chars = budget_chars or settings.RETRIEVAL_CONTEXT_CHARS
+        if self.total_chars <= budget_chars:
+            return list(range(len(self.passages)))
+
+        hits, _, _ = self.index.search(question, limit=top_k, prefix_last=False)
+        positions = [position for position, _ in hits] or range(len(self.passages))
+
+        selected, used = [], 0
+        for position in positions:
+            length = len(self.passages[position])
+            if used + length <= budget_chars:
+                selected.append(position)
+                used += length
+        return sorted(selected)
+
+    def pack(self, questions: Sequence[str], budget_chars: int,
+             max_questions: int) -> List[Tuple[List[int], List[int]]]:
+        """Group questions into requests that share one deduplicated context.
+
+        Each question retrieves its own passages; taken in the order their
+        passages appear in the document, questions join a group while the
+        union of the group's passages fits in budget_chars. Returns
+        (question indexes, passage positions) per group.
+        """
+        per_question = min(budget_chars, settings.RETRIEVAL_CONTEXT_CHARS)
+        retrieved = [self.retrieve(question, budget_chars=per_question) for question in questions]
+        order = sorted(range(len(questions)), key=lambda i: (retrieved[i][0] if retrieved[i] else 0, i))
+
+        groups = []
+        members, positions = [], set()
+        for i in order:
+            union = positions | set(retrieved[i])
+            if members and (len(members) >= max_questions or self._chars(union) > budget_chars):
+                groups.append((members, sorted(positions)))
+                members, union = [], set(retrieved[i])
+            members.append(i)
+            positions = union
+        if members:
+            groups.append((members, sorted(positions)))
+        return groups
+
+    def _chars(self, positions: Iterable[int]) -> int:
+        return sum(len(self.passages[position]) for position in positions)
+
+    def context(self, positions: Sequence[int]) -> str:
+        """Passages labelled with their position, for the prompt"""
+        return "\n\n".join(f"[Passage {position + 1}]\n{self.passages[position]}" for position in positions)
+
+    def context_for(self, question: str) -> str:
+        positions = self.retrieve(question)
+        print(f"📚 Using {len(positions)}/{len(self.passages)} passages for question: {question[:60]}")
+        return self.context(positions)
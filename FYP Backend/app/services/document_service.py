@@ -33,6 +33,10 @@ class DocumentService:
         except Exception as e:
             raise Exception(f"Chunked text extraction error: {str(e)}")
     
+    def split_text(self, text: str, chunk_size: int = 2000) -> list:
+        """Split already extracted text into chunks"""
+        return self._split_into_chunks(text, chunk_size)
+    
     def _extract_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF using pypdf"""
         try:
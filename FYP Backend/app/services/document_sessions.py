@@ -0,0 +1,86 @@
+import time
+import uuid
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.services.document_index import DocumentIndex
+from app.utils.cache import TTLCache
+
+
+class DocumentSession:
+    """An uploaded document's extracted text and retrieval index"""
+
+    def __init__(self, user_id: str, filename: str, source_hash: str, text: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.filename = filename
+        self.source_hash = source_hash
+        self.text = text
+        self.index = DocumentIndex.from_text(text)
+        self.expires_at = 0.0
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "filename": self.filename,
+            "passages": len(self.index.passages),
+            "full_text_length": len(self.text),
+            "text_preview": self.text[:300] + "..." if len(self.text) > 300 else self.text,
+            "expires_in": max(0, int(self.expires_at - time.monotonic()))
+        }
+
+
+class DocumentSessionStore:
+    """Uploaded documents kept in memory so follow-up questions skip the upload.
+
+    A session holds the extracted text and its DocumentIndex; questions
+    that reference its id only pay for retrieval and the LLM call. Sessions
+    expire DOCUMENT_SESSION_TTL_SECONDS after their last use, and the least
+    recently used are dropped beyond DOCUMENT_SESSION_MAX_COUNT. Uploading
+    the same file again while its session is alive returns that session.
+    Sessions live in this API process only.
+    """
+
+    def __init__(self):
+        self._sessions = TTLCache(
+            max_size=settings.DOCUMENT_SESSION_MAX_COUNT,
+            ttl_seconds=settings.DOCUMENT_SESSION_TTL_SECONDS
+        )
+        # (user_id, source_hash) -> session id
+        self._by_source = TTLCache(
+            max_size=settings.DOCUMENT_SESSION_MAX_COUNT,
+            ttl_seconds=settings.DOCUMENT_SESSION_TTL_SECONDS
+        )
+
+    def create(self, user_id: str, filename: str, source_hash: str, text: str) -> DocumentSession:
+        session = DocumentSession(user_id, filename, source_hash, text)
+        self._touch(session)
+        print(f"📄 Document session {session.id[:8]} for user {user_id}: {len(session.index.passages)} passages")
+        return session
+
+    def find_by_source(self, user_id: str, source_hash: str) -> Optional[DocumentSession]:
+        session_id = self._by_source.get((user_id, source_hash))
+        return self.get(user_id, session_id) if session_id else None
+
+    def get(self, user_id: str, session_id: str) -> Optional[DocumentSession]:
+        """The user's live session (extending its lifetime), or None"""
+        session = self._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            return None
+        self._touch(session)
+        return session
+
+    def delete(self, user_id: str, session_id: str) -> bool:
+        session = self.get(user_id, session_id)
+        if session is None:
+            return False
+        self._sessions.delete(session.id)
+        self._by_source.delete((user_id, session.source_hash))
+        return True
+
+    def _touch(self, session: DocumentSession):
+        session.expires_at = time.monotonic() + settings.DOCUMENT_SESSION_TTL_SECONDS
+        self._sessions.set(session.id, session)
+        self._by_source.set((session.user_id, session.source_hash), session.id)
+
+
+document_sessions = DocumentSessionStore()
@@ -1,24 +1,47 @@
 import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from pydub import AudioSegment
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import aiohttp
 import json
+from typing import Callable, Dict, List, Optional, Tuple
 from app.services.chatgpt_service import ChatGPTService
 from app.services.elevenlabs_service import ElevenLabsService
 from app.services.youtube_service import YouTubeService
+from app.services.audio_assembler import AudioAssembler
+from app.services.tts_cache import TTSCache
+from app.services.pipeline import Pipeline, PipelineStage
+from app.compute.time_stretch import drift_stats, fit_clip
 from app.config import settings
 
+DEFAULT_SEGMENTS_DIR = "app/temp_uploads/audio_segments"
+
 class DubbingService:
     def __init__(self):
         self.chatgpt = ChatGPTService()
         self.elevenlabs = ElevenLabsService()
         self.youtube = YouTubeService()
+        self.tts_cache = TTSCache()
         self.executor = ThreadPoolExecutor(max_workers=3)  # Reduced for stability
+        self._stretch_pool = None
+    
+    @property
+    def stretch_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for CPU-bound time-stretching, started on first use"""
+        if self._stretch_pool is None:
+            self._stretch_pool = ProcessPoolExecutor(
+                max_workers=settings.DUBBING_STRETCH_WORKERS,
+                # Forking a process that runs threads and an event loop is unsafe
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._stretch_pool
     
     def convert_timestamp_to_seconds(self, timestamp: str) -> float:
         """Convert timestamp to seconds for synchronization"""
         try:
+            if isinstance(timestamp, (int, float)):
+                return float(timestamp)
+            
             # Handle different timestamp formats
             if ',' in timestamp:
                 timestamp = timestamp.replace(',', '.')
@@ -35,7 +58,84 @@ class DubbingService:
         except Exception:
             return 0
     
-    async def process_segment(self, segment_data):
+    def merge_transcript_segments(
+        self,
+        transcript: List[Tuple[str, str, str]],
+        target_seconds: float = None,
+        max_seconds: float = None,
+        max_gap_seconds: float = None
+    ) -> List[Tuple[float, float, str]]:
+        """Group adjacent caption cues into sentence-complete units for dubbing
+
+        A unit is closed once it reaches target_seconds and ends a sentence, or
+        when it would exceed max_seconds, or at a pause longer than
+        max_gap_seconds (so silences stay in sync). Text repeated from the
+        previous cue, as in rolling auto-captions, is dropped.
+        """
+        target_seconds = target_seconds or settings.DUBBING_TARGET_SEGMENT_SECONDS
+        max_seconds = max_seconds or settings.DUBBING_MAX_SEGMENT_SECONDS
+        max_gap_seconds = max_gap_seconds or settings.DUBBING_MAX_SEGMENT_GAP
+        
+        merged = []
+        unit_start = unit_end = None
+        unit_words: List[str] = []
+        
+        def flush():
+            if unit_words:
+                merged.append((unit_start, unit_end, " ".join(unit_words)))
+        
+        for start_time, end_time, text in transcript:
+            start = self.convert_timestamp_to_seconds(start_time)
+            end = self.convert_timestamp_to_seconds(end_time)
+            words = text.split()
+            if not words:
+                continue
+            
+            if unit_words and (start - unit_end > max_gap_seconds or end - unit_start > max_seconds):
+                flush()
+                unit_words = []
+            
+            if not unit_words:
+                unit_start = start
+                unit_words = list(words)
+            else:
+                unit_words.extend(words[self._repeated_prefix_length(unit_words, words):])
+            unit_end = max(end, unit_end or end)
+            
+            if unit_end - unit_start >= target_seconds and unit_words[-1][-1] in ".!?":
+                flush()
+                unit_words = []
+        
+        flush()
+        return merged
+    
+    def _repeated_prefix_length(self, previous_words: List[str], words: List[str], max_overlap: int = 30) -> int:
+        """Length of the longest prefix of words that repeats the end of previous_words"""
+        for size in range(min(len(previous_words), len(words), max_overlap), 0, -1):
+            if previous_words[-size:] == words[:size]:
+                return size
+        return 0
+    
+    async def synthesize_speech(self, text: str, cache_stats: Optional[Dict[str, int]] = None) -> bytes:
+        """Text to speech through the audio cache; counts hits and misses in cache_stats"""
+        key = self.tts_cache.key(
+            self.elevenlabs.default_voice_id, self.elevenlabs.model_id, self.elevenlabs.voice_settings, text
+        )
+        # Cache file I/O (and any eviction scan) stays off the pipeline's event loop
+        audio_bytes = await asyncio.to_thread(self.tts_cache.get, key)
+        hit = audio_bytes is not None
+        
+        if not hit:
+            audio_bytes = await self.elevenlabs.text_to_speech_async(text)
+            await asyncio.to_thread(self.tts_cache.put, key, audio_bytes)
+        
+        if cache_stats is not None:
+            cache_stats["hits" if hit else "misses"] += 1
+        return audio_bytes
+    
+    async def process_segment(self, segment_data, segments_dir: str = DEFAULT_SEGMENTS_DIR,
+                              translated_text: Optional[str] = None, target_language: str = "Urdu",
+                              cache_stats: Optional[Dict[str, int]] = None):
         """Process a single segment in parallel"""
         i, start_time, end_time, english_text = segment_data
         
@@ -50,16 +150,16 @@ class DubbingService:
                     'segment_index': i
                 }
             
-            # Translate text
-            urdu_text = await self.chatgpt.translate_text_async(english_text, "Urdu")
+            # Translate text unless a batch call already did
+            urdu_text = translated_text or await self.chatgpt.translate_text_async(english_text, target_language)
             
-            # Generate audio
-            audio_bytes = await self.elevenlabs.text_to_speech_async(urdu_text)
+            # Generate audio (reused from the cache when this text was voiced before)
+            audio_bytes = await self.synthesize_speech(urdu_text, cache_stats)
             
             # Create segments directory if it doesn't exist
-            os.makedirs("app/temp_uploads/audio_segments", exist_ok=True)
+            os.makedirs(segments_dir, exist_ok=True)
             
-            segment_file = f"app/temp_uploads/audio_segments/segment_{i:03d}.mp3"
+            segment_file = os.path.join(segments_dir, f"segment_{i:03d}.mp3")
             self.elevenlabs.save_audio_to_file(audio_bytes, segment_file)
             
             # Calculate timing
@@ -74,6 +174,7 @@ class DubbingService:
                 'audio_file': segment_file,
                 'english_text': english_text,
                 'translated_text': urdu_text,
+                'segment_index': i,
                 'success': True
             }
         except Exception as e:
@@ -84,10 +185,47 @@ class DubbingService:
                 'segment_index': i
             }
     
-    async def create_synchronized_audio(self, video_url: str, target_language: str = "Urdu") -> str:
+    async def create_synchronized_audio(
+        self,
+        video_url: str,
+        target_language: str = "Urdu",
+        segments_dir: str = DEFAULT_SEGMENTS_DIR,
+        completed_segments: Optional[Dict[int, dict]] = None,
+        on_segment_done: Optional[Callable[[int, dict], None]] = None,
+        job_stats: Optional[Dict] = None,
+        output_path: Optional[str] = None,
+        on_progress: Optional[Callable[[dict], None]] = None
+    ) -> str:
         """
-        Create dubbed audio synchronized with video timestamps using parallel processing
+        Create dubbed audio synchronized with video timestamps using a staged pipeline
+
+        Segments flow through translate -> TTS -> decode -> fit stages, each with
+        its own bounded queue and worker count, so translating later segments
+        overlaps voicing earlier ones. The fit stage time-stretches each clip
+        toward its cue's duration so the track doesn't drift from the video.
+        Clips are placed at their cue's start time, in segment order, as soon
+        as all earlier segments are done, and the finished part of the track is
+        encoded straight away, so the output MP3 grows while later segments
+        are still being voiced.
+
+        completed_segments holds results from a previous attempt (keyed by segment
+        index); those segments are reused instead of being translated and voiced
+        again. on_segment_done is called with each newly finished segment so the
+        caller can checkpoint it. If job_stats is given it is filled with
+        per-job statistics such as TTS cache hits and per-stage throughput.
+        The dubbed track is written to output_path (a random file under
+        app/temp_uploads by default) as a headerless MP3 stream that is
+        playable while it grows. on_progress receives a snapshot (stage,
+        segment counts, per-stage counts, seconds of audio encoded) at each
+        stage change and whenever segments are placed.
         """
+        def report(stage: str, **snapshot):
+            if on_progress:
+                try:
+                    on_progress({"stage": stage, **snapshot})
+                except Exception as e:
+                    print(f"Error reporting progress: {str(e)}")
+        
         try:
             # Get transcript with timestamps
             print("Getting transcript...")
@@ -98,73 +236,211 @@ class DubbingService:
             print(f"Processing {len(transcript)} segments...")
             
             # Create directory for audio segments
-            os.makedirs("app/temp_uploads/audio_segments", exist_ok=True)
+            os.makedirs(segments_dir, exist_ok=True)
+            
+            # Merge tiny caption cues so each API call covers a full sentence or two
+            units = self.merge_transcript_segments(transcript)
+            print(f"Merged {len(transcript)} caption cues into {len(units)} dubbing segments")
+            report("segmenting", segments_total=len(units))
             
-            # Prepare segment data for parallel processing
             segment_data_list = [
                 (i, start_time, end_time, english_text) 
-                for i, (start_time, end_time, english_text) in enumerate(transcript)
+                for i, (start_time, end_time, english_text) in enumerate(units)
             ]
             
-            # Limit number of segments for testing
-            if len(segment_data_list) > 20:
-                print(f"Limiting to first 20 segments out of {len(segment_data_list)}")
-                segment_data_list = segment_data_list[:20]
-            
-            # Process segments in parallel with limited concurrency
-            semaphore = asyncio.Semaphore(2)  # Limit concurrent requests
-            
-            async def process_with_semaphore(segment_data):
-                async with semaphore:
-                    return await self.process_segment(segment_data)
+            # Resume: reuse segments finished by an earlier attempt
+            resumed_segments = {
+                index: segment for index, segment in (completed_segments or {}).items()
+                if index < len(segment_data_list) and os.path.exists(segment['audio_file'])
+            }
+            if resumed_segments:
+                print(f"Resuming with {len(resumed_segments)} segments already completed")
             
-            tasks = [process_with_semaphore(segment_data) for segment_data in segment_data_list]
-            segments_info = await asyncio.gather(*tasks, return_exceptions=True)
+            cache_stats = {"hits": 0, "misses": 0}
+            duration = max((end for _, end, _ in units), default=0)
+            assembler = AudioAssembler(duration, scratch_path=os.path.join(segments_dir, "mix.pcm"))
+            final_output = output_path or f"app/temp_uploads/final_dubbed_audio_{os.urandom(4).hex()}.mp3"
+            assembler.open_stream(final_output, bitrate="128k")
+            # One thread per job keeps encoder writes in order and off the event loop
+            stream_executor = ThreadPoolExecutor(max_workers=1)
+            stream_writes: List[asyncio.Future] = []
             
-            # Filter successful segments
-            successful_segments = [seg for seg in segments_info if isinstance(seg, dict) and seg.get('success')]
-            failed_segments = [seg for seg in segments_info if isinstance(seg, dict) and not seg.get('success')]
+            # Clips are placed strictly in segment order; finished segments wait
+            # here until every earlier one has been placed or skipped
+            ready: Dict[int, Tuple[Optional[dict], object, Optional[dict]]] = {}
+            placement = {"next": 0, "streamed": 0.0}
+            placements: List[dict] = []
+            successful_segments: List[dict] = []
+            failed_count = 0
             
-            if failed_segments:
-                print(f"Failed to process {len(failed_segments)} segments")
+            def report_segments():
+                report(
+                    "creating_audio",
+                    segments_total=len(units),
+                    segments_done=placement["next"],
+                    segments_succeeded=len(successful_segments),
+                    segments_failed=failed_count,
+                    segments_resumed=len(resumed_segments),
+                    streamed_seconds=round(placement["streamed"], 1),
+                    stages={
+                        stage.name: {"processed": stage.processed, "failed": stage.failed, "queue_depth": stage.queue.qsize()}
+                        for stage in pipeline.stages
+                    }
+                )
             
-            if not successful_segments:
-                raise Exception("No segments were processed successfully")
+            def deliver(index: int, segment: Optional[dict] = None, samples=None, fit: Optional[dict] = None):
+                ready[index] = (segment, samples, fit)
+                placed_before = placement["next"]
+                while placement["next"] in ready:
+                    segment, samples, fit = ready.pop(placement["next"])
+                    placement["next"] += 1
+                    if samples is None:
+                        continue
+                    # Fitted clips start on their cue, so earlier overruns never push later clips
+                    end = assembler.place(samples, segment['start_time'])
+                    placements.append({
+                        "end": end,
+                        "cue_end": segment['end_time'],
+                        **fit
+                    })
+                    successful_segments.append(segment)
+                
+                # Later clips start at or after the next cue, so audio before it is final
+                if placement["next"] < len(units):
+                    final_until = units[placement["next"]][0]
+                    if final_until - placement["streamed"] >= settings.DUBBING_STREAM_CHUNK_SECONDS:
+                        placement["streamed"] = final_until
+                        stream_writes.append(asyncio.get_running_loop().run_in_executor(
+                            stream_executor, assembler.stream_until, final_until
+                        ))
+                
+                if placement["next"] > placed_before:
+                    report_segments()
             
-            print(f"Successfully processed {len(successful_segments)} segments")
+            async def translate_batch(batch):
+                try:
+                    texts = await self.chatgpt.translate_batch_async(
+                        [segment_data[3] for segment_data in batch], target_language
+                    )
+                except Exception as e:
+                    # Segments without a translation fall back to per-segment calls
+                    print(f"Error translating batch of {len(batch)} segments: {str(e)}")
+                    texts = [None] * len(batch)
+                for segment_data, text in zip(batch, texts):
+                    await tts_stage.put((segment_data, text))
             
-            # Sort segments by start time
-            successful_segments.sort(key=lambda x: x['start_time'])
+            async def synthesize(item):
+                nonlocal failed_count
+                segment_data, translated_text = item
+                result = await self.process_segment(
+                    segment_data, segments_dir,
+                    translated_text=translated_text,
+                    target_language=target_language,
+                    cache_stats=cache_stats
+                )
+                if not result.get('success'):
+                    failed_count += 1
+                    deliver(segment_data[0])
+                    raise Exception(result.get('error'))
+                if on_segment_done:
+                    try:
+                        on_segment_done(result['segment_index'], result)
+                    except Exception as e:
+                        # A missed checkpoint only costs redoing this segment on retry
+                        print(f"Error checkpointing segment {result['segment_index']}: {str(e)}")
+                await decode_stage.put(result)
             
-            # Create final synchronized audio
-            final_audio = AudioSegment.silent(duration=0)
-            current_position = 0
+            async def decode(segment):
+                loop = asyncio.get_running_loop()
+                try:
+                    samples = await loop.run_in_executor(self.executor, assembler.decode, segment['audio_file'])
+                except Exception:
+                    deliver(segment['segment_index'])
+                    raise
+                await fit_stage.put((segment, samples))
             
-            for segment in successful_segments:
+            async def fit(item):
+                segment, samples = item
+                index = segment['segment_index']
+                # Time until the next cue starts; the last cue can run on freely
+                window = units[index + 1][0] - segment['start_time'] if index + 1 < len(units) else None
+                loop = asyncio.get_running_loop()
                 try:
-                    # Load generated audio
-                    segment_audio = AudioSegment.from_mp3(segment['audio_file'])
-                    segment_duration = len(segment_audio) / 1000.0
-                    
-                    # Calculate silence needed
-                    silence_needed = segment['start_time'] - current_position
-                    
-                    if silence_needed > 0:
-                        silence = AudioSegment.silent(duration=int(silence_needed * 1000))
-                        final_audio += silence
-                        current_position += silence_needed
-                    
-                    # Add segment audio
-                    final_audio += segment_audio
-                    current_position += segment_duration
-                    
+                    fitted, fit_info = await loop.run_in_executor(
+                        self.stretch_pool, fit_clip,
+                        samples, assembler.sample_rate, segment['original_duration'], window,
+                        settings.DUBBING_MIN_STRETCH_RATE, settings.DUBBING_MAX_STRETCH_RATE,
+                        settings.DUBBING_MAX_OVERLAP_SECONDS
+                    )
                 except Exception as e:
-                    print(f"Error adding segment to final audio: {str(e)}")
-                    continue
+                    # Better an unfitted clip than a gap in the track
+                    print(f"Error fitting segment {index}: {str(e)}")
+                    fitted, fit_info = samples, {"rate": 1.0, "trimmed_seconds": 0.0, "overlap_seconds": 0.0}
+                deliver(index, segment, fitted, fit_info)
+            
+            queue_size = settings.DUBBING_STAGE_QUEUE_SIZE
+            translate_stage = PipelineStage("translate", translate_batch, settings.DUBBING_TRANSLATE_WORKERS, queue_size)
+            tts_stage = PipelineStage("tts", synthesize, settings.DUBBING_TTS_WORKERS, queue_size)
+            decode_stage = PipelineStage("decode", decode, settings.DUBBING_DECODE_WORKERS, queue_size)
+            fit_stage = PipelineStage("fit", fit, settings.DUBBING_STRETCH_WORKERS, queue_size)
+            pipeline = Pipeline([translate_stage, tts_stage, decode_stage, fit_stage])
+            
+            async def feed():
+                batch_size = settings.DUBBING_TRANSLATION_BATCH_SIZE
+                batch = []
+                for segment_data in segment_data_list:
+                    index = segment_data[0]
+                    if index in resumed_segments:
+                        await decode_stage.put(resumed_segments[index])
+                    elif len(segment_data[3].strip()) < 10:
+                        # Too short to voice; leave silence
+                        deliver(index)
+                    else:
+                        batch.append(segment_data)
+                        if len(batch) == batch_size:
+                            await translate_stage.put(batch)
+                            batch = []
+                if batch:
+                    await translate_stage.put(batch)
             
-            # Export final audio
-            final_output = f"app/temp_uploads/final_dubbed_audio_{os.urandom(4).hex()}.mp3"
-            final_audio.export(final_output, format="mp3", bitrate="128k")
+            try:
+                await pipeline.run(feed)
+                
+                if failed_count:
+                    print(f"Failed to process {failed_count} segments")
+                
+                if not successful_segments:
+                    raise Exception("No segments were processed successfully")
+                
+                print(f"Successfully processed {len(successful_segments)} segments")
+                
+                # Encode whatever is left after the last streamed chunk
+                report("encoding", segments_total=len(units), segments_done=len(units))
+                # A failed chunk write means the MP3 stopped growing: fail the job
+                await asyncio.gather(*stream_writes)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(stream_executor, assembler.finish_stream)
+                print(f"Assembled {len(successful_segments)} segments into {assembler.duration_seconds:.1f}s of audio")
+            finally:
+                # Collect any chunk write errors before the encoder is closed
+                await asyncio.gather(*stream_writes, return_exceptions=True)
+                stream_executor.shutdown(wait=True)
+                assembler.close()
+            
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            cache_stats["hit_rate"] = round(cache_stats["hits"] / lookups, 3) if lookups else 0.0
+            print(f"TTS cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            pipeline_stats = pipeline.stats()
+            for name, stage_stats in pipeline_stats.items():
+                print(f"Stage {name}: {stage_stats['throughput_per_second']}/s, "
+                      f"max queue {stage_stats['max_queue_depth']}, utilization {stage_stats['utilization']}")
+            sync_stats = drift_stats(placements)
+            print(f"Sync: {sync_stats.get('stretched', 0)} clips stretched, {sync_stats.get('trimmed', 0)} trimmed, "
+                  f"final drift {sync_stats.get('final_drift_seconds', 0)}s")
+            if job_stats is not None:
+                job_stats["tts_cache"] = cache_stats
+                job_stats["pipeline"] = pipeline_stats
+                job_stats["sync"] = sync_stats
             
             print(f"Final audio created: {final_output}")
             
@@ -179,12 +455,6 @@ class DubbingService:
             return final_output
             
         except Exception as e:
-            # Cleanup on error
+            # Segment files are kept so a retry can resume from them
             print(f"Dubbing error: {str(e)}")
-            if os.path.exists("app/temp_uploads/audio_segments"):
-                for file in os.listdir("app/temp_uploads/audio_segments"):
-                    try:
-                        os.remove(f"app/temp_uploads/audio_segments/{file}")
-                    except:
-                        pass
-            raise e
\ No newline at end of file
+            raise e
@@ -1,5 +1,6 @@
 from elevenlabs import ElevenLabs
 from app.config import settings
+from app.utils.http_client import http_sessions
 import aiohttp
 
 class ElevenLabsService:
@@ -7,6 +8,12 @@ class ElevenLabsService:
         self.api_key = settings.ELEVENLABS_API_KEY
         self.client = ElevenLabs(api_key=self.api_key)
         self.default_voice_id = "kvQSb3naDTi3sgHwwBC1"
+        self.base_url = "https://api.elevenlabs.io/v1"
+        self.model_id = "eleven_multilingual_v2"
+        self.voice_settings = {
+            "stability": 0.5,
+            "similarity_boost": 0.5
+        }
     
     # Add this method to your existing ElevenLabsService class
 
@@ -15,36 +22,33 @@ class ElevenLabsService:
         try:
             voice_id = voice_id or self.default_voice_id
             
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-                
-                headers = {
-                    "Accept": "audio/mpeg",
-                    "Content-Type": "application/json",
-                    "xi-api-key": self.api_key
-                }
-                
-                data = {
-                    "text": text,
-                    "model_id": "eleven_multilingual_v2",
-                    "voice_settings": {
-                        "stability": 0.5,
-                        "similarity_boost": 0.5
-                    }
-                }
-                
-                async with session.post(
-                    url, 
-                    headers=headers, 
-                    json=data,
-                    timeout=30
-                ) as response:
-                    if response.status == 200:
-                        return await response.read()
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"ElevenLabs API error: {error_text}")
-                        
+            session = http_sessions.get_session()
+            url = f"{self.base_url}/text-to-speech/{voice_id}"
+            
+            headers = {
+                "Accept": "audio/mpeg",
+                "Content-Type": "application/json",
+                "xi-api-key": self.api_key
+            }
+            
+            data = {
+                "text": text,
+                "model_id": self.model_id,
+                "voice_settings": self.voice_settings
+            }
+            
+            async with session.post(
+                url, 
+                headers=headers, 
+                json=data,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 200:
+                    return await response.read()
+                else:
+                    error_text = await response.text()
+                    raise Exception(f"ElevenLabs API error: {error_text}")
+                    
         except Exception as e:
             raise Exception(f"ElevenLabs TTS async error: {str(e)}")
     
@@ -59,7 +63,7 @@ class ElevenLabsService:
             audio_generator = self.client.text_to_speech.convert(
                 voice_id=voice_id,
                 text=text,
-                model_id="eleven_multilingual_v2",
+                model_id=self.model_id,
                 output_format=output_format
             )
             
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from app.database.repositories import GeneratedOutputRepository, generated_output_repository
+
+# Part of every params hash: bump when prompts or parsers change so older
+# stored results are no longer returned
+GENERATION_VERSION = 2
+
+def params_hash(params: Dict[str, Any]) -> str:
+    material = json.dumps({**params, "version": GENERATION_VERSION}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def combined_hash(*hashes: str) -> str:
+    """One source hash for outputs generated from several inputs (order matters)"""
+    return hashlib.sha256(":".join(hashes).encode("utf-8")).hexdigest()
+
+
+class GenerationStore:
+    """Stores generated outputs so repeat requests skip extraction and LLM calls.
+
+    Results are keyed by user, kind (e.g. "document_summary"), the hash of
+    the source material and the generation parameters. Concurrent requests
+    for the same key in this process are serialized with single_flight(),
+    so a double-submitted upload only generates once. Storage failures
+    never fail the request: a miss just means generating again. Callers
+    skip save() for results with nothing parsed, so a bad response is
+    regenerated next time rather than replayed.
+    """
+
+    def __init__(self, repository: GeneratedOutputRepository = generated_output_repository):
+        self.repository = repository
+        self._locks: Dict[tuple, list] = {}
+
+    @asynccontextmanager
+    async def single_flight(self, user_id: str, kind: str, source_hash: str, params: Dict[str, Any]):
+        key = (user_id, kind, source_hash, params_hash(params))
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def single_flight_stream(self, user_id: str, kind: str, source_hash: str, params: Dict[str, Any],
+                                   events: AsyncIterator[str],
+                                   replay: Callable[[Dict[str, Any]], AsyncIterator[str]],
+                                   regenerate: bool = False) -> AsyncIterator[str]:
+        """Stream events while holding single_flight() for the key.
+
+        A streaming route returns before anything is generated, leaving its
+        own single_flight() block, so the lock is taken again here for the
+        whole stream. A request that waited behind another for the same key
+        replays what that one stored instead of generating again.
+        """
+        async with self.single_flight(user_id, kind, source_hash, params):
+            stored = None if regenerate else await self.lookup(user_id, kind, source_hash, params)
+            async for event in (replay(stored) if stored else events):
+                yield event
+
+    async def lookup(self, user_id: str, kind: str, source_hash: str,
+                     params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Stored result, or None on a miss (or if storage is unavailable)"""
+        try:
+            row = await self.repository.find(user_id, kind, source_hash, params_hash(params))
+        except Exception as e:
+            print(f"Generated output lookup failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        print(f"♻️ Reusing stored {kind} {row['id']} for user {user_id}")
+        return row["result"]
+
+    async def save(self, user_id: str, kind: str, source_hash: str,
+                   params: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.repository.save(user_id, kind, source_hash, params_hash(params), params, result)
+        except Exception as e:
+            print(f"Could not store generated {kind}: {str(e)}")
+            return None
+
+
+generation_store = GenerationStore()
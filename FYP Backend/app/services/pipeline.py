@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+class PipelineStage:
+    """A pool of async workers draining one bounded queue.
+
+    The handler is responsible for passing its output on (usually by
+    awaiting the next stage's put), so a full downstream queue slows this
+    stage down instead of letting work pile up in memory.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[None]], workers: int, queue_size: int):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._tasks: List[asyncio.Task] = []
+        self._started_at = None
+        self._finished_at = None
+
+    async def put(self, item: Any):
+        await self.queue.put(item)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def drain(self):
+        """Wait until every queued item is handled, then stop the workers"""
+        await self.queue.join()
+        await self.stop()
+        self._finished_at = time.monotonic()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            item = await self.queue.get()
+            started = time.monotonic()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Pipeline stage '{self.name}' error: {str(e)}")
+            finally:
+                self.busy_seconds += time.monotonic() - started
+                self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput, latency and queue depth, for tuning worker counts"""
+        elapsed = ((self._finished_at or time.monotonic()) - self._started_at) if self._started_at else 0.0
+        done = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "throughput_per_second": round(done / elapsed, 3) if elapsed else 0.0,
+            "avg_item_seconds": round(self.busy_seconds / done, 3) if done else 0.0,
+            # Fraction of worker time spent busy; near 1.0 means the stage is the bottleneck
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0
+        }
+
+
+class Pipeline:
+    """Chain of stages that run concurrently, so stage N+1 overlaps stage N"""
+
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages = stages
+
+    async def run(self, feed: Callable[[], Awaitable[None]]):
+        """Start all stages, run the feed coroutine, then drain stages in order"""
+        for stage in self.stages:
+            stage.start()
+        try:
+            await feed()
+            for stage in self.stages:
+                await stage.drain()
+        finally:
+            for stage in self.stages:
+                await stage.stop()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,188 @@
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+from pydantic import ValidationError
+from app.services.structured_output import QuestionAnswer, questions_text
+from app.utils.sse import format_sse
+
+Event = Tuple[str, Dict[str, Any]]
+
+# Bullets and numbering stripped from question/answer lines, as in the route parsers
+_LIST_MARKERS = "1234567890.-• "
+
+# A JSON object spread over more lines than this is given up on
+_MAX_PENDING_CHARS = 8000
+
+
+class QuestionStreamParser:
+    """Incremental parser for streamed question generation output.
+
+    Accepts either JSON lines (an optional {"analysis": ...} line, then one
+    {"question": ..., "answer": ...} object per line) or the
+    ANALYSIS:/QUESTIONS:/ANSWERS: text format, detected from the first
+    line. feed() takes each chunk of streamed text and returns the events it
+    completed, so a question is emitted as soon as its line ends rather
+    than once the whole response has arrived:
+
+        ("analysis", {"analysis"})
+        ("question", {"index", "question", "answer"})  # answer is None in text mode
+        ("answer", {"index", "answer"})                 # text mode only
+
+    result() has the shape of parse_questions_response, plus "analysis"
+    when with_analysis is set (parse_past_paper_analysis).
+    """
+
+    def __init__(self, with_analysis: bool = False):
+        self.with_analysis = with_analysis
+        self.mode = None  # "json" or "text", from the first line
+        self.section = None
+        self.analysis = ""
+        self.analysis_sent = False
+        self.questions: List[str] = []
+        self.answers: List[str] = []
+        self.skipped = 0
+        self._line_buffer = ""
+        self._pending = ""
+        self._text: List[str] = []
+
+    def feed(self, delta: str) -> List[Event]:
+        self._text.append(delta)
+        *lines, self._line_buffer = (self._line_buffer + delta).split("\n")
+        events = []
+        for line in lines:
+            events.extend(self._parse_line(line))
+        return events
+
+    def close(self) -> List[Event]:
+        """Events from the final unterminated line; call once the stream ends"""
+        events = self._parse_line(self._line_buffer)
+        self._line_buffer = ""
+        if self._pending:
+            self.skipped += 1
+            self._pending = ""
+        events.extend(self._flush_analysis())
+        if self.skipped:
+            print(f"Skipped {self.skipped} unparseable item(s) in streamed questions")
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        count = min(len(self.questions), len(self.answers))
+        if self.mode == "json":
+            items = [QuestionAnswer(question=q, answer=a) for q, a in zip(self.questions, self.answers)]
+            full_text = questions_text(items)
+            if self.with_analysis:
+                full_text = f"ANALYSIS:\n{self.analysis}\n\n{full_text}"
+        else:
+            full_text = "".join(self._text)
+        result = {
+            "questions": self.questions[:count],
+            "answers": self.answers[:count],
+            "full_text": full_text
+        }
+        return {"analysis": self.analysis.strip(), **result} if self.with_analysis else result
+
+    def _parse_line(self, line: str) -> List[Event]:
+        line = line.strip()
+        if not line or line.startswith("```"):
+            return []
+        if self.mode is None:
+            self.mode = "json" if line.startswith("{") else "text"
+        return self._json_line(line) if self.mode == "json" else self._text_line(line)
+
+    def _json_line(self, line: str) -> List[Event]:
+        # Objects normally take one line each, but tolerate pretty-printed ones
+        if not self._pending and not line.startswith("{"):
+            self.skipped += 1
+            return []
+        self._pending += line
+        try:
+            item = json.loads(self._pending.rstrip(","))
+        except ValueError:
+            if len(self._pending) > _MAX_PENDING_CHARS:
+                self.skipped += 1
+                self._pending = ""
+            return []
+        self._pending = ""
+
+        if isinstance(item, dict) and "analysis" in item and "question" not in item:
+            self.analysis = str(item["analysis"])
+            return self._flush_analysis()
+        try:
+            parsed = QuestionAnswer.parse_obj(item)
+        except ValidationError:
+            self.skipped += 1
+            return []
+        index = len(self.questions)
+        self.questions.append(parsed.question)
+        self.answers.append(parsed.answer)
+        return self._flush_analysis() + [
+            ("question", {"index": index, "question": parsed.question, "answer": parsed.answer})
+        ]
+
+    def _text_line(self, line: str) -> List[Event]:
+        # Same rules as parse_questions_response / parse_past_paper_analysis
+        if "ANALYSIS:" in line:
+            self.section = "analysis"
+            self.analysis = line.replace("ANALYSIS:", "").strip()
+        elif "QUESTIONS:" in line:
+            self.section = "questions"
+            return self._flush_analysis()
+        elif "ANSWERS:" in line:
+            self.section = "answers"
+        elif self.section == "analysis":
+            self.analysis += " " + line
+        elif self.section in ("questions", "answers") and (line[0].isdigit() or line.startswith("-") or line.startswith("•")):
+            content = line.lstrip(_LIST_MARKERS).strip()
+            if not content:
+                return []
+            if self.section == "questions":
+                self.questions.append(content)
+                return [("question", {"index": len(self.questions) - 1, "question": content, "answer": None})]
+            self.answers.append(content)
+            index = len(self.answers) - 1
+            if index < len(self.questions):
+                return [("answer", {"index": index, "answer": content})]
+        return []
+
+    def _flush_analysis(self) -> List[Event]:
+        if not self.with_analysis or self.analysis_sent or not self.analysis.strip():
+            return []
+        self.analysis_sent = True
+        return [("analysis", {"analysis": self.analysis.strip()})]
+
+
+async def question_events(deltas: AsyncIterator[str],
+                          finish: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                          with_analysis: bool = False) -> AsyncIterator[str]:
+    """SSE events for a streamed generation: each question as it completes,
+    then "done" with finish(parsed result), or "error" if generation fails.
+
+    finish() builds (and stores) the endpoint's usual response body from
+    the parsed result, so "done" carries the same JSON as a non-streaming
+    request. It is not called when no questions could be parsed, so an
+    unusable response is never stored.
+    """
+    parser = QuestionStreamParser(with_analysis)
+    try:
+        async for delta in deltas:
+            for event, data in parser.feed(delta):
+                yield format_sse(event, data)
+        for event, data in parser.close():
+            yield format_sse(event, data)
+        parsed = parser.result()
+        if not parsed["questions"]:
+            print("Question stream produced no parseable questions")
+            yield format_sse("error", {"detail": "No questions could be parsed from the response"})
+            return
+        yield format_sse("done", await finish(parsed))
+    except Exception as e:
+        print(f"Question stream error: {str(e)}")
+        yield format_sse("error", {"detail": str(e)})
+
+
+async def stored_question_events(response: Dict[str, Any], parsed: Dict[str, Any]) -> AsyncIterator[str]:
+    """Replay a stored result as the events of a streamed one"""
+    if parsed.get("analysis"):
+        yield format_sse("analysis", {"analysis": parsed["analysis"]})
+    for index, (question, answer) in enumerate(zip(parsed.get("questions", []), parsed.get("answers", []))):
+        yield format_sse("question", {"index": index, "question": question, "answer": answer})
+    yield format_sse("done", response)
@@ -0,0 +1,261 @@
+import bisect
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their this to was were will with
+""".split())
+
+# Shortest query term that is expanded to every indexed term it prefixes
+MIN_PREFIX_LENGTH = 2
+# Cap on expansions per prefix; the most common matching terms are kept
+MAX_PREFIX_EXPANSIONS = 64
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (any script), stopwords removed"""
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """In-memory inverted index with BM25 ranking and incremental updates.
+
+    Documents are added under any hashable key with a set of weighted text
+    fields (e.g. title counted three times as much as body). Each document
+    gets a slot; a term's postings are two append-only typed arrays (slots
+    and weighted term frequencies) that NumPy reads without copying, so a
+    query over 100k documents is a handful of vectorized operations.
+    Removing or re-adding a document only marks its old slot dead; dead
+    postings are dropped once they make up a quarter of all slots.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._slots: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = []
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._total_length = 0.0
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocabulary)
+
+    def add(self, key: Hashable, fields: Sequence[Tuple[str, float]]):
+        """Index (or re-index) a document from (text, weight) pairs"""
+        if key in self._slots:
+            self.remove(key)
+
+        terms: Dict[str, float] = {}
+        for text, weight in fields:
+            for term, count in Counter(tokenize(text)).items():
+                terms[term] = terms.get(term, 0.0) + count * weight
+
+        slot = len(self._keys)
+        if slot >= len(self._lengths):
+            self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            self._alive = np.concatenate([self._alive, np.zeros_like(self._alive)])
+
+        length = sum(terms.values())
+        self._keys.append(key)
+        self._slots[key] = slot
+        self._lengths[slot] = length
+        self._alive[slot] = True
+        self._total_length += length
+
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("q"), array("f"))
+                bisect.insort(self._vocabulary, term)
+            postings[0].append(slot)
+            postings[1].append(frequency)
+
+    def remove(self, key: Hashable) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+
+        self._total_length -= float(self._lengths[slot])
+        self._alive[slot] = False
+        self._keys[slot] = None
+        if len(self._keys) - len(self._slots) > max(1024, len(self._keys) // 4):
+            self.compact()
+        return True
+
+    def compact(self):
+        """Renumber live slots and drop the postings of removed documents"""
+        live = np.flatnonzero(self._alive[:len(self._keys)])
+        new_slot = np.full(len(self._keys), -1, dtype=np.int64)
+        new_slot[live] = np.arange(len(live))
+
+        postings = {}
+        for term, (slots, frequencies) in self._postings.items():
+            slots = np.frombuffer(slots, dtype=np.int64)
+            frequencies = np.frombuffer(frequencies, dtype=np.float32)
+            keep = self._alive[slots]
+            if keep.any():
+                postings[term] = (array("q", new_slot[slots[keep]].tobytes()), array("f", frequencies[keep].tobytes()))
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+
+        capacity = max(1024, len(live) * 2)
+        lengths = np.zeros(capacity, dtype=np.float32)
+        lengths[:len(live)] = self._lengths[live]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(live)] = True
+        self._lengths, self._alive = lengths, alive
+        self._keys = [self._keys[slot] for slot in live]
+        self._slots = {key: slot for slot, key in enumerate(self._keys)}
+
+    def expand(self, prefix: str) -> List[str]:
+        """Indexed terms starting with prefix, most common first"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        terms = self._vocabulary[start:end]
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            terms = sorted(terms, key=lambda term: len(self._postings[term][0]), reverse=True)[:MAX_PREFIX_EXPANSIONS]
+        return terms
+
+    def query_terms(self, query: str, prefix_last: bool = True) -> List[List[str]]:
+        """Group the query into alternatives per query word.
+
+        The last word also matches every term it is a prefix of, so results
+        update as the user types.
+        """
+        words = tokenize(query)
+        groups = []
+        for i, word in enumerate(words):
+            if prefix_last and i == len(words) - 1 and len(word) >= MIN_PREFIX_LENGTH:
+                alternatives = self.expand(word)
+            else:
+                alternatives = [word] if word in self._postings else []
+            if alternatives:
+                groups.append(alternatives)
+        return groups
+
+    def search(self, query: str, limit: int = 10, offset: int = 0,
+               prefix_last: bool = True) -> Tuple[List[Tuple[Hashable, float]], int, List[str]]:
+        """Rank documents for a query.
+
+        Returns the (key, score) pairs for the requested window, the total
+        number of matching documents and the index terms that matched (for
+        highlighting). Documents match if they contain any query word.
+        """
+        if not self._slots:
+            return [], 0, []
+
+        groups = self.query_terms(query, prefix_last)
+        terms = [term for group in groups for term in group]
+        if not groups:
+            return [], 0, terms
+
+        slot_count = len(self._keys)
+        document_count = len(self._slots)
+        average_length = self._total_length / document_count or 1.0
+        norms = self.k1 * (1 - self.b + self.b * self._lengths[:slot_count] / average_length)
+
+        scores = np.zeros(slot_count, dtype=np.float32)
+        for alternatives in groups:
+            # Prefix alternatives of one word count once: take the best of them
+            best = np.zeros(slot_count, dtype=np.float32) if len(alternatives) > 1 else scores
+            for term in alternatives:
+                slots, frequencies = self._postings[term]
+                slots = np.frombuffer(slots, dtype=np.int64)
+                frequencies = np.frombuffer(frequencies, dtype=np.float32)
+                # Dead postings still count toward df until the next compaction
+                df = min(len(slots), document_count)
+                idf = np.float32(np.log(1 + (document_count - df + 0.5) / (df + 0.5)))
+                contribution = idf * frequencies * (self.k1 + 1) / (frequencies + norms[slots])
+                if best is scores:
+                    scores[slots] += contribution
+                else:
+                    np.maximum(best[slots], contribution, out=contribution)
+                    best[slots] = contribution
+            if best is not scores:
+                scores += best
+
+        scores *= self._alive[:slot_count]
+        matched = np.flatnonzero(scores)
+        total = len(matched)
+        wanted = min(offset + limit, total)
+        if wanted <= 0:
+            return [], total, terms
+
+        if wanted < total:
+            top = matched[np.argpartition(-scores[matched], wanted - 1)[:wanted]]
+        else:
+            top = matched
+        # Highest score first, ties in a stable order
+        top = top[np.lexsort((top, -scores[top]))][offset:wanted]
+
+        hits = [(self._keys[slot], float(scores[slot])) for slot in top]
+        return hits, total, terms
+
+
+def highlight_spans(text: str, terms: Sequence[str]) -> List[Tuple[int, int]]:
+    """(start, end) offsets of every word of text that is one of terms"""
+    wanted = set(terms)
+    return [match.span() for match in _TOKEN.finditer(text or "") if match.group().lower() in wanted]
+
+
+def make_snippet(text: str, terms: Sequence[str], width: int = 200) -> Tuple[str, List[Tuple[int, int]]]:
+    """Best window of text for the matched terms, with highlight offsets.
+
+    Picks the window of about width characters containing the most distinct
+    matched terms and returns it with (start, end) offsets of every matched
+    word inside it. Falls back to the start of the text without highlights.
+    """
+    text = " ".join((text or "").split())
+    wanted = set(terms)
+    matches = [
+        (match.start(), match.end(), match.group().lower())
+        for match in _TOKEN.finditer(text)
+        if match.group().lower() in wanted
+    ][:500]
+
+    if not matches:
+        snippet = text[:width]
+        return (snippet + "…" if len(text) > width else snippet), []
+
+    best_start, best_count = matches[0][0], 0
+    for i, (start, _, _) in enumerate(matches):
+        distinct = set()
+        for _, end, term in matches[i:]:
+            if end > start + width:
+                break
+            distinct.add(term)
+        if len(distinct) > best_count:
+            best_start, best_count = start, len(distinct)
+
+    # Open the window a little before the first match, on a word boundary
+    window_start = max(0, best_start - width // 4)
+    if window_start:
+        space = text.find(" ", window_start)
+        window_start = space + 1 if 0 <= space < best_start else best_start
+    window_end = min(len(text), window_start + width)
+    if window_end < len(text):
+        space = text.rfind(" ", window_start, window_end)
+        window_end = space if space > best_start else window_end
+
+    prefix = "…" if window_start > 0 else ""
+    suffix = "…" if window_end < len(text) else ""
+    highlights = [
+        (start - window_start + len(prefix), end - window_start + len(prefix))
+        for start, end, _ in matches
+        if start >= window_start and end <= window_end
+    ]
+    return prefix + text[window_start:window_end] + suffix, highlights
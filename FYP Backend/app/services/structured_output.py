@@ -0,0 +1,223 @@
+import json
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from pydantic import BaseModel, ValidationError, conlist, constr, validator
+from app.config import settings
+
+NonEmptyStr = constr(strip_whitespace=True, min_length=1)
+
+# A field to re-ask: (field,) for a whole field, (field, index) for one list item
+RepairTarget = Union[Tuple[str], Tuple[str, int]]
+
+
+class StructuredOutputError(Exception):
+    """The model's JSON could not be parsed or repaired into the schema"""
+    pass
+
+
+class QuestionAnswer(BaseModel):
+    question: NonEmptyStr
+    answer: NonEmptyStr
+
+
+def questions_text(items: List[QuestionAnswer]) -> str:
+    """Questions and answers in the QUESTIONS:/ANSWERS: text format"""
+    questions = "\n".join(f"{i + 1}. {item.question}" for i, item in enumerate(items))
+    answers = "\n".join(f"{i + 1}. {item.answer}" for i, item in enumerate(items))
+    return f"QUESTIONS:\n{questions}\n\nANSWERS:\n{answers}"
+
+
+class SummaryOutput(BaseModel):
+    english_summary: NonEmptyStr
+    urdu_summary: str = ""
+    key_points: conlist(NonEmptyStr, min_items=1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as parse_summary_response"""
+        full_summary = f"ENGLISH SUMMARY:\n{self.english_summary}\n\n"
+        if self.urdu_summary.strip():
+            full_summary += f"URDU SUMMARY:\n{self.urdu_summary.strip()}\n\n"
+        full_summary += "KEY POINTS:\n" + "\n".join(f"- {point}" for point in self.key_points)
+        return {
+            "english_summary": self.english_summary,
+            "urdu_summary": self.urdu_summary.strip(),
+            "key_points": list(self.key_points),
+            "full_summary": full_summary
+        }
+
+
+class QuestionsOutput(BaseModel):
+    questions: conlist(QuestionAnswer, min_items=1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as parse_questions_response"""
+        return {
+            "questions": [item.question for item in self.questions],
+            "answers": [item.answer for item in self.questions],
+            "full_text": questions_text(self.questions)
+        }
+
+
+class Confidence(str, Enum):
+    HIGH = "High"
+    MEDIUM = "Medium"
+    LOW = "Low"
+
+
+class AnswerOutput(BaseModel):
+    answer: NonEmptyStr
+    source_reference: str = ""
+    confidence_level: Confidence
+
+    @validator("confidence_level", pre=True)
+    def normalize_confidence(cls, value):
+        return value.strip().capitalize() if isinstance(value, str) else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as parse_answer_response"""
+        full_response = f"ANSWER:\n{self.answer}\n\n"
+        if self.source_reference.strip():
+            full_response += f"SOURCE REFERENCE:\n{self.source_reference.strip()}\n\n"
+        full_response += f"CONFIDENCE LEVEL:\n{self.confidence_level.value}"
+        return {
+            "answer": self.answer,
+            "source_reference": self.source_reference.strip(),
+            "confidence_level": self.confidence_level.value,
+            "full_response": full_response
+        }
+
+
+class NumberedAnswer(AnswerOutput):
+    id: int
+
+
+class BatchAnswerOutput(BaseModel):
+    answers: conlist(NumberedAnswer, min_items=1)
+
+
+class PastPaperOutput(BaseModel):
+    analysis: NonEmptyStr
+    questions: conlist(QuestionAnswer, min_items=1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as parse_past_paper_analysis"""
+        return {
+            "analysis": self.analysis,
+            "questions": [item.question for item in self.questions],
+            "answers": [item.answer for item in self.questions],
+            "full_text": f"ANALYSIS:\n{self.analysis}\n\n{questions_text(self.questions)}"
+        }
+
+
+def load_json_object(response: str) -> Dict[str, Any]:
+    """Parse a model response as a JSON object, tolerating a fenced code block"""
+    cleaned = (response or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        cleaned = cleaned[cleaned.find("{"):]
+    try:
+        data = json.loads(cleaned)
+    except ValueError as e:
+        raise StructuredOutputError(f"Response is not valid JSON: {str(e)}")
+    if not isinstance(data, dict):
+        raise StructuredOutputError("Response is not a JSON object")
+    return data
+
+
+def validate_output(model: Type[BaseModel], data: Dict[str, Any]) -> Tuple[Optional[BaseModel], Dict[RepairTarget, str]]:
+    """Validate data against model.
+
+    Returns the instance, or None and the smallest parts that failed: a
+    single list item when only that item is wrong, otherwise the field.
+    """
+    try:
+        return model.parse_obj(data), {}
+    except ValidationError as e:
+        errors = e.errors()
+
+    targets: Dict[RepairTarget, str] = {}
+    for error in errors:
+        loc = error["loc"]
+        field = loc[0]
+        if len(loc) > 1 and isinstance(loc[1], int) and isinstance(data.get(field), list):
+            target = (field, loc[1])
+        else:
+            target = (field,)
+        targets.setdefault(target, error["msg"])
+    # A whole-field target replaces item targets of the same field
+    whole = {target[0] for target in targets if len(target) == 1}
+    return None, {target: msg for target, msg in targets.items() if len(target) == 1 or target[0] not in whole}
+
+
+def repair_prompt(targets: Dict[RepairTarget, str]) -> str:
+    """Follow-up instruction asking for only the failing parts of the previous JSON"""
+    problems = "\n        ".join(
+        f"- {target[0]}" + (f"[{target[1]}]" if len(target) > 1 else "") + f": {msg}"
+        for target, msg in targets.items()
+    )
+    fields = sorted({target[0] for target in targets if len(target) == 1})
+    items = sorted(target for target in targets if len(target) > 1)
+    shape = [f'"{field}": <corrected value>' for field in fields]
+    for field in sorted({field for field, _ in items}):
+        indexes = ", ".join(f'"{index}": <corrected item>' for name, index in items if name == field)
+        shape.append(f'"{field}": {{{indexes}}}')
+    return f"""
+        Some parts of your previous JSON were missing or invalid:
+        {problems}
+        Respond with only a JSON object containing corrected values for exactly these parts,
+        in this shape (list items are keyed by their index): {{{", ".join(shape)}}}
+        Do not repeat any other fields.
+        """
+
+
+def merge_repair(data: Dict[str, Any], repair: Dict[str, Any], targets: Dict[RepairTarget, str]) -> Dict[str, Any]:
+    """Apply the corrected parts from a repair response to data"""
+    merged = dict(data)
+    for target in targets:
+        field = target[0]
+        if field not in repair:
+            continue
+        if len(target) == 1:
+            merged[field] = repair[field]
+            continue
+        replacements = repair[field]
+        index = target[1]
+        if isinstance(replacements, dict):
+            item = replacements.get(str(index), replacements.get(index))
+        elif isinstance(replacements, list) and len(replacements) == 1:
+            item = replacements[0]
+        else:
+            item = None
+        if item is not None:
+            merged[field] = list(merged[field])
+            merged[field][index] = item
+    return merged
+
+
+def salvage(model: Type[BaseModel], data: Dict[str, Any], targets: Dict[RepairTarget, str]) -> BaseModel:
+    """Last resort after repairs: drop list items that are still invalid"""
+    salvaged = dict(data)
+    items = sorted((target for target in targets if len(target) > 1), reverse=True)
+    for field, index in items:
+        salvaged[field] = list(salvaged[field])
+        del salvaged[field][index]
+    result, remaining = validate_output(model, salvaged)
+    if result is None:
+        raise StructuredOutputError(f"Invalid fields after repair: {', '.join(str(target) for target in remaining)}")
+    if items:
+        print(f"Dropped {len(items)} invalid item(s) from {model.__name__}")
+    return result
+
+
+def generate_with_fallback(structured: Callable[[], BaseModel], prose: Callable[[], str],
+                           parser: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Structured JSON generation, falling back to the text prompt and its parser.
+
+    Only schema failures fall back; API errors propagate as before.
+    """
+    if settings.LLM_STRUCTURED_OUTPUT:
+        try:
+            return structured().to_dict()
+        except StructuredOutputError as e:
+            print(f"Structured output failed, falling back to text parsing: {str(e)}")
+    return parser(prose())
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.database.repositories import SummaryRepository, summary_repository
+from app.utils.cache import TTLCache
+
+def summary_etag(row: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+class _UserBucket:
+    def __init__(self):
+        self.entries: "OrderedDict[int, Tuple[float, Dict[str, Any], str]]" = OrderedDict()
+        # Bumped on every write so a read that raced a write is not cached
+        self.generation = 0
+
+
+class SummaryCache:
+    """Per-user read-through cache of single summaries with their ETags.
+
+    Rows are dropped as soon as the repository reports an update or delete
+    of that summary (or a delete-all for the user). Entries also expire
+    after SUMMARY_CACHE_TTL_SECONDS to bound staleness from writes made in
+    other API processes.
+    """
+
+    def __init__(self, repository: SummaryRepository = summary_repository):
+        self.repository = repository
+        self._users = TTLCache(
+            max_size=settings.SUMMARY_CACHE_MAX_USERS,
+            ttl_seconds=settings.SUMMARY_CACHE_TTL_SECONDS
+        )
+        repository.add_listener(self)
+
+    async def get(self, user_id: str, summary_id: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(row, etag) of the user's summary, or (None, None) if it doesn't exist"""
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = _UserBucket()
+            self._users.set(user_id, bucket)
+
+        entry = bucket.entries.get(summary_id)
+        if entry is not None:
+            expires_at, row, etag = entry
+            if expires_at > time.monotonic():
+                bucket.entries.move_to_end(summary_id)
+                return row, etag
+            del bucket.entries[summary_id]
+
+        generation = bucket.generation
+        row = await self.repository.get(summary_id, user_id)
+        if row is None:
+            return None, None
+
+        etag = summary_etag(row)
+        if bucket.generation == generation and self._users.get(user_id) is bucket:
+            bucket.entries[summary_id] = (time.monotonic() + settings.SUMMARY_CACHE_TTL_SECONDS, row, etag)
+            while len(bucket.entries) > settings.SUMMARY_CACHE_PER_USER:
+                bucket.entries.popitem(last=False)
+        return row, etag
+
+    def invalidate(self, user_id: str, summary_id: Optional[int] = None):
+        """Drop one cached summary, or all of the user's when summary_id is None"""
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            return
+        bucket.generation += 1
+        if summary_id is None:
+            bucket.entries.clear()
+        else:
+            bucket.entries.pop(summary_id, None)
+
+    # Repository notifications
+
+    def summary_saved(self, user_id: str, row: Dict[str, Any]):
+        self.invalidate(user_id, row["id"])
+
+    def summary_deleted(self, user_id: str, summary_id: int):
+        self.invalidate(user_id, summary_id)
+
+    def summaries_cleared(self, user_id: str):
+        self.invalidate(user_id)
+
+
+summary_cache = SummaryCache()
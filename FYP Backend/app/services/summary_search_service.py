@@ -0,0 +1,129 @@
+import asyncio
+from typing import Any, Dict, List
+from app.config import settings
+from app.database.repositories import SummaryRepository, summary_repository
+from app.services.search_index import BM25Index, highlight_spans, make_snippet
+from app.utils.cache import TTLCache
+
+# Title words count this many times as much as content words
+TITLE_WEIGHT = 3.0
+# Rows read per query while building a user's index
+BUILD_PAGE_SIZE = 200
+
+class _UserIndex:
+    def __init__(self):
+        self.index = BM25Index()
+        self.ready = asyncio.Event()
+        self.failed = False
+        # Ids written while the index was being built; the build must not overwrite them
+        self.touched = set()
+
+
+class SummarySearchService:
+    """Full-text search over a user's summaries (BM25 over title and content).
+
+    Each user's index is built from the database on their first search and
+    then kept current by the repository's write notifications. Indexes
+    expire after SEARCH_INDEX_TTL_SECONDS, which bounds how stale they can
+    get from writes made by other API processes.
+    """
+
+    def __init__(self, repository: SummaryRepository = summary_repository):
+        self.repository = repository
+        self._indexes = TTLCache(
+            max_size=settings.SEARCH_INDEX_MAX_USERS,
+            ttl_seconds=settings.SEARCH_INDEX_TTL_SECONDS
+        )
+        repository.add_listener(self)
+
+    async def search(self, user_id: str, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Ranked matches with a highlighted snippet of each summary's content"""
+        index = await self._get_index(user_id)
+        hits, total, terms = index.search(query, limit=limit, offset=offset)
+
+        rows = await self.repository.get_many(
+            user_id,
+            [summary_id for summary_id, _ in hits],
+            columns=f"{SummaryRepository.LIST_COLUMNS},content"
+        )
+        rows_by_id = {row["id"]: row for row in rows}
+
+        results: List[Dict[str, Any]] = []
+        for summary_id, score in hits:
+            row = rows_by_id.get(summary_id)
+            if row is None:
+                continue  # Deleted by another process since the index was built
+            content = row.pop("content") or ""
+            snippet, highlights = make_snippet(content, terms)
+            results.append({
+                **row,
+                "score": round(score, 4),
+                "snippet": snippet,
+                "highlights": highlights,
+                "title_highlights": highlight_spans(row["title"], terms)
+            })
+
+        return {"results": results, "total": total}
+
+    # Repository notifications
+
+    def summary_saved(self, user_id: str, row: Dict[str, Any]):
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            return
+        if not entry.ready.is_set():
+            entry.touched.add(row["id"])
+        entry.index.add(row["id"], self._fields(row))
+
+    def summary_deleted(self, user_id: str, summary_id: int):
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            return
+        if not entry.ready.is_set():
+            entry.touched.add(summary_id)
+        entry.index.remove(summary_id)
+
+    def summaries_cleared(self, user_id: str):
+        entry = _UserIndex()
+        entry.ready.set()
+        self._indexes.set(user_id, entry)
+
+    async def _get_index(self, user_id: str) -> BM25Index:
+        entry = self._indexes.get(user_id)
+        if entry is not None:
+            await entry.ready.wait()
+            if not entry.failed:
+                return entry.index
+
+        entry = _UserIndex()
+        self._indexes.set(user_id, entry)
+        try:
+            await self._build(user_id, entry)
+        except Exception:
+            entry.failed = True
+            if self._indexes.get(user_id) is entry:
+                self._indexes.delete(user_id)
+            raise
+        finally:
+            entry.ready.set()
+        return entry.index
+
+    async def _build(self, user_id: str, entry: _UserIndex):
+        after = None
+        while True:
+            rows, after = await self.repository.list_page(
+                user_id, BUILD_PAGE_SIZE, after=after, include_content=True
+            )
+            for row in rows:
+                if row["id"] not in entry.touched:
+                    entry.index.add(row["id"], self._fields(row))
+            if after is None:
+                break
+        entry.touched.clear()
+        print(f"Built search index for user {user_id}: {len(entry.index)} summaries")
+
+    def _fields(self, row: Dict[str, Any]):
+        return [(row.get("title") or "", TITLE_WEIGHT), (row.get("content") or "", 1.0)]
+
+
+summary_search = SummarySearchService()
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Optional
+from app.config import settings
+
+class TTSCache:
+    """Content-addressed on-disk cache for synthesized speech.
+
+    Entries are keyed by voice, model, voice settings and normalized text,
+    and stored as <cache_dir>/<aa>/<sha256>.mp3. Reads refresh the file's
+    mtime, and once the cache grows past max_bytes the least recently used
+    files are evicted. The directory can be shared by several worker
+    processes: each only counts its own writes between scans, so evict()
+    rescans the directory before deciding, and the janitor calls it
+    periodically to catch growth from other processes. Methods do blocking
+    file I/O; call them from a thread.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.TTS_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TTS_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = None  # Scanned on the first write
+
+    def key(self, voice_id: str, model_id: str, voice_settings: Dict[str, Any], text: str) -> str:
+        """Cache key for one synthesis request"""
+        material = json.dumps(
+            [voice_id, model_id, voice_settings or {}, self.normalize_text(text)],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def normalize_text(self, text: str) -> str:
+        """Collapse differences that don't change the spoken audio"""
+        text = unicodedata.normalize("NFC", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio bytes, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, audio_bytes: bytes):
+        """Store audio bytes, evicting old entries if the cache is over its size limit"""
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(audio_bytes)
+            os.replace(temp_path, path)  # Atomic, so readers never see partial files
+        except OSError as e:
+            print(f"TTS cache write error: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(audio_bytes)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def evict(self) -> int:
+        """Rescan the directory and evict if over the limit; returns the cache size"""
+        with self._lock:
+            self._evict()
+            return self._size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".mp3"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        """Delete least recently used files until the cache is back under 90% of its limit.
+
+        Sizes come from a fresh scan, which includes other processes' writes.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        if total <= self.max_bytes:
+            self._size = total
+            return
+        target = int(self.max_bytes * 0.9)
+
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        self._size = total
@@ -1,12 +1,76 @@
 import yt_dlp
 import requests
 import re
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict
 import math
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# Shared across service instances so every route reuses fetched transcripts
+_transcript_cache = TTLCache(max_size=500, ttl_seconds=settings.TRANSCRIPT_CACHE_TTL)
 
 class YouTubeService:
+    def extract_video_id(self, video_url: str) -> Optional[str]:
+        """Extract the 11-character video ID from a YouTube URL"""
+        match = re.search(r'(?:v=|youtu\.be/|shorts/|embed/|live/)([A-Za-z0-9_-]{11})', video_url)
+        if match:
+            return match.group(1)
+        if re.fullmatch(r'[A-Za-z0-9_-]{11}', video_url):
+            return video_url
+        return None
+
+    def expand_video_urls(self, url: str) -> List[Dict[str, str]]:
+        """Expand a playlist (or single video) URL into its videos with one yt-dlp call"""
+        ydl_opts = {
+            'skip_download': True,
+            'extract_flat': 'in_playlist',
+            'quiet': True,
+        }
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+
+                entries = info.get('entries')
+                if entries is None:
+                    # Plain video URL
+                    return [{
+                        'video_id': info.get('id'),
+                        'video_url': info.get('webpage_url') or url,
+                        'title': info.get('title') or ""
+                    }]
+
+                videos = []
+                for entry in entries:
+                    if not entry or not entry.get('id'):
+                        continue
+                    videos.append({
+                        'video_id': entry['id'],
+                        'video_url': f"https://www.youtube.com/watch?v={entry['id']}",
+                        'title': entry.get('title') or ""
+                    })
+                return videos
+
+        except Exception as e:
+            raise Exception(f"YouTube playlist error: {str(e)}")
+
     def get_transcript_with_timestamps(self, video_url: str) -> Optional[List[Tuple[str, str, str]]]:
-        """Extract English transcript from YouTube video with timestamps"""
+        """Extract English transcript from YouTube video with timestamps (cached per video)"""
+        video_id = self.extract_video_id(video_url)
+        if video_id:
+            cached = _transcript_cache.get(video_id)
+            if cached is not None:
+                print(f"Transcript cache hit for video {video_id}")
+                return cached
+
+        transcript = self._fetch_transcript_with_timestamps(video_url)
+
+        if video_id and transcript:
+            _transcript_cache.set(video_id, transcript)
+        return transcript
+
+    def _fetch_transcript_with_timestamps(self, video_url: str) -> Optional[List[Tuple[str, str, str]]]:
+        """Download the English transcript from YouTube"""
         ydl_opts = {
             'skip_download': True,
             'writesubtitles': True,
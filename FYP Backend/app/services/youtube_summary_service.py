@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from app.config import settings
+from app.services.youtube_service import YouTubeService
+from app.services.chatgpt_service import ChatGPTService
+from app.services.summary_service import SummaryService
+from app.utils.cache import TTLCache
+
+# Summaries are keyed by (video_id, chunk_minutes) so repeat requests skip the LLM
+_summary_cache = TTLCache(max_size=500, ttl_seconds=settings.TRANSCRIPT_CACHE_TTL)
+
+# Batch job state, shared by all requests in this process. Running jobs live in
+# batch_jobs; finished ones move to _finished_jobs and expire after BATCH_JOB_TTL_SECONDS
+batch_jobs: Dict[str, Dict[str, Any]] = {}
+_finished_jobs = TTLCache(max_size=settings.BATCH_JOB_MAX_FINISHED, ttl_seconds=settings.BATCH_JOB_TTL_SECONDS)
+_batch_lock = threading.Lock()
+
+# One bounded pool for every batch so concurrent batches can't exhaust the API quota
+_executor = ThreadPoolExecutor(max_workers=settings.BATCH_SUMMARY_WORKERS)
+
+class YouTubeSummaryService:
+    def __init__(self):
+        self.youtube = YouTubeService()
+        self.chatgpt = ChatGPTService()
+        self.summary_service = SummaryService()
+
+    def summarize_video(self, video_url: str, chunk_minutes: int = 5) -> Dict[str, Any]:
+        """Fetch transcript and summarize a single video, reusing cached results"""
+        video_id = self.youtube.extract_video_id(video_url)
+        cache_key = (video_id, chunk_minutes)
+
+        if video_id:
+            cached = _summary_cache.get(cache_key)
+            if cached is not None:
+                print(f"Summary cache hit for video {video_id}")
+                return {**cached, "cached": True}
+
+        # Get transcript with timestamps
+        transcript = self.youtube.get_transcript_with_timestamps(video_url)
+        if not transcript:
+            raise ValueError("No transcript available for this video")
+
+        print(f"Found {len(transcript)} transcript segments")
+
+        # Get clean text only
+        clean_text = self.youtube.get_transcript_text_only(transcript)
+
+        print(f"Clean text length: {len(clean_text)} characters")
+
+        # For long videos, use size-based chunking instead of time-based
+        if len(clean_text) > 8000:
+            # Use size-based chunking for API limits
+            chunks = self.youtube.chunk_transcript_by_size(clean_text, 6000)
+            print(f"Using size-based chunking: {len(chunks)} chunks")
+        elif len(clean_text) > 3000:
+            # Use time-based chunking for medium videos
+            chunks = self.youtube.chunk_transcript_by_time(transcript, chunk_minutes)
+            print(f"Using time-based chunking: {len(chunks)} chunks")
+        else:
+            chunks = [clean_text]
+            print("Using single chunk processing")
+
+        # Generate summary
+        if len(chunks) > 1:
+            print("Using chunked summary approach...")
+            summary = self.chatgpt.get_chunked_summary(chunks)
+        else:
+            print("Using single summary approach...")
+            summary = self.chatgpt.get_summary(clean_text)
+
+        result = {
+            "video_id": video_id,
+            "transcript_segments": len(transcript),
+            "chunks_processed": len(chunks),
+            "clean_text": clean_text,
+            "summary": summary
+        }
+
+        if video_id:
+            _summary_cache.set(cache_key, result)
+
+        return {**result, "cached": False}
+
+    def start_batch(self, user_id: str, videos: List[Dict[str, str]], chunk_minutes: int = 5) -> str:
+        """Register a batch job and fan its videos out to the shared worker pool.
+
+        Must be called from the event loop; workers save summaries through
+        the async repository on that loop.
+        """
+        loop = asyncio.get_running_loop()
+        job_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+
+        with _batch_lock:
+            batch_jobs[job_id] = {
+                "status": "processing",
+                "user_id": user_id,
+                "created_at": now,
+                "updated_at": now,
+                "total": len(videos),
+                "completed": 0,
+                "failed": 0,
+                "videos": [
+                    {
+                        "index": i,
+                        "video_id": video.get("video_id"),
+                        "video_url": video["video_url"],
+                        "title": video.get("title", ""),
+                        "status": "queued",
+                        "cached": False,
+                        "summary": None,
+                        "saved_summary_id": None,
+                        "error": None
+                    }
+                    for i, video in enumerate(videos)
+                ]
+            }
+
+        for i in range(len(videos)):
+            _executor.submit(self._process_batch_video, job_id, i, user_id, chunk_minutes, loop)
+
+        return job_id
+
+    def get_batch(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of a batch job's state"""
+        with _batch_lock:
+            job = batch_jobs.get(job_id) or _finished_jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "videos": [dict(video) for video in job["videos"]]}
+
+    def _update_video(self, job_id: str, index: int, **fields):
+        with _batch_lock:
+            job = batch_jobs[job_id]
+            job["videos"][index].update(fields)
+            job["updated_at"] = datetime.utcnow().isoformat()
+
+            status = fields.get("status")
+            if status == "completed":
+                job["completed"] += 1
+            elif status == "error":
+                job["failed"] += 1
+
+            if job["completed"] + job["failed"] == job["total"]:
+                job["status"] = "completed" if job["completed"] else "error"
+                _finished_jobs.set(job_id, batch_jobs.pop(job_id))
+
+    def _process_batch_video(self, job_id: str, index: int, user_id: str, chunk_minutes: int,
+                             loop: asyncio.AbstractEventLoop):
+        """Worker: summarize one video of a batch and record its outcome"""
+        with _batch_lock:
+            video = dict(batch_jobs[job_id]["videos"][index])
+
+        self._update_video(job_id, index, status="processing")
+        start_time = time.time()
+
+        try:
+            result = self.summarize_video(video["video_url"], chunk_minutes)
+
+            # Saved even on a cache hit: the cache is shared by all users, and the
+            # route already drops duplicate videos within a batch
+            saved_summary = None
+            try:
+                title = f"YouTube Summary - {video['title']}" if video["title"] else "YouTube Summary"
+                saved_summary = asyncio.run_coroutine_threadsafe(
+                    self.summary_service.save_summary(
+                        user_id=user_id,
+                        title=title,
+                        content=result["summary"],
+                        source_text=result["clean_text"][:1000],  # Store first 1000 chars
+                        source_type="youtube"
+                    ),
+                    loop
+                ).result()
+            except Exception as e:
+                print(f"Failed to save summary: {e}")
+
+            self._update_video(
+                job_id, index,
+                status="completed",
+                cached=result["cached"],
+                summary=result["summary"],
+                saved_summary_id=saved_summary["id"] if saved_summary else None,
+                processing_time=round(time.time() - start_time, 2)
+            )
+            print(f"✅ Batch {job_id}: video {index + 1} summarized")
+
+        except Exception as e:
+            print(f"❌ Batch {job_id}: video {index + 1} failed: {str(e)}")
+            self._update_video(job_id, index, status="error", error=str(e))
@@ -1,8 +1,16 @@
 # Utils package
-from .file_handling import save_upload_file, cleanup_file, validate_file_type
+from .file_handling import save_upload_file, cleanup_file, validate_file_type, hash_upload_file
 from .helpers import generate_unique_id, hash_password, validate_email, format_timestamp, sanitize_filename, chunk_text, calculate_processing_time
+from .cache import TTLCache
+from .blob_store import BlobStore
+from .workspace import JobWorkspace, DiskQuotaExceeded, check_disk_quota
+from .sse import format_sse, sse_response
 
 __all__ = [
-    "save_upload_file", "cleanup_file", "validate_file_type",
-    "generate_unique_id", "hash_password", "validate_email", "format_timestamp", "sanitize_filename", "chunk_text", "calculate_processing_time"
+    "save_upload_file", "cleanup_file", "validate_file_type", "hash_upload_file",
+    "generate_unique_id", "hash_password", "validate_email", "format_timestamp", "sanitize_filename", "chunk_text", "calculate_processing_time",
+    "TTLCache",
+    "BlobStore",
+    "JobWorkspace", "DiskQuotaExceeded", "check_disk_quota",
+    "format_sse", "sse_response"
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+
+# Blob names: a SHA-256 hex digest, optionally followed by a derived-variant suffix
+_BLOB_NAME = re.compile(r"^[0-9a-f]{64}(-[A-Za-z0-9]+)?(\.[a-z0-9]+)?$")
+
+class BlobStore:
+    """Content-addressed files on local disk (stand-in for an object store).
+
+    A blob is stored under the SHA-256 of its bytes as <root>/<aa>/<digest>,
+    so identical uploads share one file and a name never changes meaning.
+    Files derived from a blob (e.g. resized images) are stored next to it
+    as <digest>-<variant>.<ext>. Writes are atomic; readers never see
+    partial files.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def valid_name(name: str) -> bool:
+        return bool(_BLOB_NAME.match(name))
+
+    def path(self, name: str) -> str:
+        if not self.valid_name(name):
+            raise ValueError(f"Invalid blob name: {name}")
+        return os.path.join(self.root, name[:2], name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def put(self, data: bytes, name: Optional[str] = None) -> str:
+        """Store data under name (default: its digest) and return the name"""
+        name = name or self.digest(data)
+        path = self.path(name)
+        if os.path.exists(path):
+            return name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
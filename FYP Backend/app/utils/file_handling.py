@@ -1,3 +1,4 @@
+import hashlib
 import os
 from fastapi import UploadFile, HTTPException
 from typing import List
@@ -37,6 +38,15 @@ def save_upload_file(upload_file: UploadFile, upload_dir: str = "app/temp_upload
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload error: {str(e)}")
 
+def hash_upload_file(upload_file: UploadFile) -> str:
+    """SHA-256 of an upload's contents; the file position is reset afterwards"""
+    digest = hashlib.sha256()
+    upload_file.file.seek(0)
+    for block in iter(lambda: upload_file.file.read(1024 * 1024), b""):
+        digest.update(block)
+    upload_file.file.seek(0)
+    return digest.hexdigest()
+
 def validate_file_type(file: UploadFile, allowed_types: List[str]) -> bool:
     """Validate file type with fallback methods"""
     try:
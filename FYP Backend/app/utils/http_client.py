@@ -0,0 +1,45 @@
+import asyncio
+from typing import Dict
+import aiohttp
+from app.config import settings
+
+class HTTPSessionRegistry:
+    """Pooled aiohttp sessions shared by all async outbound calls.
+
+    aiohttp sessions are bound to the event loop that created them, so one
+    session is kept per running loop. Every session uses a keep-alive
+    connector with a per-host connection limit and a DNS cache, so repeated
+    calls to the same API reuse open TCP/TLS connections.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session for the current event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+                use_dns_cache=True,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    async def close(self):
+        """Close the current loop's session and forget sessions of loops that are gone"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+
+        for other_loop in [other for other in self._sessions if other.is_closed()]:
+            self._sessions.pop(other_loop, None)
+
+
+http_sessions = HTTPSessionRegistry()
@@ -0,0 +1,74 @@
+import os
+import re
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+def parse_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=' range into inclusive (start, end) offsets.
+
+    Returns None when the header is missing or not a byte range (serve the
+    whole file). Raises 416 for ranges outside the file.
+    """
+    if not range_header:
+        return None
+
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None  # Multiple or malformed ranges: fall back to a full response
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(file_size - int(last), 0)
+        end = file_size - 1
+
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, end
+
+def iter_file(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+def range_file_response(request: Request, path: str, media_type: str,
+                        filename: Optional[str] = None) -> StreamingResponse:
+    """Serve a file with HTTP Range support (206 partial content) for seeking"""
+    file_size = os.path.getsize(path)
+    byte_range = parse_range(request.headers.get("range"), file_size)
+
+    headers = {"Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if byte_range is None:
+        start, end, status_code = 0, file_size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        iter_file(path, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,17 @@
+import json
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+
+def format_sse(event: str, data: dict, event_id: int = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Server-Sent Events response that proxies won't buffer"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
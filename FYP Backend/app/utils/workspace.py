@@ -0,0 +1,67 @@
+import os
+import shutil
+from app.config import settings
+
+JOBS_SUBDIR = "jobs"
+
+class DiskQuotaExceeded(Exception):
+    """Raised when there is not enough disk space to accept new work"""
+    pass
+
+class JobWorkspace:
+    """Private scratch directory for one job: <TEMP_UPLOADS_DIR>/jobs/<job_id>/
+
+    Segment files live under segments/ and are dropped once the job finishes;
+    the final output stays in the workspace until the janitor removes it.
+    """
+
+    def __init__(self, job_id: str, root: str = None):
+        self.job_id = job_id
+        self.path = os.path.join(jobs_root(root), job_id)
+
+    @property
+    def segments_dir(self) -> str:
+        return os.path.join(self.path, "segments")
+
+    def output_path(self, filename: str) -> str:
+        return os.path.join(self.path, filename)
+
+    def create(self) -> "JobWorkspace":
+        os.makedirs(self.segments_dir, exist_ok=True)
+        return self
+
+    def clear_scratch(self):
+        """Remove intermediate files, keeping the final output"""
+        shutil.rmtree(self.segments_dir, ignore_errors=True)
+
+    def remove(self):
+        """Remove the whole workspace"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def jobs_root(root: str = None) -> str:
+    return os.path.join(root or settings.TEMP_UPLOADS_DIR, JOBS_SUBDIR)
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of all files under path"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass  # Deleted while walking
+    return total
+
+def check_disk_quota(root: str = None):
+    """Raise DiskQuotaExceeded if temp storage is over quota or the disk is nearly full"""
+    root = root or settings.TEMP_UPLOADS_DIR
+    os.makedirs(root, exist_ok=True)
+
+    free = shutil.disk_usage(root).free
+    if free < settings.MIN_FREE_DISK_BYTES:
+        raise DiskQuotaExceeded(f"Only {free // (1024 * 1024)} MB of disk space left")
+
+    used = directory_size(root)
+    if used > settings.TEMP_UPLOADS_MAX_BYTES:
+        raise DiskQuotaExceeded(f"Temporary storage is full ({used // (1024 * 1024)} MB in use)")
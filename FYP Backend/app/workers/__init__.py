@@ -0,0 +1,15 @@
+# Workers package. Exports are imported on first access, so the API can use
+# the janitor and the job constants without loading the dubbing pipeline.
+import importlib
+
+_EXPORTS = {
+    "DubbingWorker": ".dubbing_worker",
+    "Janitor": ".janitor"
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,4 @@
+# Shared by the API (enqueueing jobs, serving their output) and the dubbing
+# worker; kept free of service imports
+DUBBING_JOB = "dubbing"
+DUBBED_AUDIO_FILENAME = "dubbed_audio.mp3"
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.config import settings
+from app.database.job_queue import job_queue
+from app.services.dubbing_service import DubbingService
+from app.utils.http_client import http_sessions
+from app.utils.workspace import JobWorkspace
+from app.workers.dubbing_jobs import DUBBED_AUDIO_FILENAME, DUBBING_JOB
+
+# Share of the progress bar covered by segment work (the rest is transcript and encoding)
+SEGMENT_PROGRESS_START = 15
+SEGMENT_PROGRESS_END = 95
+
+class QueueWriter:
+    """Runs one job's queue writes on a background thread, in order.
+
+    Progress and checkpoint callbacks are synchronous and called from the
+    pipeline on the event loop, so they submit their SQLite writes here
+    rather than block the loop (and every other job) on the queue lock.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, fn, *args, **kwargs):
+        self._executor.submit(fn, *args, **kwargs).add_done_callback(self._report_error)
+
+    async def flush(self):
+        """Wait for every submitted write; no writes are accepted afterwards"""
+        await asyncio.to_thread(self._executor.shutdown, True)
+
+    @staticmethod
+    def _report_error(future: Future):
+        if future.exception():
+            print(f"⚠️ Job queue write failed: {str(future.exception())}")
+
+
+class JobProgress:
+    """Turns pipeline snapshots into progress events with an ETA.
+
+    The ETA comes from the segment throughput observed in this attempt
+    (segments resumed from an earlier attempt don't count, as they finish
+    almost instantly). Events are written to the job's event log, at most one
+    every min_interval seconds except for stage changes.
+    """
+
+    def __init__(self, job_id: str, writer: QueueWriter, min_interval: float = 0.5):
+        self.job_id = job_id
+        self.writer = writer
+        self.min_interval = min_interval
+        self.started_at = time.monotonic()
+        self._last_stage = None
+        self._last_emit = 0.0
+
+    def stage(self, stage: str, progress: int, **data):
+        """Record a stage change"""
+        self._emit("stage", stage, progress, data, force=True)
+
+    def update(self, snapshot: dict):
+        """Handle a snapshot from DubbingService.create_synchronized_audio"""
+        stage = snapshot.pop("stage")
+        total = snapshot.get("segments_total") or 0
+        done = snapshot.get("segments_done")
+        if done is None or not total:
+            self._emit("stage", stage, SEGMENT_PROGRESS_START, snapshot, force=True)
+            return
+
+        progress = SEGMENT_PROGRESS_START + (SEGMENT_PROGRESS_END - SEGMENT_PROGRESS_START) * done / total
+        snapshot["eta_seconds"] = self._eta(done, total, snapshot.get("segments_resumed", 0))
+        self._emit("progress", stage, int(progress), snapshot, force=stage != self._last_stage or done == total)
+
+    def _eta(self, done: int, total: int, resumed: int):
+        finished = done - resumed
+        elapsed = time.monotonic() - self.started_at
+        if finished <= 0 or elapsed <= 0:
+            return None
+        return round((total - done) * elapsed / finished, 1)
+
+    def _emit(self, event: str, stage: str, progress: int, data: dict, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        self._last_stage = stage
+        self.writer.submit(job_queue.update_progress, self.job_id, progress=progress, stage=stage)
+        self.writer.submit(job_queue.add_event, self.job_id, event, {"stage": stage, "progress": progress, **data})
+
+
+class DubbingWorker:
+    """Pulls dubbing jobs from the SQLite queue and runs them.
+
+    Any number of workers (concurrent tasks in one process or separate processes)
+    can share one queue; each job is leased to a single worker at a time.
+    """
+
+    def __init__(self, concurrency: int = 1):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.dubbing_service = DubbingService()
+        self._stopping = False
+
+    def stop(self):
+        """Finish in-flight jobs and stop claiming new ones"""
+        self._stopping = True
+
+    async def run(self):
+        """Run until stop() is called"""
+        print(f"👷 Dubbing worker {self.worker_id} started (concurrency={self.concurrency})")
+        try:
+            await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+        finally:
+            await http_sessions.close()
+        print(f"👷 Dubbing worker {self.worker_id} stopped")
+
+    async def _loop(self):
+        while not self._stopping:
+            # Queue calls run in threads: claim may wait on another worker's write lock
+            job = await asyncio.to_thread(job_queue.claim, DUBBING_JOB, self.worker_id)
+            if job is None:
+                await asyncio.sleep(settings.WORKER_POLL_INTERVAL)
+                continue
+            await self.process_job(job)
+
+    async def process_job(self, job: dict):
+        """Run one claimed job, keeping its lease alive until it finishes"""
+        job_id = job["id"]
+        payload = job["payload"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        workspace = JobWorkspace(job_id).create()
+
+        writer = QueueWriter()
+        progress = JobProgress(job_id, writer)
+
+        try:
+            print(f"🧾 Extracting transcript for job {job_id} (attempt {job['attempts']})...")
+            progress.stage("extracting_transcript", 10, attempt=job["attempts"])
+
+            completed_segments = await asyncio.to_thread(job_queue.get_segments, job_id)
+
+            def checkpoint(segment_index: int, segment: dict):
+                writer.submit(job_queue.save_segment, job_id, segment_index, segment)
+
+            job_stats = {}
+
+            print(f"🎧 Creating synchronized audio for job {job_id}...")
+
+            audio_file_path = await self.dubbing_service.create_synchronized_audio(
+                payload["video_url"],
+                payload.get("target_language", "Urdu"),
+                segments_dir=workspace.segments_dir,
+                completed_segments=completed_segments,
+                on_segment_done=checkpoint,
+                job_stats=job_stats,
+                output_path=workspace.output_path(DUBBED_AUDIO_FILENAME),
+                on_progress=progress.update
+            )
+
+            await writer.flush()
+            await asyncio.to_thread(job_queue.complete, job_id, self.worker_id, {
+                "audio_file": audio_file_path,
+                "download_url": f"/dubbing/download/{job_id}",
+                "stats": job_stats
+            })
+            await asyncio.to_thread(self._clear_job, job_id)
+            workspace.clear_scratch()
+
+            print(f"✅ Dubbing completed for job {job_id}: {audio_file_path}")
+
+        except Exception as e:
+            print(f"❌ Dubbing processing error for job {job_id}: {str(e)}")
+            # Checkpoints written so far are kept for the retry
+            await writer.flush()
+            will_retry = await asyncio.to_thread(job_queue.fail, job_id, self.worker_id, str(e))
+            if not will_retry:
+                # Only this job's workspace is removed; other jobs are untouched
+                await asyncio.to_thread(self._clear_job, job_id)
+                workspace.remove()
+
+        finally:
+            heartbeat.cancel()
+
+    @staticmethod
+    def _clear_job(job_id: str):
+        job_queue.clear_segments(job_id)
+        job_queue.clear_events(job_id)
+
+    async def _heartbeat(self, job_id: str):
+        interval = settings.JOB_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(job_queue.heartbeat, job_id, self.worker_id):
+                print(f"⚠️ Lost lease on job {job_id}")
+                return
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import shutil
+import time
+from app.config import settings
+from app.database.job_queue import job_queue
+from app.services.tts_cache import TTSCache
+from app.utils.workspace import JOBS_SUBDIR, jobs_root
+
+class Janitor:
+    """Periodically deletes expired files from the temp uploads directory.
+
+    Workspaces of finished jobs are removed once they are older than
+    OUTPUT_RETENTION_HOURS, as are stray files (uploads, OCR images, legacy
+    outputs) directly under the temp directory. Workspaces of queued or
+    running jobs are never touched. Each sweep also trims the TTS cache to
+    its size limit, counting files written by every worker process.
+    Several janitors (API and worker processes) can run at once.
+    """
+
+    def __init__(self, root: str = None, retention_seconds: float = None):
+        self.root = root or settings.TEMP_UPLOADS_DIR
+        self.retention_seconds = (
+            retention_seconds if retention_seconds is not None
+            else settings.OUTPUT_RETENTION_HOURS * 3600
+        )
+        self.tts_cache = TTSCache()
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+
+    async def run(self):
+        """Sweep every JANITOR_INTERVAL_SECONDS until stop() is called"""
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            try:
+                removed = await loop.run_in_executor(None, self.sweep)
+                if removed:
+                    print(f"🧹 Janitor removed {removed} expired item(s) from {self.root}")
+                await loop.run_in_executor(None, self.tts_cache.evict)
+            except Exception as e:
+                print(f"⚠️ Janitor error: {str(e)}")
+            await asyncio.sleep(settings.JANITOR_INTERVAL_SECONDS)
+
+    def sweep(self) -> int:
+        """Delete everything past retention once; returns the number of items removed"""
+        if not os.path.isdir(self.root):
+            return 0
+
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+
+        workspaces = jobs_root(self.root)
+        if os.path.isdir(workspaces):
+            for job_id in os.listdir(workspaces):
+                path = os.path.join(workspaces, job_id)
+                if self._is_expired(path, cutoff) and not self._is_active(job_id):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name == JOBS_SUBDIR or not self._is_expired(path, cutoff):
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            removed += 1
+
+        return removed
+
+    def _is_expired(self, path: str, cutoff: float) -> bool:
+        try:
+            return os.path.getmtime(path) < cutoff
+        except OSError:
+            return False
+
+    def _is_active(self, job_id: str) -> bool:
+        job = job_queue.get(job_id)
+        return job is not None and job["status"] in ("queued", "running")
@@ -0,0 +1,97 @@
+"""
+Per-segment HTTP overhead of the dubbing calls: a fresh aiohttp session per
+request (old behaviour) vs the shared pooled session registry.
+
+Runs against a local stand-in for the models and ElevenLabs APIs, so no
+credentials or network access are needed:
+
+    python -m benchmarks.http_session_benchmark --segments 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import aiohttp
+from aiohttp import web
+from app.services.chatgpt_service import ChatGPTService
+from app.services.elevenlabs_service import ElevenLabsService
+from app.utils.http_client import http_sessions
+
+
+async def fake_chat_completion(request):
+    await request.read()
+    return web.json_response({"choices": [{"message": {"content": "ترجمہ"}}]})
+
+
+async def fake_text_to_speech(request):
+    await request.read()
+    return web.Response(body=b"\xff\xfb" * 2048, content_type="audio/mpeg")
+
+
+async def start_stand_in_server(port: int) -> web.AppRunner:
+    server = web.Application()
+    server.router.add_post("/chat/completions", fake_chat_completion)
+    server.router.add_post("/text-to-speech/{voice_id}", fake_text_to_speech)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def segment_with_fresh_sessions(base_url: str):
+    """What every dubbing segment did before: two throwaway sessions"""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base_url}/chat/completions", data=json.dumps({"messages": []})) as response:
+            await response.json()
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base_url}/text-to-speech/voice", json={"text": "x"}) as response:
+            await response.read()
+
+
+async def run(segments: int, concurrency: int, port: int):
+    runner = await start_stand_in_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    chatgpt = ChatGPTService.__new__(ChatGPTService)
+    chatgpt.token, chatgpt.endpoint, chatgpt.model = "test", base_url, "test"
+    elevenlabs = ElevenLabsService.__new__(ElevenLabsService)
+    elevenlabs.api_key, elevenlabs.base_url, elevenlabs.default_voice_id = "test", base_url, "voice"
+    elevenlabs.model_id, elevenlabs.voice_settings = "test", {}
+
+    async def segment_with_shared_session():
+        await chatgpt.translate_text_async("Hello and welcome to the lecture.")
+        await elevenlabs.text_to_speech_async("ترجمہ")
+
+    async def measure(label, segment):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with semaphore:
+                await segment()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limited() for _ in range(segments)))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {elapsed:7.2f}s total   {elapsed / segments * 1000:7.2f} ms/segment")
+        return elapsed
+
+    try:
+        # Warm up both paths once so imports and the server are hot
+        await segment_with_fresh_sessions(base_url)
+        await segment_with_shared_session()
+
+        before = await measure("fresh session per call", lambda: segment_with_fresh_sessions(base_url))
+        after = await measure("shared session pool", segment_with_shared_session)
+        print(f"speedup: {before / after:.2f}x")
+    finally:
+        await http_sessions.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=2, help="Matches the dubbing semaphore")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run(args.segments, args.concurrency, args.port))
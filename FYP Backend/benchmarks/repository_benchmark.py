@@ -0,0 +1,112 @@
+"""
+Load test for the async summary/profile repositories.
+
+Runs against the local SQLite stand-in backend by default, so no Supabase
+project or network access is needed; pass --backend supabase to point the
+same workload at the configured PostgREST endpoint:
+
+    python -m benchmarks.repository_benchmark --users 50 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from app.database.backends import SQLiteBackend, create_backend
+from app.database.repositories import ProfileRepository, SummaryRepository
+from app.utils.http_client import http_sessions
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run(backend_name: str, users: int, requests: int, concurrency: int, seed_per_user: int):
+    if backend_name == "sqlite":
+        backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), "benchmark.db"))
+    else:
+        backend = create_backend(backend_name)
+    summaries = SummaryRepository(backend)
+    profiles = ProfileRepository(backend)
+    user_ids = [f"benchmark-user-{i}" for i in range(users)]
+    owned = {user_id: [] for user_id in user_ids}
+
+    for user_id in user_ids:
+        await profiles.upsert(user_id, {"email": f"{user_id}@example.com", "full_name": user_id})
+        for i in range(seed_per_user):
+            row = await summaries.create(user_id, {
+                "title": f"Summary {i}", "content": "lorem ipsum " * 50, "source_type": "document"
+            })
+            owned[user_id].append(row["id"])
+
+    async def list_summaries(user_id):
+        await summaries.list_page(user_id, 20)
+
+    async def get_summary(user_id):
+        if owned[user_id]:
+            await summaries.get(random.choice(owned[user_id]), user_id)
+
+    async def create_summary(user_id):
+        row = await summaries.create(user_id, {"title": "New", "content": "text", "source_type": "youtube"})
+        owned[user_id].append(row["id"])
+
+    async def create_summaries_bulk(user_id):
+        # A summary plus its questions and chapter summaries saved together
+        rows = await summaries.create_many(user_id, [
+            {"title": f"Part {i}", "content": "text", "source_type": "document"} for i in range(5)
+        ])
+        owned[user_id].extend(row["id"] for row in rows)
+
+    async def update_summary(user_id):
+        if owned[user_id]:
+            await summaries.update(random.choice(owned[user_id]), user_id, {"content": "edited"})
+
+    async def get_profile(user_id):
+        await profiles.get(user_id)
+
+    async def update_profile(user_id):
+        await profiles.upsert(user_id, {"email": f"{user_id}@example.com", "full_name": f"{user_id} edited"})
+
+    # Read-heavy mix, roughly what the dashboard and summaries pages generate
+    operations = [
+        (list_summaries, 3), (get_summary, 3), (get_profile, 2), (create_summary, 1),
+        (create_summaries_bulk, 1), (update_summary, 1), (update_profile, 1)
+    ]
+    weighted = [operation for operation, weight in operations for _ in range(weight)]
+    latencies = {operation.__name__: [] for operation, _ in operations}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        operation = random.choice(weighted)
+        async with semaphore:
+            start = time.perf_counter()
+            await operation(random.choice(user_ids))
+            latencies[operation.__name__].append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await http_sessions.close()
+
+    print(f"{requests} requests, {concurrency} concurrent: {elapsed:.2f}s ({requests / elapsed:.0f} req/s)")
+    for name, values in latencies.items():
+        if values:
+            print(
+                f"{name:<21} n={len(values):<6} p50={percentile(values, 0.5) * 1000:7.2f} ms"
+                f"   p95={percentile(values, 0.95) * 1000:7.2f} ms   max={max(values) * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "supabase"], default="sqlite")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed-per-user", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.backend, args.users, args.requests, args.concurrency, args.seed_per_user))
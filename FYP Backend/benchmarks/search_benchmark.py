@@ -0,0 +1,93 @@
+"""
+Query latency of the summary search index (BM25 ranking, prefix expansion
+and snippets for the returned page) over a large synthetic corpus.
+
+Summaries are generated from a Zipf-distributed vocabulary so common words
+have long posting lists, like real text. No database is needed:
+
+    python -m benchmarks.search_benchmark --summaries 100000
+"""
+import argparse
+import random
+import time
+import numpy as np
+from app.services.search_index import BM25Index, make_snippet
+from app.services.summary_search_service import TITLE_WEIGHT
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run(summaries: int, words_per_summary: int, vocabulary_size: int, queries: int, limit: int, seed: int):
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    # Zipf weights: word i appears with probability proportional to 1 / (i + 1)
+    weights = 1.0 / np.arange(1, vocabulary_size + 1)
+    weights /= weights.sum()
+
+    print(f"Generating {summaries} summaries...")
+    texts = {}
+    for summary_id in range(1, summaries + 1):
+        picks = np_rng.choice(vocabulary_size, size=words_per_summary, p=weights)
+        content = " ".join(vocabulary[i] for i in picks)
+        title = " ".join(vocabulary[i] for i in picks[:rng.randint(3, 7)])
+        texts[summary_id] = (title, content)
+
+    index = BM25Index()
+    start = time.perf_counter()
+    for summary_id, (title, content) in texts.items():
+        index.add(summary_id, [(title, TITLE_WEIGHT), (content, 1.0)])
+    print(f"Indexed in {time.perf_counter() - start:.1f}s ({index.vocabulary_size} terms)")
+
+    def random_query():
+        # Mostly mid-frequency words, sometimes very common ones; the last word is often a partial prefix
+        query_words = [vocabulary[min(int(np_rng.zipf(1.3)) + rng.randint(0, 200), vocabulary_size - 1)]
+                       for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.5:
+            query_words[-1] = query_words[-1][:max(2, len(query_words[-1]) // 2)]
+        return " ".join(query_words)
+
+    latencies = []
+    for _ in range(queries):
+        query = random_query()
+        start = time.perf_counter()
+        hits, total, terms = index.search(query, limit=limit)
+        for summary_id, _ in hits:
+            make_snippet(texts[summary_id][1], terms)
+        latencies.append(time.perf_counter() - start)
+
+    # Editing a summary re-indexes it in place
+    start = time.perf_counter()
+    for summary_id in range(1, 101):
+        title, content = texts[summary_id]
+        index.add(summary_id, [(title + " edited", TITLE_WEIGHT), (content, 1.0)])
+    update_ms = (time.perf_counter() - start) * 1000 / 100
+
+    print(
+        f"{queries} queries: p50={percentile(latencies, 0.5) * 1000:.2f} ms"
+        f"   p95={percentile(latencies, 0.95) * 1000:.2f} ms   max={max(latencies) * 1000:.2f} ms"
+    )
+    print(f"incremental update: {update_ms:.2f} ms/summary")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=100000)
+    parser.add_argument("--words-per-summary", type=int, default=150)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.summaries, args.words_per_summary, args.vocabulary, args.queries, args.limit, args.seed)
@@ -0,0 +1,18 @@
+-- Columns and index used by the paginated summary list (GET /summaries/).
+-- preview and word_count are written by the API on create/update; this
+-- backfills rows created before they existed.
+
+alter table summaries add column if not exists preview text;
+alter table summaries add column if not exists word_count integer;
+
+update summaries
+set
+    preview = left(regexp_replace(trim(content), '\s+', ' ', 'g'), 200),
+    word_count = case
+        when trim(content) = '' then 0
+        else array_length(regexp_split_to_array(trim(content), '\s+'), 1)
+    end
+where preview is null;
+
+create index if not exists idx_summaries_user_created
+    on summaries (user_id, created_at desc, id desc);
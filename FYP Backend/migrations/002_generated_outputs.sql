@@ -0,0 +1,16 @@
+-- Stored results of document summaries, question generation and past paper
+-- analysis. The API looks a result up by (user, kind, hash of the uploaded
+-- source, hash of the generation parameters) before calling the LLM again.
+
+create table if not exists generated_outputs (
+    id bigint generated by default as identity primary key,
+    user_id uuid not null,
+    kind text not null,
+    source_hash text not null,
+    params_hash text not null,
+    params text,
+    result text not null,
+    created_at timestamp not null default now(),
+    updated_at timestamp not null default now(),
+    unique (user_id, kind, source_hash, params_hash)
+);
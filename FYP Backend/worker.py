@@ -0,0 +1,30 @@
+import argparse
+import asyncio
+import signal
+from app.workers.dubbing_worker import DubbingWorker
+from app.workers.janitor import Janitor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a dubbing job worker")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs processed at once by this worker")
+    args = parser.parse_args()
+
+    worker = DubbingWorker(concurrency=args.concurrency)
+    janitor = Janitor()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        # Workers produce most temp files, so they also sweep expired ones
+        janitor_task = asyncio.create_task(janitor.run())
+        try:
+            await worker.run()
+        finally:
+            janitor.stop()
+            janitor_task.cancel()
+
+    asyncio.run(main())
@@ -53,7 +53,8 @@ const Navbar = () => {
             setUser({
               full_name: userData.full_name || userData.user_metadata?.full_name || userData.email?.split('@')[0],
               email: userData.email,
-              profile_picture: userData.profile_picture || userData.user_metadata?.profile_picture
+              // Navbar avatar is 32px: the 64px thumbnail covers high-DPI screens
+              profile_picture: userData.profile_picture_thumbnails?.["64"] || userData.profile_picture || userData.user_metadata?.profile_picture
             });
           }
         } catch (error) {
@@ -17,7 +17,8 @@ export const AuthProvider = ({ children }) => {
             setUser({
               full_name: userData.full_name || userData.user_metadata?.full_name || userData.email?.split('@')[0],
               email: userData.email,
-              profile_picture: userData.profile_picture || userData.user_metadata?.profile_picture
+              // Shown as the small navbar avatar
+              profile_picture: userData.profile_picture_thumbnails?.["64"] || userData.profile_picture || userData.user_metadata?.profile_picture
             });
           }
         } catch (error) {
@@ -51,6 +51,8 @@ const Dashboard = () => {
   const [userQuestion, setUserQuestion] = useState('');
   const [isAskingQuestion, setIsAskingQuestion] = useState(false);
   const [currentDocumentFile, setCurrentDocumentFile] = useState(null);
+  // Server-side session for the current document, so follow-up questions don't re-upload it
+  const [documentSessionId, setDocumentSessionId] = useState(null);
   const [quickFacts, setQuickFacts] = useState("• Learning is a lifelong journey\n• Every question you ask helps you grow\n• Consistent study habits lead to success");
   
   // OCR states
@@ -167,6 +169,7 @@ const Dashboard = () => {
       localStorage.removeItem(key);
     });
     setCurrentDocumentFile(null);
+    setDocumentSessionId(null);
     setDocumentSummary(null);
     setSummaryQuestions(null);
     setPracticeQuestions(null);
@@ -285,6 +288,7 @@ const Dashboard = () => {
     
     saveToLocalStorage(STORAGE_KEYS.UPLOADED_FILE, fileData);
     setCurrentDocumentFile(file);
+    setDocumentSessionId(null);
     
     setSummaryQuestions(null); // Clear summary questions when uploading new document
     setChatHistory([]);
@@ -425,6 +429,23 @@ const Dashboard = () => {
     }
   };
 
+  // Shows practice questions as they stream in; the final response replaces them
+  const streamPracticeQuestions = (source) => {
+    const streamed = { questions: [], answers: [], total_questions: 0, generatedAt: new Date().toISOString(), source };
+    return (type, data) => {
+      if (type === 'question') {
+        streamed.questions[data.index] = data.question;
+        if (data.answer) streamed.answers[data.index] = data.answer;
+      } else if (type === 'answer') {
+        streamed.answers[data.index] = data.answer;
+      } else {
+        return;
+      }
+      streamed.total_questions = streamed.questions.length;
+      setPracticeQuestions({ ...streamed, questions: [...streamed.questions], answers: [...streamed.answers] });
+    };
+  };
+
   // Generate questions from uploaded document (Practice Questions tab)
   const handleGenerateQuestionsFromDocument = async (file = null) => {
     if (!isAuthenticated) {
@@ -454,7 +475,7 @@ const Dashboard = () => {
     });
     
     try {
-      const response = await apiService.generateQuestionsFromDocument(targetFile, 10);
+      const response = await apiService.generateQuestionsFromDocument(targetFile, 10, streamPracticeQuestions('document'));
       
       if (response.success) {
         setProcessingState({
@@ -522,7 +543,7 @@ const Dashboard = () => {
       const response = await apiService.generateQuestionsFromText({
         text: textForQuestions,
         num_questions: 10
-      });
+      }, streamPracticeQuestions('text'));
       
       if (response.success) {
         const formattedQuestions = {
@@ -596,7 +617,15 @@ const handleAskQuestion = async () => {
   
   try {
     // Use the backend endpoint for document Q&A
-    const response = await apiService.answerQuestionFromDocument(currentDocumentFile, userQuestion);
+    let response;
+    try {
+      response = await apiService.answerQuestionFromDocument(currentDocumentFile, userQuestion, documentSessionId);
+    } catch (error) {
+      if (!documentSessionId || !error.message?.includes('session')) throw error;
+      // The session expired: upload the document again
+      response = await apiService.answerQuestionFromDocument(currentDocumentFile, userQuestion);
+    }
+    setDocumentSessionId(response?.session_id || null);
     
     // Check if response is successful
     if (response && response.answer) {
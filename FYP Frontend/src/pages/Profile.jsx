@@ -83,7 +83,7 @@ const Profile = () => {
       if (activeTab === "history") {
         try {
           setSummariesLoading(true);
-          const response = await apiService.getUserSummaries();
+          const response = await apiService.getUserSummaries({ limit: 5, includeContent: true });
           
           if (response.success) {
             // Check if there's a message about missing table
@@ -93,6 +93,7 @@ const Profile = () => {
               console.log("Summaries table not found:", response.message);
             } else {
               // Transform the API response to match your component's expected format
+              // The API returns the newest summaries first
               const formattedSummaries = response.summaries
                 .map(summary => ({
                   id: summary.id,
@@ -103,10 +104,7 @@ const Profile = () => {
                   key_points: summary.source_text ? 
                     summary.source_text.split('\n').filter(point => point.trim()) : 
                     []
-                }))
-                // Sort by creation date (newest first) and take only 5
-                .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-                .slice(0, 5);
+                }));
               
               setSummaries(formattedSummaries);
             }
@@ -129,28 +127,19 @@ const Profile = () => {
     setIsUpdating(true);
 
     try {
-      const response = await apiService.updateProfile(profileForm.name);
+      const response = await apiService.saveProfile({ fullName: profileForm.name });
       
       if (response.success) {
-        setUserData({
-          ...userData,
-          name: profileForm.name
-        });
+        const user = response.user;
+        setUserData(prev => ({
+          ...prev,
+          name: user.full_name || user.user_metadata?.full_name || user.email.split('@')[0]
+        }));
         
         toast({
           title: "Profile updated",
           description: "Your profile information has been updated successfully.",
         });
-        
-        // Reload profile to get updated data
-        const profileResponse = await apiService.getProfile();
-        if (profileResponse.success) {
-          const user = profileResponse.user;
-          setUserData(prev => ({
-            ...prev,
-            name: user.full_name || user.user_metadata?.full_name || user.email.split('@')[0]
-          }));
-        }
       }
     } catch (error) {
       console.error('Failed to update profile:', error);
@@ -224,34 +213,19 @@ const Profile = () => {
         setIsUpdating(true);
         
         // Upload to backend
-        const response = await apiService.updateProfilePicture(file);
+        const response = await apiService.saveProfile({ file });
         
         if (response.success) {
-          // Create local URL for immediate display
-          const localUrl = URL.createObjectURL(file);
-          
-          setUserData({
-            ...userData,
-            profileImage: localUrl
-          });
+          const user = response.user;
+          setUserData(prev => ({
+            ...prev,
+            profileImage: user.profile_picture || URL.createObjectURL(file)
+          }));
           
           toast({
             title: "Profile picture updated",
             description: "Your profile picture has been updated successfully.",
           });
-          
-          // Reload profile to get the actual URL from backend
-          const profileResponse = await apiService.getProfile();
-          if (profileResponse.success) {
-            const user = profileResponse.user;
-            const profilePicture = user.profile_picture || user.user_metadata?.profile_picture;
-            if (profilePicture) {
-              setUserData(prev => ({
-                ...prev,
-                profileImage: profilePicture
-              }));
-            }
-          }
         }
       } catch (error) {
         console.error('Failed to upload profile picture:', error);
@@ -24,6 +24,24 @@ import { toast } from "@/components/ui/use-toast";
 import { apiService } from "@/services/api";
 import EditModal from "@/components/EditModal";
 
+// Renders text with the [start, end) ranges returned by the search API wrapped in <mark>
+const HighlightedText = ({ text, highlights }) => {
+  if (!text || !highlights?.length) return text || null;
+  const parts = [];
+  let last = 0;
+  highlights.forEach(([start, end], i) => {
+    if (start > last) parts.push(text.slice(last, start));
+    parts.push(
+      <mark key={i} className="bg-primary/20 text-foreground rounded px-0.5">
+        {text.slice(start, end)}
+      </mark>
+    );
+    last = end;
+  });
+  parts.push(text.slice(last));
+  return <>{parts}</>;
+};
+
 const Summaries = () => {
   const [summaries, setSummaries] = useState([]);
   const [filteredSummaries, setFilteredSummaries] = useState([]);
@@ -33,8 +51,10 @@ const Summaries = () => {
   const [expandedSummary, setExpandedSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [copiedId, setCopiedId] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  // ✅ Fetch all summaries
+  // ✅ Fetch the first page of summaries (list rows carry a preview, not the full content)
   const fetchSummaries = async () => {
     setLoading(true);
     try {
@@ -45,6 +65,7 @@ const Summaries = () => {
         const summariesData = response.summaries || response.data || [];
         setSummaries(summariesData);
         setFilteredSummaries(summariesData);
+        setNextCursor(response.next_cursor || null);
         
         if (summariesData.length === 0 && response.message) {
           toast({
@@ -69,29 +90,87 @@ const Summaries = () => {
       });
       setSummaries([]);
       setFilteredSummaries([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  // ✅ Load the next page
+  const loadMoreSummaries = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await apiService.getUserSummaries({ cursor: nextCursor });
+      if (response.success) {
+        setSummaries((prev) => [...prev, ...(response.summaries || [])]);
+        setNextCursor(response.next_cursor || null);
+      }
+    } catch (error) {
+      console.error("Load more summaries error:", error);
+      toast({
+        title: "Error loading summaries",
+        description: error.message || "Please try again later",
+        variant: "destructive",
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // ✅ Fetch the full content of a summary the first time it is needed
+  const loadFullSummary = async (summary) => {
+    if (summary.content != null) return summary;
+    const response = await apiService.getSummary(summary.id);
+    if (!response.success || !response.summary) {
+      throw new Error(response.message || "Could not load summary");
+    }
+    const fullSummary = { ...summary, ...response.summary };
+    setSummaries((prev) => prev.map((s) => (s.id === summary.id ? fullSummary : s)));
+    return fullSummary;
+  };
+
+  const withFullSummary = (action) => async (summary) => {
+    try {
+      await action(await loadFullSummary(summary));
+    } catch (error) {
+      console.error("Load summary error:", error);
+      toast({
+        title: "Error loading summary",
+        description: error.message || "Please try again later",
+        variant: "destructive",
+      });
+    }
+  };
+
   useEffect(() => {
     fetchSummaries();
   }, []);
 
-  // ✅ Search filter
+  // ✅ Search (server-side full-text search, debounced while typing)
   useEffect(() => {
-    if (!searchQuery.trim()) {
+    const q = searchQuery.trim();
+    if (!q) {
       setFilteredSummaries(summaries);
-    } else {
-      const q = searchQuery.toLowerCase();
-      const filtered = summaries.filter(
-        (s) =>
-          s.title?.toLowerCase().includes(q) ||
-          s.content?.toLowerCase().includes(q) ||
-          s.source_type?.toLowerCase().includes(q)
-      );
-      setFilteredSummaries(filtered);
+      return;
     }
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await apiService.searchSummaries(q);
+        if (!cancelled && response.success) {
+          setFilteredSummaries(response.summaries || []);
+        }
+      } catch (error) {
+        console.error("Search error:", error);
+      }
+    }, 250);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [searchQuery, summaries]);
 
   // ✅ Handle Delete
@@ -127,13 +206,13 @@ const Summaries = () => {
     if (!confirm("⚠️ This will delete ALL your summaries. This action cannot be undone!")) return;
     
     try {
-      const deletePromises = summaries.map(summary => 
-        apiService.deleteSummary(summary.id)
-      );
-      
-      await Promise.all(deletePromises);
+      const response = await apiService.deleteAllSummaries();
+      if (!response.success) {
+        throw new Error(response.message || "Failed to delete summaries");
+      }
       setSummaries([]);
       setFilteredSummaries([]);
+      setNextCursor(null);
       setExpandedSummary(null);
       toast({ 
         title: "Success", 
@@ -150,10 +229,12 @@ const Summaries = () => {
   };
 
   // ✅ Handle Edit
-  const handleEditSummary = (summary) => {
+  const handleEditSummary = withFullSummary((summary) => {
     setSummaryToEdit(summary);
     setEditModalOpen(true);
-  };
+  });
+
+  const handleViewSummary = withFullSummary((summary) => setExpandedSummary(summary));
 
   const handleSaveEditedSummary = async (newContent) => {
     if (!summaryToEdit?.id) return;
@@ -167,7 +248,7 @@ const Summaries = () => {
       if (response.success) {
         setSummaries((prev) =>
           prev.map((s) =>
-            s.id === summaryToEdit.id ? { ...s, content: newContent } : s
+            s.id === summaryToEdit.id ? { ...s, ...response.summary, content: newContent } : s
           )
         );
         if (expandedSummary?.id === summaryToEdit.id) {
@@ -211,8 +292,10 @@ const Summaries = () => {
     }
   };
 
+  const handleCopyFullSummary = withFullSummary((summary) => handleCopySummary(summary.content, summary.id));
+
   // ✅ Handle Download Single Summary
-  const handleDownloadSingle = (summary) => {
+  const handleDownloadSingle = withFullSummary((summary) => {
     const content = `# ${summary.title}\n\n## Summary\n${summary.content}\n\n---\nSource: ${summary.source_type}\nCreated: ${formatDate(summary.created_at)}\nWords: ${summary.content.length}`;
     
     const blob = new Blob([content], { type: 'text/plain' });
@@ -227,10 +310,10 @@ const Summaries = () => {
       title: "Downloaded!",
       description: `${summary.title} has been downloaded`,
     });
-  };
+  });
 
-  // ✅ Handle Download All
-  const handleDownloadAll = () => {
+  // ✅ Handle Download All (walks every page, with full content)
+  const handleDownloadAll = async () => {
     if (summaries.length === 0) {
       toast({
         title: "No data",
@@ -240,7 +323,28 @@ const Summaries = () => {
       return;
     }
 
-    const dataStr = JSON.stringify(summaries, null, 2);
+    let allSummaries = [];
+    try {
+      let cursor = null;
+      do {
+        const response = await apiService.getUserSummaries({ cursor, limit: 100, includeContent: true });
+        if (!response.success) {
+          throw new Error(response.message || "Failed to load summaries");
+        }
+        allSummaries = allSummaries.concat(response.summaries || []);
+        cursor = response.next_cursor;
+      } while (cursor);
+    } catch (error) {
+      console.error("Export error:", error);
+      toast({
+        title: "Export failed",
+        description: error.message || "Could not export summaries",
+        variant: "destructive",
+      });
+      return;
+    }
+
+    const dataStr = JSON.stringify(allSummaries, null, 2);
     const dataBlob = new Blob([dataStr], { type: "application/json" });
     const url = URL.createObjectURL(dataBlob);
     const link = document.createElement("a");
@@ -280,7 +384,9 @@ const Summaries = () => {
       <CardHeader className="pb-3">
         <div className="flex justify-between items-start gap-2">
           <CardTitle className="text-lg leading-tight flex-1 line-clamp-2">
-            {summary.title || "Untitled Summary"}
+            {summary.title ? (
+              <HighlightedText text={summary.title} highlights={summary.title_highlights} />
+            ) : "Untitled Summary"}
           </CardTitle>
           <div className="flex gap-1 opacity-0 group-hover:opacity-100 transition-opacity">
             <Button
@@ -313,14 +419,18 @@ const Summaries = () => {
           </div>
           <div className="flex items-center gap-1 text-xs text-muted-foreground">
             <Clock className="h-3 w-3" />
-            {getWordCount(summary.content)} words
+            {summary.content != null ? getWordCount(summary.content) : summary.word_count ?? 0} words
           </div>
         </div>
       </CardHeader>
       
       <CardContent className="pb-3">
         <p className="text-sm text-muted-foreground line-clamp-3 leading-relaxed">
-          {summary.content || "No content available"}
+          {summary.snippet != null ? (
+            <HighlightedText text={summary.snippet} highlights={summary.highlights} />
+          ) : (
+            summary.content ?? summary.preview ?? "No content available"
+          )}
         </p>
       </CardContent>
       
@@ -328,7 +438,7 @@ const Summaries = () => {
         <Button
           variant="outline"
           size="sm"
-          onClick={() => setExpandedSummary(summary)}
+          onClick={() => handleViewSummary(summary)}
           className="flex-1 text-xs h-8"
         >
           <Eye className="h-3 w-3 mr-1" />
@@ -337,7 +447,7 @@ const Summaries = () => {
         <Button
           variant="outline"
           size="sm"
-          onClick={() => handleCopySummary(summary.content, summary.id)}
+          onClick={() => handleCopyFullSummary(summary)}
           className="text-xs h-8"
         >
           {copiedId === summary.id ? <Check className="h-3 w-3" /> : <Copy className="h-3 w-3" />}
@@ -538,6 +648,20 @@ const Summaries = () => {
           </div>
         )}
 
+        {!loading && nextCursor && !searchQuery.trim() && (
+          <div className="flex justify-center">
+            <Button
+              variant="outline"
+              onClick={loadMoreSummaries}
+              disabled={loadingMore}
+              className="h-11 bg-background/50 backdrop-blur-sm"
+            >
+              <RefreshCw className={`h-4 w-4 mr-2 ${loadingMore ? 'animate-spin' : ''}`} />
+              {loadingMore ? "Loading..." : "Load more"}
+            </Button>
+          </div>
+        )}
+
         {/* Edit Modal */}
         {summaryToEdit && (
           <EditModal
@@ -20,6 +20,8 @@ const Videos = () => {
 
   const youtubeRef = useRef(null);
   const audioRef = useRef(null);
+  // Where playback was, so switching from the live stream to the finished file doesn't restart it
+  const playbackTimeRef = useRef(0);
 
   const validateYoutubeUrl = (url) => {
     return url.includes('youtube.com/watch') || url.includes('youtu.be/');
@@ -65,6 +67,7 @@ const Videos = () => {
     setVideoId(id);
     setDubbingJob(null);
     setIsPlaying(false);
+    playbackTimeRef.current = 0;
     
     // Reset audio
     if (audioRef.current) {
@@ -82,14 +85,17 @@ const Videos = () => {
       const response = await apiService.createDubbedVideo(url, "Urdu");
       
       if (response.success) {
+        playbackTimeRef.current = 0;
         setDubbingJob({
           job_id: response.job_id,
           status: 'processing',
-          progress: 0
+          progress: 0,
+          stream_url: `/dubbing/stream/${response.job_id}`,
+          streamed_seconds: 0
         });
         
-        // Start polling for status
-        pollDubbingStatus(response.job_id);
+        // Follow progress over SSE (falls back to polling)
+        watchDubbingJob(response.job_id);
         
         toast({
           title: "Dubbing Started",
@@ -110,6 +116,44 @@ const Videos = () => {
     }
   };
 
+  const watchDubbingJob = (jobId) => {
+    if (typeof EventSource === 'undefined') {
+      pollDubbingStatus(jobId);
+      return;
+    }
+
+    apiService.subscribeDubbingEvents(
+      jobId,
+      (type, data) => {
+        setDubbingJob(prev => ({
+          ...prev,
+          status: type === 'completed' || type === 'error' ? type : (data.status || prev.status),
+          progress: data.progress ?? prev.progress,
+          eta_seconds: data.eta_seconds ?? (type === 'progress' ? null : prev.eta_seconds),
+          audio_file: data.audio_file ?? prev.audio_file,
+          download_url: data.download_url ?? prev.download_url,
+          stream_url: data.stream_url ?? prev.stream_url,
+          streamed_seconds: data.streamed_seconds ?? prev.streamed_seconds,
+          error: data.error ?? prev.error
+        }));
+
+        if (type === 'completed') {
+          toast({
+            title: "Dubbing Complete!",
+            description: "Your video has been dubbed successfully!",
+          });
+        } else if (type === 'error') {
+          toast({
+            title: "Dubbing Failed",
+            description: data.error || "Dubbing process failed",
+            variant: "destructive"
+          });
+        }
+      },
+      () => pollDubbingStatus(jobId)
+    );
+  };
+
   const pollDubbingStatus = async (jobId) => {
     const checkStatus = async () => {
       try {
@@ -122,6 +166,7 @@ const Videos = () => {
             progress: response.progress,
             audio_file: response.audio_file,
             download_url: response.download_url,
+            stream_url: response.stream_url,
             error: response.error
           }));
 
@@ -155,6 +200,15 @@ const Videos = () => {
     checkStatus();
   };
 
+  // The dubbed track can be played while it is still being created, once some audio is encoded
+  const canPlay = dubbingJob?.status === 'completed'
+    || (dubbingJob?.status === 'processing' && dubbingJob.streamed_seconds > 0);
+  const audioSrc = dubbingJob?.status === 'completed' && dubbingJob.download_url
+    ? apiService.mediaUrl(dubbingJob.download_url)
+    : dubbingJob?.status === 'processing' && dubbingJob.stream_url
+    ? apiService.mediaUrl(dubbingJob.stream_url)
+    : null;
+
   const handlePlayPause = () => {
     if (isPlaying) {
       // Pause both YouTube and audio
@@ -172,7 +226,7 @@ const Videos = () => {
         youtubeRef.current.contentWindow.postMessage('{"event":"command","func":"playVideo","args":""}', '*');
       }
       
-      if (audioRef.current && dubbingJob?.status === 'completed') {
+      if (audioRef.current && canPlay) {
         audioRef.current.play().catch(e => {
           console.error("Error playing audio:", e);
         });
@@ -183,7 +237,7 @@ const Videos = () => {
 
   const handleDownload = () => {
     if (dubbingJob?.download_url) {
-      window.open(`${apiService.API_BASE}${dubbingJob.download_url}`, '_blank');
+      window.open(apiService.mediaUrl(dubbingJob.download_url), '_blank');
     }
   };
 
@@ -265,9 +319,9 @@ const Videos = () => {
                       <div className="flex gap-2">
                         <Button 
                           onClick={handlePlayPause}
-                          disabled={dubbingJob?.status !== 'completed'}
+                          disabled={!canPlay}
                           className="flex-1"
-                          variant={dubbingJob?.status === 'completed' ? "default" : "outline"}
+                          variant={canPlay ? "default" : "outline"}
                         >
                           {isPlaying ? (
                             <>
@@ -277,7 +331,7 @@ const Videos = () => {
                           ) : (
                             <>
                               <Play className="h-4 w-4 mr-2" />
-                              {dubbingJob?.status === 'completed' ? 'Play Urdu Audio' : 'Dub Video First'}
+                              {canPlay ? 'Play Urdu Audio' : 'Dub Video First'}
                             </>
                           )}
                         </Button>
@@ -366,7 +420,10 @@ const Videos = () => {
                               style={{ width: `${dubbingJob.progress}%` }}
                             ></div>
                           </div>
-                          <p className="text-xs text-gray-600 mt-1">{dubbingJob.progress}% complete</p>
+                          <p className="text-xs text-gray-600 mt-1">
+                            {dubbingJob.progress}% complete
+                            {dubbingJob.eta_seconds != null && ` · about ${Math.max(1, Math.round(dubbingJob.eta_seconds / 60))} min left`}
+                          </p>
                         </div>
                       )}
                       
@@ -391,10 +448,22 @@ const Videos = () => {
                     )}
 
                     {/* Hidden audio element */}
-                    {dubbingJob?.status === 'completed' && dubbingJob.download_url && (
+                    {audioSrc && (
                       <audio
                         ref={audioRef}
-                        src={`${apiService.API_BASE}${dubbingJob.download_url}`}
+                        src={audioSrc}
+                        onTimeUpdate={(e) => {
+                          playbackTimeRef.current = e.target.currentTime;
+                        }}
+                        onLoadedMetadata={(e) => {
+                          // Picks up where the live stream was when the finished file replaces it
+                          if (dubbingJob.status === 'completed' && playbackTimeRef.current > 0) {
+                            e.target.currentTime = playbackTimeRef.current;
+                            if (isPlaying) {
+                              e.target.play().catch(err => console.error("Error resuming audio:", err));
+                            }
+                          }
+                        }}
                         onEnded={() => {
                           setIsPlaying(false);
                           if (youtubeRef.current) {
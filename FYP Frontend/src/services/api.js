@@ -55,6 +55,46 @@ class ApiService {
         }
     }
 
+    // POST whose response is Server-Sent Events: calls onEvent(type, data) for each
+    // event and resolves with the 'done' event's data, the same body the endpoint
+    // returns without ?stream=true
+    async streamRequest(endpoint, options, onEvent) {
+        const headers = { ...options.headers };
+        if (this.token) {
+            headers.Authorization = `Bearer ${this.token}`;
+        }
+        const response = await fetch(`${this.API_BASE}${endpoint}`, { ...options, headers });
+        if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
+            throw new Error(data.detail || `HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            for (const frame of frames) {
+                let type = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) type = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (!data) continue;
+                const payload = JSON.parse(data);
+                if (type === 'error') throw new Error(payload.detail || 'Generation failed');
+                if (type === 'done') return payload;
+                onEvent(type, payload);
+            }
+        }
+        throw new Error('Stream ended before the response was complete');
+    }
+
     setToken(token) {
         this.token = token;
         if (token) {
@@ -118,12 +158,18 @@ class ApiService {
         });
     }
 
-    // Generate questions from uploaded document
-    async generateQuestionsFromDocument(file, numQuestions = 10) {
+    // Generate questions from uploaded document; pass onEvent to receive questions as they're generated
+    async generateQuestionsFromDocument(file, numQuestions = 10, onEvent = null) {
         const formData = new FormData();
         formData.append('file', file);
         formData.append('num_questions', numQuestions.toString());
         
+        if (onEvent) {
+            return this.streamRequest(`/documents/generate-questions?num_questions=${numQuestions}&stream=true`, {
+                method: 'POST',
+                body: formData,
+            }, onEvent);
+        }
         return this.request('/documents/generate-questions', {
             method: 'POST',
             body: formData,
@@ -132,13 +178,21 @@ class ApiService {
 
     // NEW: Generate questions from text input
     // NEW: Generate questions from text input
-    async generateQuestionsFromText(textData) {
-    return this.request('/documents/generate-questions-from-text', {
-        method: 'POST',
-        body: JSON.stringify({
+    async generateQuestionsFromText(textData, onEvent = null) {
+    const body = JSON.stringify({
         text: textData.text || textData,
         num_questions: textData.num_questions || 10
-        }),
+    });
+    if (onEvent) {
+        return this.streamRequest('/documents/generate-questions-from-text?stream=true', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body,
+        }, onEvent);
+    }
+    return this.request('/documents/generate-questions-from-text', {
+        method: 'POST',
+        body,
     });
     }
 
@@ -154,9 +208,14 @@ class ApiService {
     }
 
     // NEW: Answer question from uploaded document (Document Chatbot)
-    async answerQuestionFromDocument(file, question) {
+    // Pass the session_id from an earlier answer to skip re-uploading the file
+    async answerQuestionFromDocument(file, question, sessionId = null) {
         const formData = new FormData();
-        formData.append('file', file);
+        if (sessionId) {
+            formData.append('session_id', sessionId);
+        } else {
+            formData.append('file', file);
+        }
         formData.append('question', question);
         
         return this.request('/documents/answer-question-from-document', {
@@ -165,6 +224,25 @@ class ApiService {
         });
     }
 
+    // Upload a document once and get a session id for follow-up questions
+    async createDocumentSession(file) {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        return this.request('/documents/sessions', {
+            method: 'POST',
+            body: formData,
+        });
+    }
+
+    // Answer several questions about a session's document together
+    async answerQuestionsFromSession(sessionId, questions) {
+        return this.request(`/documents/sessions/${sessionId}/questions/batch`, {
+            method: 'POST',
+            body: JSON.stringify({ questions }),
+        });
+    }
+
     // Forgot password
     async forgotPassword(email) {
         return this.request('/auth/forgot-password', {
@@ -216,6 +294,18 @@ class ApiService {
         });
     }
 
+    // Name and/or picture in a single request
+    async saveProfile({ fullName, file } = {}) {
+        const formData = new FormData();
+        if (fullName !== undefined) formData.append('full_name', fullName);
+        if (file) formData.append('file', file);
+
+        return this.request('/users/profile', {
+            method: 'PATCH',
+            body: formData,
+        });
+    }
+
     async changePassword(currentPassword, newPassword) {
         return this.request('/users/change-password', {
             method: 'PUT',
@@ -246,12 +336,18 @@ class ApiService {
     }
 
     // Past Papers analysis
-    async analyzePastPapers(studyMaterialFile, pastPaperFile, numQuestions = 10) {
+    async analyzePastPapers(studyMaterialFile, pastPaperFile, numQuestions = 10, onEvent = null) {
         const formData = new FormData();
         formData.append('study_material_file', studyMaterialFile);
         formData.append('past_paper_file', pastPaperFile);
         formData.append('num_questions', numQuestions.toString());
         
+        if (onEvent) {
+            return this.streamRequest(`/past-papers/analyze?num_questions=${numQuestions}&stream=true`, {
+                method: 'POST',
+                body: formData,
+            }, onEvent);
+        }
         return this.request('/past-papers/analyze', {
             method: 'POST',
             body: formData,
@@ -273,9 +369,45 @@ class ApiService {
         return this.request(`/dubbing/status/${jobId}`);
     }
 
+    // URL for <audio> elements and new tabs, which can't send an Authorization header
+    mediaUrl(endpoint) {
+        return `${this.API_BASE}${endpoint}?token=${encodeURIComponent(this.token || '')}`;
+    }
+
+    // Push-based progress over Server-Sent Events; returns the EventSource so callers can close it
+    subscribeDubbingEvents(jobId, onEvent, onConnectionError) {
+        // EventSource can't send headers, so the token goes in the query string
+        const url = `${this.API_BASE}/dubbing/events/${jobId}?token=${encodeURIComponent(this.token || '')}`;
+        const source = new EventSource(url);
+
+        ['status', 'stage', 'progress', 'completed', 'error'].forEach(type => {
+            source.addEventListener(type, (event) => {
+                // Connection failures also arrive as 'error' events, but without data
+                if (!event.data) {
+                    if (source.readyState === EventSource.CLOSED && onConnectionError) {
+                        onConnectionError();
+                    }
+                    return;
+                }
+                const data = JSON.parse(event.data);
+                if (type === 'completed' || type === 'error') {
+                    source.close();
+                }
+                onEvent(type, data);
+            });
+        });
+
+        return source;
+    }
+
     // Summaries endpoints
-    async getUserSummaries() {
-        return this.request('/summaries');
+    async getUserSummaries({ cursor, limit, includeContent } = {}) {
+        const params = new URLSearchParams();
+        if (cursor) params.set('cursor', cursor);
+        if (limit) params.set('limit', limit);
+        if (includeContent) params.set('include_content', 'true');
+        const query = params.toString();
+        return this.request(query ? `/summaries?${query}` : '/summaries');
     }
 
     async getSummary(summaryId) {
@@ -289,6 +421,14 @@ class ApiService {
         });
     }
 
+    // Several summaries in one request (all saved or none)
+    async createSummaries(summaries) {
+        return this.request('/summaries/bulk', {
+            method: 'POST',
+            body: JSON.stringify({ summaries }),
+        });
+    }
+
     async updateSummary(summaryId, updateData) {
         return this.request(`/summaries/${summaryId}`, {
             method: 'PUT',
@@ -302,8 +442,24 @@ class ApiService {
         });
     }
 
-    async searchSummaries(query) {
-        return this.request(`/summaries/search/?query=${encodeURIComponent(query)}`);
+    async deleteSummaries(ids) {
+        return this.request('/summaries/bulk', {
+            method: 'DELETE',
+            body: JSON.stringify({ ids }),
+        });
+    }
+
+    async deleteAllSummaries() {
+        return this.request('/summaries/delete/all', {
+            method: 'DELETE',
+        });
+    }
+
+    async searchSummaries(query, { limit, offset } = {}) {
+        const params = new URLSearchParams({ query });
+        if (limit) params.set('limit', limit);
+        if (offset) params.set('offset', offset);
+        return this.request(`/summaries/search/?${params.toString()}`);
     }
 
     isAuthenticated() {